@@ -1,13 +1,32 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
-import joblib
 import json
-import pandas as pd
+from datetime import datetime
 from pathlib import Path
 from flask_cors import CORS
 import logging
+import copy
+import hmac
+import threading
+import time
+from caches import PredictionCache
+from session_store import create_session_store
+from llm_client import LLMClient, CachedLLMClient, LazyGenerativeModel, LLMTimeoutError, LLMBusyError
+from product_matcher import ProductMatcher
+from catalog_delta import CatalogDeltaStore
+from metrics import REGISTRY as metrics_registry, timed, record_stage, instrument_app, stats_gauges
+from warmup import WarmUp
+from streaming import StreamHub, SSE, NDJSON
+
+# pandas, scikit-learn (model yuklemesi) ve google.generativeai importlari baslangic isinmasinda
+# (warm_up_service) yapilir; modul importu hafif kalir, /healthz hemen yanit verir.
+pd = None
+expand_countries_batch = records_frame = None
+CatalogIndex = ProductStore = catalog_record = load_dataset = ModelRegistry = None
+PriceMatrixBuilder = row_key = None
+rank_routes = route_record = None
+CompiledModel = RowTemplates = None
 
 app = Flask(__name__)
 CORS(app, origins="http://localhost:5173")
@@ -15,79 +34,206 @@ CORS(app, origins="http://localhost:5173")
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-gemini_model = genai.GenerativeModel("models/gemini-1.5-flash")
+gemini_model = LazyGenerativeModel("models/gemini-1.5-flash", api_key=os.getenv("GOOGLE_API_KEY"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_CACHE_SIZE = int(os.getenv("GEMINI_CACHE_SIZE", "1024"))
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", "86400"))
+GEMINI_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH")  # orn: .cache/gemini.sqlite; bos ise yalnizca bellek
+llm_client = CachedLLMClient(
+    LLMClient(gemini_model, max_concurrency=GEMINI_MAX_CONCURRENCY, timeout=GEMINI_TIMEOUT),
+    maxsize=GEMINI_CACHE_SIZE, ttl=GEMINI_CACHE_TTL, disk_path=GEMINI_CACHE_PATH,
+)
+
+GEMINI_CONTEXT_PROMPT = (
+    "Sen bir ihracat ve urun analizi chatbotusun. Amacin, kullanicilara urunleri hakkinda bilgi vermek ve pazar analizi yapmak icin gerekli detaylari toplamaktir. "
+    "Kullanici bir urun veya sektor adi belirttiginde, eger daha fazla detaya ihtiyacin varsa (orn: urunun tipi, malzemesi, kullanim amaci, modeli, yas grubu gibi spesifik ozellikler), bu detaylari sorarak yanitini zenginlestirmeye calis. "
+    "Yanitini kisa paragraflara veya madde isaretlerine ayir ve mumkunse cok uzun tutma."
+)
 
 MODEL_PATH = "model/model.joblib"
 FEATURES_PATH = "model/feature_columns.json"
-DATA_FILE_PATH = "synthetic_ecommerce_data.xlsx"
+DATA_FILE_PATH = os.getenv("DATA_FILE_PATH", "synthetic_ecommerce_data.xlsx")
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", ".cache")
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL")) if os.getenv("PREDICTION_CACHE_TTL") else None
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "512"))
+ARBITRAGE_CHUNK_SIZE = int(os.getenv("ARBITRAGE_CHUNK_SIZE", "2048"))
+ARBITRAGE_MAX_K = int(os.getenv("ARBITRAGE_MAX_K", "500"))
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "memory://")  # orn: sqlite:///.cache/sessions.sqlite
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+PROFILE_DIR = os.getenv("PROFILE_DIR")  # verilirse yavas isteklerin ornekleme profili buraya yazilir
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))  # 0: dosyalar izlenmez, yalnizca admin cagrisi
+MODEL_WARMUP_SIZE = int(os.getenv("MODEL_WARMUP_SIZE", "32"))
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn")  # compiled: sklearn agaclari NumPy motoruna derlenir
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # /admin/* icin X-Admin-Token; bos ise yalnizca loopback istekleri
+LOOPBACK_ADDRESSES = {"127.0.0.1", "::1"}
+# background: isinma import sonrasi arka planda baslar, hazir olana kadar istekler 503 alir.
+# sync: import isinma bitene kadar bekler. manual: start_warmup() cagrilana kadar baslamaz (serve.py).
+BACKEND_WARMUP = os.getenv("BACKEND_WARMUP", "background")
+# Katalog urunleri x ulkeler fiyat matrisi (price_matrix.py). background: isinmadan sonra arka
+# planda hesaplanir (diskte varsa yuklenir), sync: isinma icinde hesaplanir, off: kullanilmaz.
+PRICE_MATRIX = os.getenv("PRICE_MATRIX", "background")
+# Sonradan eklenen urunler (catalog_delta.py); diger worker'larin ve CLI'nin ekledikleri
+# CATALOG_POLL_INTERVAL saniyede bir alinir (0: yalnizca baslangicta ve API cagrisinda).
+CATALOG_DELTA_PATH = os.getenv("CATALOG_DELTA_PATH", os.path.join(DATA_CACHE_DIR, "catalog_delta.sqlite"))
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "5"))
+# /chat/stream: bos akisa STREAM_HEARTBEAT saniyede bir canlilik satiri yazilir; STREAM_IDLE_TIMEOUT
+# boyunca olay gelmeyen akis kapatilir.
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+STREAM_IDLE_TIMEOUT = float(os.getenv("STREAM_IDLE_TIMEOUT", str(GEMINI_TIMEOUT + 10)))
 
-model = None
-feature_cols = None
+model_registry = None
 ecommerce_df = None
-product_names_data = {}
-
-try:
-    if not Path(MODEL_PATH).exists():
-        raise FileNotFoundError(f"Model dosyasi bulunamadi: {MODEL_PATH}")
-    if not Path(FEATURES_PATH).exists():
-        raise FileNotFoundError(f"feature_columns.json dosyasi bulunamadi: {FEATURES_PATH}")
-    if not Path(DATA_FILE_PATH).exists():
-        raise FileNotFoundError(f"Veri dosyasi bulunamadi: {DATA_FILE_PATH}. Lutfen dosya adinin ve uzantisinin dogru oldugundan emin olun.")
-
-    model = joblib.load(MODEL_PATH)
-    with open(FEATURES_PATH, "r", encoding="utf-8") as f:
-        feature_cols = json.load(f)
-    
-    if DATA_FILE_PATH.endswith('.csv'):
-        ecommerce_df = pd.read_csv(DATA_FILE_PATH)
-    elif DATA_FILE_PATH.endswith('.xlsx'):
-        ecommerce_df = pd.read_excel(DATA_FILE_PATH)
+catalog_index = None
+product_names_data = None
+product_matcher = None
+prediction_cache = None
+price_matrix_builder = None
+catalog_delta = None
+catalog_delta_records = []  # uygulanan tum delta kayitlari (katalog indeksi yeniden kurulurken)
+catalog_delta_seq = 0
+catalog_lock = threading.Lock()
+catalog_templates = None  # (model surumu, urun store'u, RowTemplates): katalogun kodlanmis ulke taramasi girdileri
+templates_lock = threading.Lock()
+warmup = WarmUp()
+
+chat_state = create_session_store(SESSION_STORE_URL, maxsize=SESSION_MAX, ttl=SESSION_TTL)
+stream_hub = StreamHub(heartbeat=STREAM_HEARTBEAT, idle_timeout=STREAM_IDLE_TIMEOUT)
+
+def warm_up_model(version):
+    # Katalogdan ornek urunlerle tek bir toplu tahmin (ulke taramasi dahil): ilk istekler
+    # soguk yol maliyetini odemesin, tahmin yapamayan bir model devreye alinmasin.
+    # Ilk yuklemede katalog indeksi henuz kurulmadigindan ulke taramasi atlanir.
+    n = min(MODEL_WARMUP_SIZE, len(product_names_data))
+    if n:
+        sample = [product_names_data.record(row) for row in range(n)]
+        score_products_batch(sample, catalog_index is not None, version)
+
+def on_model_swapped(new, old):
+    # Feature listesi degistiyse katalog adaylari yeni listeye gore yeniden uretilir.
+    # Derlenmis motorda katalog satirlari yeni surumun kodlarina bir kez cevrilir. Fiyat matrisi
+    # yeni surum icin arka planda yeniden hesaplanir; bitene kadar oneriler canli tahminle uretilir.
+    # Katalog kilidi altinda: es zamanli bir delta uygulamasi eski kayit listesiyle kurulan
+    # indeksle ezilmesin.
+    global catalog_index
+    if old is None:
+        return
+    with catalog_lock:
+        if new.feature_cols != old.feature_cols:
+            catalog_index = build_catalog_index(new.feature_cols)
+        row_templates_for(new, product_names_data)
+        if price_matrix_builder is not None:
+            build_price_matrix(new)
+
+def build_catalog_index(feature_cols):
+    return CatalogIndex.from_dataframe(ecommerce_df, list(feature_cols)).with_records(catalog_delta_records)
+
+def apply_catalog_records(records):
+    # Delta kayitlarini canli katalog yapilarina artimli uygular: urun store'u ve katalog
+    # indeksi genisletilir, yeni adlar eslestiriciye eklenir, guncellenen urunlerin onbellekteki
+    # tahminleri silinir (ulke listesi degistiyse tum onbellek), kodlanmis satir sablonlarinda ve
+    # fiyat matrisinde yalnizca yeni ve degisen satirlar hesaplanir. Yapilar tek atamayla degistirilir; once store, sonra
+    # eslestirici (eslesen ad store'da her zaman bulunsun).
+    global product_names_data, product_matcher, catalog_index, catalog_templates
+    old_store, old_index = product_names_data, catalog_index
+    names = [record['product_name_clean'].lower() for record in records]
+    store = old_store.with_records(records)
+    matcher = product_matcher.with_names(name for name in names if name not in old_store)
+    index = old_index.with_records(records)
+    catalog_delta_records.extend(records)
+    templates = catalog_templates
+    if templates is not None and templates[1] is old_store:
+        # Kodlanmis katalog satirlarindan yalnizca yeni ve degisen urunler kodlanir.
+        version = templates[0]
+        rows = sorted({store.row_of(name) for name in names})
+        bases = [country_sweep_base(store.record(row)) for row in rows]
+        templates = (version, store, templates[2].with_rows(rows, bases, [row_key(base, version.feature_cols) for base in bases]))
+
+    catalog_templates = templates
+    product_names_data = store
+    product_matcher = matcher
+    catalog_index = index
+    if index.countries != old_index.countries:
+        prediction_cache.clear()
     else:
-        raise ValueError("Desteklenmeyen veri dosyasi uzantisi. Lutfen .csv veya .xlsx kullanin.")
+        version = model_registry.current
+        for name in set(names):
+            if name in old_store:
+                prediction_cache.delete(prediction_cache_key(old_store[name], version))
+    if price_matrix_builder is not None:
+        build_price_matrix(model_registry.current)
+    logging.info(f"Katalog guncellendi: {len(records)} kayit, {len(store) - len(old_store)} yeni urun "
+                 f"(toplam {len(store)}).")
 
-    product_name_col = 'product_name_clean' if 'product_name_clean' in ecommerce_df.columns else 'product_name'
-    
-    for index, row in ecommerce_df.iterrows():
-        product_name_lower = str(row[product_name_col]).lower()
-        if product_name_lower not in product_names_data:
-            product_names_data[product_name_lower] = {
-                'product_id': str(row['product_id']),
-                'product_name_clean': str(row[product_name_col]),
-                'category': str(row['category']),
-                'brand': str(row['brand']),
-                'country': str(row['country']),
-                'shipping_cost': float(row['shipping_cost']) if pd.notna(row['shipping_cost']) else 0.0,
-                'city': str(row['city']),
-                'seller': str(row['seller']),
-                'stock': bool(row['stock']),
-                'platform': str(row['platform']),
-                'month': pd.to_datetime(row['last_updated']).month if 'last_updated' in row and pd.notna(row['last_updated']) else pd.Timestamp.now().month
-            }
+def sync_catalog():
+    # Delta store'da bu surecin henuz uygulamadigi kayitlari uygular (API, CLI ya da baska worker).
+    global catalog_delta_seq
+    with catalog_lock:
+        entries = catalog_delta.since(catalog_delta_seq)
+        if entries:
+            apply_catalog_records([record for _, record in entries])
+            catalog_delta_seq = entries[-1][0]
+        return len(entries)
 
-    logging.info("ML Model, feature kolonlari ve e-ticaret veri seti basariyla yuklendi.")
-    logging.info(f"Yuklenen benzersiz urun adi sayisi: {len(product_names_data)}")
+def row_templates_for(version, store):
+    # Katalog urunlerinin ulke taramasi girdileri, model kodlarina bir kez cevrilmis halde; satirlar
+    # store satirlariyla hizalidir. Yalnizca derlenmis motorda (sklearn motorunda None).
+    global catalog_templates
+    if not isinstance(version.model, CompiledModel):
+        return None
+    current = catalog_templates
+    if current is not None and current[0] is version and current[1] is store:
+        return current[2]
+    with templates_lock:
+        current = catalog_templates
+        if current is not None and current[0] is version and current[1] is store:
+            return current[2]
+        bases = [country_sweep_base(store.record(row)) for row in range(len(store))]
+        templates = RowTemplates.from_records(version.model, bases, [row_key(base, version.feature_cols) for base in bases])
+        catalog_templates = (version, store, templates)
+        return templates
+
+def row_templates_stats():
+    current = catalog_templates
+    if current is None:
+        return None
+    return {"model_version": current[0].version, **current[2].stats()}
+
+def build_price_matrix(version, background=True):
+    # Matris onerilerde gosterilen, kurusa yuvarlanmis fiyatlari tutar: float32'ye sigar ve
+    # ulke siralamasi canli taramadakiyle (yuvarlanmis degere gore) ayni kalir.
+    store, countries = product_names_data, catalog_index.countries
+    templates = row_templates_for(version, store)
+    if templates is not None:
+        keys = templates.keys
+        bases = lambda rows: rows
+        country_matrix = lambda rows: templates.country_matrix(rows, countries)
+    else:
+        bases = lambda rows: [country_sweep_base(store.record(row)) for row in rows]
+        keys = [row_key(base, version.feature_cols) for base in bases(range(len(store)))]
+        country_matrix = lambda chunk: score_country_matrix(chunk, countries, version)
 
-except FileNotFoundError as e:
-    logging.error(f"Dosya yukleme hatasi: {e}. Lutfen tum gerekli dosyalarin dogru yerde oldugundan emin olun.")
-    exit(1)
-except Exception as e:
-    logging.error(f"Model, feature kolonlari veya veri seti yuklenirken beklenmeyen bir hata olustu: {e}")
-    exit(1)
+    def score(chunk):
+        return [[round(float(price), 2) for price in row] for row in country_matrix(chunk)]
 
-chat_state = {}
-MAX_CHAT_HISTORY = 10
+    return price_matrix_builder.build(version, version.feature_cols, countries, keys, bases, score,
+                                      background=background)
 
-def prepare_dataframe(data: dict):
-    df = pd.DataFrame([data])
+@timed("prepare_dataframe")
+def prepare_dataframe(data: dict, feature_cols):
+    return align_dataframe(pd.DataFrame([data]), feature_cols)
+
+def align_dataframe(df, feature_cols):
+    feature_cols = list(feature_cols)
     for col in feature_cols:
         if col not in df.columns:
             df[col] = None
     return df[feature_cols]
 
-def get_country_recommendations_for_prediction(product_data, ecommerce_df, model, feature_cols):
-    all_possible_countries = ecommerce_df['country'].unique().tolist()
-    predictions_per_country = []
+def country_sweep_base(product_data):
     base_input_for_model = product_data.copy()
     base_input_for_model.pop('country', None)
     base_input_for_model.pop('country_clean', None)
@@ -95,72 +241,251 @@ def get_country_recommendations_for_prediction(product_data, ecommerce_df, model
     base_input_for_model['seller'] = base_input_for_model.get('seller', None)
     base_input_for_model['stock'] = base_input_for_model.get('stock', 100)
     base_input_for_model['platform'] = base_input_for_model.get('platform', "E-commerce")
-    base_input_for_model['month'] = base_input_for_model.get('month', pd.Timestamp.now().month)
+    base_input_for_model['month'] = base_input_for_model.get('month', datetime.now().month)
+    return base_input_for_model
 
-    for country in all_possible_countries:
+@timed("get_country_recommendations_for_prediction")
+def get_country_recommendations_for_prediction(product_data, catalog_index, model, feature_cols):
+    all_possible_countries = list(catalog_index.countries)
+    base_input_for_model = country_sweep_base(product_data)
+
+    try:
+        country_prices = predict_country_prices([base_input_for_model], all_possible_countries, model, feature_cols)[0]
+        scored_countries = zip(all_possible_countries, country_prices)
+    except Exception as e:
+        logging.warning(f"Toplu ulke tahmini yapilamadi, ulke ulke deneniyor: {e}")
+        scored_countries = score_countries_one_by_one(base_input_for_model, all_possible_countries, model, feature_cols)
+
+    return format_country_recommendations(product_data, scored_countries)
+
+# Kategori (katalogdaki yazimiyla, kucuk harf) -> tahmini HS kodu.
+HS_CODES = {
+    "oyuncak": "9503.00 (Oyuncaklar)",
+    "toys": "9503.00 (Oyuncaklar)",
+    "elektronik": "8500.00 (Elektronik Cihazlar)",
+    "electronics": "8500.00 (Elektronik Cihazlar)",
+}
+
+def hs_code_info(category):
+    # Kategori katalog indeksinden (buyuk/kucuk harf, bosluk duyarsiz) cozulur; katalogda
+    # olmayan kategoriler girildigi gibi aranir.
+    if not isinstance(category, str):
+        return "HS Kodu tahmini icin daha fazla bilgiye ihtiyac var."
+    resolved = catalog_index.canonical("category", category) if catalog_index is not None else None
+    hs_code = HS_CODES.get((resolved or category).strip().casefold())
+    if hs_code is None:
+        return "HS Kodu tahmini icin daha fazla bilgiye ihtiyac var."
+    return f"Tahmini HS Kodu: {hs_code}."
+
+def catalog_shipping_cost(country, category):
+    # Ulke x kategori hucresinin kargo ucreti medyani; hucre bossa kategori, ulke ve tum katalog
+    # medyanina duser. Degerler katalog indeksinde onceden hesaplidir (O(1)).
+    index = catalog_index
+    country, category = index.canonical("country", country), index.canonical("category", category)
+    for cell in ((country, category), (None, category), (country, None), (None, None)):
+        median = catalog_shipping_median(index, *cell)
+        if median is not None:
+            return median
+    return None
+
+def catalog_shipping_median(index, country, category):
+    median = index.shipping_cost_median(country, category)
+    return None if median is None else round(median, 2)
+
+def with_catalog_defaults(product_data):
+    # Girdide shipping_cost yoksa urunun ulke/kategori medyaniyla doldurulur (model eksik degeri
+    # 0 ya da ortalama gibi gormesin). Girdi degistirilmez; kopya doner.
+    if catalog_index is None or product_data.get('shipping_cost') not in (None, ""):
+        return product_data
+    shipping_cost = catalog_shipping_cost(product_data.get('country'), product_data.get('category'))
+    if shipping_cost is None:
+        return product_data
+    return {**product_data, 'shipping_cost': shipping_cost}
+
+def format_country_recommendations(product_data, scored_countries):
+    predictions_per_country = []
+    for country, pred_price in scored_countries:
+        predictions_per_country.append({
+            "name": country,
+            "volume": round(float(pred_price), 2), 
+            "reason": f"Bu ulkede tahmini satis fiyati: {round(float(pred_price), 2)} USD."
+        })
+
+    predictions_per_country.sort(key=lambda x: x["volume"], reverse=True)
+    top_n_countries = predictions_per_country[:5] 
+
+    return {
+        "recommendation": f"'{product_data.get('product_name_clean', 'Urun')}' icin en yuksek fiyat potansiyeli olan ulkeler:",
+        "hsCodeInfo": hs_code_info(product_data.get('category')),
+        "countries": top_n_countries,
+        "reason": "Bu ulkeler, girdiginiz urun ozellikleri icin en yuksek tahmini satis fiyatina sahip pazarlardir."
+    }
+
+def score_countries_one_by_one(base_input_for_model, countries, model, feature_cols):
+    scored_countries = []
+    for country in countries:
         current_product_input = base_input_for_model.copy()
         current_product_input['country'] = country
-        
-        df_sample = prepare_dataframe(current_product_input)
-        
         try:
-            pred_price = model.predict(df_sample)[0] 
-            predictions_per_country.append({
-                "name": country,
-                "volume": round(float(pred_price), 2), 
-                "reason": f"Bu ulkede tahmini satis fiyati: {round(float(pred_price), 2)} USD."
-            })
+            df_country = prepare_dataframe(current_product_input, feature_cols)
+            with timed("model_predict"):
+                scored_countries.append((country, model.predict(df_country)[0]))
         except Exception as e:
             logging.warning(f"'{country}' icin tahmin yapilamadi: {e}")
+    return scored_countries
 
-    predictions_per_country.sort(key=lambda x: x["volume"], reverse=True)
-    top_n_countries = predictions_per_country[:5] 
+@timed("price_matrix_lookup")
+def price_matrix_recommendations(product_data, version):
+    # Urunun ulke taramasi girdisi bir katalog urunununkiyle ayniysa en iyi 5 ulke onceden
+    # hesaplanmis matrisin tek satirindan secilir. Matris bu model surumune ait degilse ya da
+    # satir henuz hesaplanmadiysa None doner.
+    matrix = price_matrix_builder.current if price_matrix_builder is not None else None
+    if matrix is None or matrix.version != version.version or matrix.countries != catalog_index.countries:
+        return None
+    top_countries = matrix.top_countries(row_key(country_sweep_base(product_data), version.feature_cols))
+    if top_countries is None:
+        return None
+    return format_country_recommendations(product_data, top_countries)
 
-    hs_code_info = "HS Kodu tahmini icin daha fazla bilgiye ihtiyac var."
-    if product_data.get('category', '').lower() == 'oyuncak':
-        hs_code_info = "Tahmini HS Kodu: 9503.00 (Oyuncaklar)."
-    elif product_data.get('category', '').lower() == 'elektronik':
-        hs_code_info = "Tahmini HS Kodu: 8500.00 (Elektronik Cihazlar)."
+@timed("row_template_lookup")
+def template_recommendations(product_data, version):
+    # Fiyat matrisinde satir yoksa (kapali, hesaplaniyor ya da baska surum) urun bir katalog
+    # urunuyse kodlanmis satiri ulke ulke cogaltilip skorlanir; kodlama adimi yapilmaz.
+    templates = catalog_templates
+    if templates is None or templates[0] is not version:
+        return None
+    templates = templates[2]
+    row = templates.row(row_key(country_sweep_base(product_data), version.feature_cols))
+    if row is None:
+        return None
+    countries = list(catalog_index.countries)
+    with timed("model_predict"):
+        prices = templates.country_matrix([row], countries)[0]
+    return format_country_recommendations(product_data, zip(countries, prices))
 
+def compute_price_and_recommendations(product_data, version, on_price=None):
+    # version: istegin basinda alinan model surumu; istek sirasinda takas olsa da tum
+    # tahminler ayni surumle yapilir. on_price(fiyat): ulke onerilerinden once cagrilir (akis).
+    predicted_price_for_input_country = predict_single_price(product_data, version)
+    if on_price is not None:
+        on_price(float(predicted_price_for_input_country))
+    country_recommendations = price_matrix_recommendations(product_data, version)
+    if country_recommendations is None:
+        country_recommendations = template_recommendations(product_data, version)
+    if country_recommendations is None:
+        country_recommendations = get_country_recommendations_for_prediction(product_data, catalog_index, version.model, version.feature_cols)
     return {
-        "recommendation": f"'{product_data.get('product_name_clean', 'Urun')}' icin en yuksek fiyat potansiyeli olan ulkeler:",
-        "hsCodeInfo": hs_code_info,
-        "countries": top_n_countries,
-        "reason": "Bu ulkeler, girdiginiz urun ozellikleri icin en yuksek tahmini satis fiyatina sahip pazarlardir."
+        "predicted_price": float(predicted_price_for_input_country), 
+        "recommendation_data": country_recommendations 
     }
 
-def perform_ml_prediction_and_get_rich_response(product_data):
+def prediction_cache_key(product_data, version):
+    cache_key = prediction_cache.key_for(product_data, version.version, version.feature_cols)
+    if 'month' not in product_data:
+        # Ulke taramasi eksik ay icin bugunun ayini kullanir; anahtar buna gore ayrilir.
+        cache_key += (datetime.now().month,)
+    return cache_key
+
+def predict_price_and_recommendations(product_data, on_price=None):
+    product_data = with_catalog_defaults(product_data)
+    version = model_registry.current
+    prediction_cache.bind_model(version.model, version.feature_cols)
+    cache_key = prediction_cache_key(product_data, version)
+    full_response = prediction_cache.get_or_compute(cache_key, lambda: compute_price_and_recommendations(product_data, version, on_price))
+    return copy.deepcopy(full_response)
+
+@timed("perform_ml_prediction_and_get_rich_response")
+def perform_ml_prediction_and_get_rich_response(product_data, on_price=None):
     try:
-        df_input_for_single_country = prepare_dataframe(product_data)
-        predicted_price_for_input_country = model.predict(df_input_for_single_country)[0]
-        country_recommendations = get_country_recommendations_for_prediction(product_data, ecommerce_df, model, feature_cols)
-        full_response = {
-            "predicted_price": float(predicted_price_for_input_country), 
-            "recommendation_data": country_recommendations 
-        }
-        return full_response
+        return predict_price_and_recommendations(product_data, on_price)
     except Exception as e:
         logging.error(f"perform_ml_prediction_and_get_rich_response icinde ML tahmini yapilamadi: {e}")
         return {"error": str(e), "message": "Fiyat tahmini yapilirken bir hata olustu."}
 
-def get_chatbot_response_based_on_state(session_id, user_message):
-    global chat_state
-    
-    current_state = chat_state.get(session_id, {'stage': 0, 'data': {}})
+def score_products_batch(products, with_recommendations=False, version=None):
+    version = version or model_registry.current
+    model, feature_cols = version.model, version.feature_cols
+    products = [with_catalog_defaults(product) for product in products]
+    df_products = align_dataframe(records_frame(products), feature_cols)
+    with timed("model_predict"):
+        prices = model.predict(df_products)
+    results = [{"predicted_price": float(price)} for price in prices]
+    if with_recommendations:
+        countries = list(catalog_index.countries)
+        bases = [country_sweep_base(product) for product in products]
+        country_prices = score_country_matrix(bases, countries, version)
+        for result, product, row in zip(results, products, country_prices):
+            result["recommendation_data"] = format_country_recommendations(product, zip(countries, row))
+    return results
+
+def predict_country_prices(bases, countries, model, feature_cols):
+    # (urun sayisi x ulke sayisi) tahmini fiyatlar; tek model cagrisi. Derlenmis motorda girdiler
+    # DataFrame kurulmadan kodlanir ve ulke slotu kodlanmis satirlarda cogaltilir.
+    countries = list(countries)
+    if isinstance(model, CompiledModel):
+        try:
+            Z = model.expand_countries(model.encode_records(bases), countries)
+        except ValueError:
+            pass  # sayi olmayan sayisal deger vb.: DataFrame yolunun donusumleri uygulanir
+        else:
+            with timed("model_predict"):
+                return model.predict_encoded(Z).reshape(len(bases), len(countries))
+    df_countries = align_dataframe(expand_countries_batch(bases, countries), feature_cols)
+    with timed("model_predict"):
+        country_prices = model.predict(df_countries)
+    return country_prices.reshape(len(bases), len(countries))
+
+def predict_single_price(product_data, version):
+    model = version.model
+    if isinstance(model, CompiledModel):
+        try:
+            Z = model.encode_records([product_data])
+        except ValueError:
+            pass
+        else:
+            with timed("model_predict"):
+                return model.predict_encoded(Z)[0]
+    df_input = prepare_dataframe(product_data, version.feature_cols)
+    with timed("model_predict"):
+        return version.model.predict(df_input)[0]
+
+def score_country_matrix(bases, countries, version):
+    return predict_country_prices(bases, countries, version.model, version.feature_cols)
+
+def score_products_chunk(chunk, with_recommendations=False):
+    # chunk: (index, urun) ciftleri. Toplu tahmin basarisiz olursa hatali urunu
+    # ayirmak icin urun urun tekrar denenir.
+    indices = [index for index, _ in chunk]
+    products = [product for _, product in chunk]
+    version = model_registry.current
+    try:
+        results = score_products_batch(products, with_recommendations, version)
+    except Exception as e:
+        logging.warning(f"Toplu urun tahmini yapilamadi, urun urun deneniyor: {e}")
+        results = []
+        for product in products:
+            try:
+                results.append(score_products_batch([product], with_recommendations, version)[0])
+            except Exception as e:
+                results.append({"error": str(e)})
+    return [{"index": index, **result} for index, result in zip(indices, results)]
+
+def plan_chatbot_response(session_id, user_message):
+    # Oturum durumunu ilerletir ve yanitin nasil uretilecegini dondurur: ("response", hazir metin
+    # ya da oneri), ("predict", urun verisi) ya da ("llm", prompt). /chat ve /chat/stream ortak.
+    with timed("session_load"):
+        current_state = chat_state.get(session_id, {'stage': 0, 'data': {}})
     stage = current_state['stage']
     data = current_state['data']
     response = ""
+    action = None
     
     user_message_lower = user_message.lower()
 
     if stage == 'awaiting_prediction_confirmation':
         if user_message_lower in ["evet", "yes", "tahmin et", "fiyat"]:
             if 'product_data_for_prediction' in data:
-                rich_response_data = perform_ml_prediction_and_get_rich_response(data['product_data_for_prediction'])
-                if "error" in rich_response_data:
-                    response = f"Uzgunum, fiyat tahmini yapilirken bir sorun olustu: {rich_response_data['message']}"
-                else:
-                    response = rich_response_data
+                action = ("predict", data['product_data_for_prediction'])
                 chat_state[session_id] = {'stage': 0, 'data': {}}
             else:
                 response = "Uzgunum, hangi urun icin tahmin yapacagimi bulamadim. Lutfen urun adini tekrar belirtin."
@@ -170,11 +495,9 @@ def get_chatbot_response_based_on_state(session_id, user_message):
             chat_state[session_id] = {'stage': 0, 'data': {}}
 
     elif stage == 0:
-        found_product_data = None
-        for product_name_key, details in product_names_data.items():
-            if product_name_key in user_message_lower:
-                found_product_data = details
-                break
+        with timed("product_match"):
+            matched_product_name = product_matcher.longest_match(user_message_lower)
+        found_product_data = product_names_data.get(matched_product_name)
         
         if found_product_data:
             product_name = found_product_data['product_name_clean']
@@ -198,18 +521,7 @@ def get_chatbot_response_based_on_state(session_id, user_message):
             chat_state[session_id] = {'stage': 1, 'data': {'product_type': 'toys'}}
         
         else:
-            try:
-                context_prompt = (
-                    "Sen bir ihracat ve urun analizi chatbotusun. Amacin, kullanicilara urunleri hakkinda bilgi vermek ve pazar analizi yapmak icin gerekli detaylari toplamaktir. "
-                    "Kullanici bir urun veya sektor adi belirttiginde, eger daha fazla detaya ihtiyacin varsa (orn: urunun tipi, malzemesi, kullanim amaci, modeli, yas grubu gibi spesifik ozellikler), bu detaylari sorarak yanitini zenginlestirmeye calis. "
-                    "Yanitini kisa paragraflara veya madde isaretlerine ayir ve mumkunse cok uzun tutma."
-                )
-                prompt_for_gemini = f"{context_prompt}\n\nKullanici sorusu: {user_message}"
-                gemini_response = gemini_model.generate_content(prompt_for_gemini)
-                response = gemini_response.text
-            except Exception as e:
-                logging.error(f"Gemini API hatasi: {e}")
-                response = "Uzgunum, Gemini ile iletisim kurarken bir sorun olustu."
+            action = ("llm", f"{GEMINI_CONTEXT_PROMPT}\n\nKullanici sorusu: {user_message}")
     
     elif stage == 1:
         if "ahsap" in user_message.lower():
@@ -255,7 +567,88 @@ def get_chatbot_response_based_on_state(session_id, user_message):
             response = "Lutfen Montessori, Waldorf veya egitici oyuncak gibi bir egitim felsefesi belirtin."
             chat_state[session_id] = {'stage': 2, 'data': data}
     
-    return response
+    return action or ("response", response)
+
+def chat_prediction_response(product_data, on_price=None):
+    rich_response_data = perform_ml_prediction_and_get_rich_response(product_data, on_price)
+    if "error" in rich_response_data:
+        return f"Uzgunum, fiyat tahmini yapilirken bir sorun olustu: {rich_response_data['message']}"
+    return rich_response_data
+
+def llm_error_response(error):
+    if isinstance(error, LLMTimeoutError):
+        logging.warning("Gemini yaniti zaman asimina ugradi.")
+        return "Uzgunum, Gemini zamaninda yanit vermedi. Lutfen biraz sonra tekrar deneyin."
+    if isinstance(error, LLMBusyError):
+        logging.warning("Gemini esszamanlilik siniri dolu, istek reddedildi.")
+        return "Uzgunum, su anda cok fazla istek var. Lutfen biraz sonra tekrar deneyin."
+    logging.error(f"Gemini API hatasi: {error}")
+    return "Uzgunum, Gemini ile iletisim kurarken bir sorun olustu."
+
+def get_chatbot_response_based_on_state(session_id, user_message):
+    kind, payload = plan_chatbot_response(session_id, user_message)
+    if kind == "predict":
+        return chat_prediction_response(payload)
+    if kind == "llm":
+        try:
+            with timed("llm_generate"):
+                return llm_client.generate(payload)
+        except Exception as e:
+            return llm_error_response(e)
+    return payload
+
+def stream_chat_response(stream, kind, payload):
+    # /chat/stream olaylari. Gemini parcalari LLM thread'inde geldikce yazilir; tahminde once
+    # fiyat, sonra ulke onerileri gonderilir. done olayi /chat'in donecegi yaniti tasir.
+    if kind == "llm":
+        stream_llm_response(stream, payload)
+        return
+    if kind == "predict":
+        price_sent = []
+
+        def on_price(price):
+            price_sent.append(price)
+            stream.send("price", {"predicted_price": price})
+
+        response = chat_prediction_response(payload, on_price)
+        if isinstance(response, str):
+            stream.send("error", {"error": response})
+        else:
+            if not price_sent:  # onbellekten geldi
+                stream.send("price", {"predicted_price": response["predicted_price"]})
+            stream.send("recommendation", response["recommendation_data"])
+    else:
+        response = payload
+        stream.send("message", {"response": response})
+    stream.send("done", {"response": response})
+    stream.close()
+
+def stream_llm_response(stream, prompt):
+    start = time.perf_counter()
+    parts = []
+
+    def on_text(text):
+        if not parts:
+            record_stage("llm_first_token", time.perf_counter() - start)
+        parts.append(text)
+        return stream.send("delta", {"text": text})
+
+    def on_end(error):
+        if error is None:
+            record_stage("llm_stream", time.perf_counter() - start)
+            response = "".join(parts)
+        else:
+            response = llm_error_response(error)
+            stream.send("error", {"error": response})
+        stream.send("done", {"response": response})
+        stream.close()
+
+    # start_stream kota doluysa beklemeden LLMBusyError firlatir; bu fonksiyon istek (ya da
+    # soket devri) thread'inde cagrildigindan bloklamamalidir.
+    try:
+        llm_client.start_stream(prompt, on_text, on_end)
+    except Exception as e:
+        on_end(e)
 
 def create_rich_response_for_toys(data):
     return {
@@ -293,6 +686,105 @@ def create_rich_response_for_fabric_toys(data):
         "reason": "Bu ulkeler, yumusak ve guvenli kumas oyuncaklara ozel ilgi duyan pazarlardir.",
     }
 
+def load_runtime_modules():
+    global pd, expand_countries_batch, records_frame
+    global CatalogIndex, ProductStore, catalog_record, load_dataset, ModelRegistry, PriceMatrixBuilder, row_key
+    global rank_routes, route_record, CompiledModel, RowTemplates
+    import pandas as pd
+    from model.predict import expand_countries_batch, records_frame
+    from catalog import CatalogIndex, ProductStore, catalog_record
+    from data_cache import load_dataset
+    from model_registry import ModelRegistry
+    from price_matrix import PriceMatrixBuilder, row_key
+    from model.arbitrage import rank_routes, route_record
+    from model.inference import CompiledModel, RowTemplates
+
+def load_service_state():
+    # Adimlarin sureleri /readyz'de gorunur. Sonraki model surumleri servisi durdurmadan
+    # model_registry uzerinden devreye alinir.
+    global ecommerce_df, product_names_data, product_matcher, model_registry, catalog_index, prediction_cache
+    global price_matrix_builder, catalog_delta, catalog_delta_seq
+    with warmup.step("imports"):
+        load_runtime_modules()
+
+    with warmup.step("files"):
+        if not Path(MODEL_PATH).exists():
+            raise FileNotFoundError(f"Model dosyasi bulunamadi: {MODEL_PATH}")
+        if not Path(FEATURES_PATH).exists():
+            raise FileNotFoundError(f"feature_columns.json dosyasi bulunamadi: {FEATURES_PATH}")
+        if not Path(DATA_FILE_PATH).exists():
+            raise FileNotFoundError(f"Veri dosyasi bulunamadi: {DATA_FILE_PATH}. Lutfen dosya adinin ve uzantisinin dogru oldugundan emin olun.")
+
+    with warmup.step("dataset"):
+        ecommerce_df = load_dataset(DATA_FILE_PATH, cache_dir=DATA_CACHE_DIR)
+
+    with warmup.step("product_store"):
+        product_names_data = ProductStore.from_dataframe(ecommerce_df)
+
+    with warmup.step("catalog_delta"):
+        catalog_delta = CatalogDeltaStore(CATALOG_DELTA_PATH)
+        entries = catalog_delta.since(0)
+        if entries:
+            catalog_delta_records.extend(record for _, record in entries)
+            catalog_delta_seq = entries[-1][0]
+            product_names_data = product_names_data.with_records(catalog_delta_records)
+            logging.info(f"Katalog delta kaydindan {len(entries)} kayit uygulandi.")
+
+    with warmup.step("product_matcher"):
+        product_matcher = ProductMatcher(product_names_data.keys())
+
+    logging.info("E-ticaret veri seti basariyla yuklendi.")
+    logging.info(f"Yuklenen benzersiz urun adi sayisi: {len(product_names_data)}")
+
+    with warmup.step("model"):
+        registry = ModelRegistry(MODEL_PATH, FEATURES_PATH, warmup=warm_up_model, engine=INFERENCE_ENGINE)
+        registry.subscribe(on_model_swapped)
+        registry.reload(force=True)
+        model_registry = registry
+
+    with warmup.step("catalog_index"):
+        feature_cols = list(model_registry.current.feature_cols)
+        catalog_index = build_catalog_index(feature_cols)
+        prediction_cache = PredictionCache(feature_cols, maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+    logging.info("ML Model ve feature kolonlari basariyla yuklendi.")
+
+    with warmup.step("row_templates"):
+        row_templates_for(model_registry.current, product_names_data)
+
+    if PRICE_MATRIX != "off":
+        with warmup.step("price_matrix"):
+            price_matrix_builder = PriceMatrixBuilder(DATA_CACHE_DIR)
+            build_price_matrix(model_registry.current, background=PRICE_MATRIX != "sync")
+
+    if MODEL_WATCH_INTERVAL > 0:
+        model_registry.start_watching(MODEL_WATCH_INTERVAL)
+    if CATALOG_POLL_INTERVAL > 0:
+        catalog_delta.start_polling(sync_catalog, CATALOG_POLL_INTERVAL)
+
+    with warmup.step("gemini_client"):
+        try:
+            gemini_model.load()
+        except Exception as e:
+            logging.warning(f"Gemini istemcisi onceden yuklenemedi, ilk sohbet isteginde denenecek: {e}")
+
+def warm_up_service():
+    try:
+        load_service_state()
+    except FileNotFoundError as e:
+        logging.error(f"Dosya yukleme hatasi: {e}. Lutfen tum gerekli dosyalarin dogru yerde oldugundan emin olun.")
+        raise
+    except Exception as e:
+        logging.error(f"Model, feature kolonlari veya veri seti yuklenirken beklenmeyen bir hata olustu: {e}")
+        raise
+
+def start_warmup(background=True):
+    # Birden fazla cagrilabilir; isinma yalnizca bir kez calisir. background=False ise
+    # bitene kadar bekler ve hata yukari firlatilir.
+    return warmup.run(warm_up_service, background=background)
+
+def wait_until_ready(timeout=None):
+    return warmup.wait(timeout)
+
 @app.route("/chat", methods=["POST"])
 def chat():
     data = request.get_json()
@@ -306,24 +798,306 @@ def chat():
     
     return jsonify({"response": response_content})
 
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    # /chat'in akisli hali. Varsayilan SSE (text/event-stream); Accept: application/x-ndjson ya da
+    # ?format=ndjson ile satir basina bir JSON. Olaylar:
+    #   delta {"text"}            Gemini yanitinin gelen parcasi
+    #   price {"predicted_price"}  tahmini fiyat, ardindan
+    #   recommendation {...}      siralanmis ulke onerileri
+    #   message {"response"}      hazir metin ya da oneri
+    #   error {"error"}
+    #   done {"response"}         /chat'in donecegi yanitin tamami; akis kapanir
+    # serve.py altinda bekleyen akis istek thread'i tutmaz (streaming.StreamHub). Gemini kotasi
+    # doluysa akis beklemeden error + done olaylariyla biter; istek thread'i LLM kotasini beklemez.
+    data = request.get_json(silent=True) or {}
+    message = data.get("message", "")
+    session_id = request.remote_addr
+    if request.args.get("format") == "ndjson" or request.accept_mimetypes.best == NDJSON:
+        mimetype = NDJSON
+    else:
+        mimetype = SSE
+
+    if not message.strip():
+        kind, payload = "response", "Mesaj bos."
+    else:
+        kind, payload = plan_chatbot_response(session_id, message)
+    body = stream_hub.start(request.environ, mimetype, lambda stream: stream_chat_response(stream, kind, payload))
+    return Response(body, mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/predict", methods=["POST"])
 def predict():
     try:
         data = request.get_json()
         logging.info(f"Prediction icin alinan veri: {data}")
-        df_input_for_single_country = prepare_dataframe(data)
-        predicted_price_for_input_country = model.predict(df_input_for_single_country)[0]
-        country_recommendations = get_country_recommendations_for_prediction(data, ecommerce_df, model, feature_cols)
-        full_response = {
-            "predicted_price": float(predicted_price_for_input_country),
-            "recommendation_data": country_recommendations 
-        }
+        full_response = predict_price_and_recommendations(data)
         logging.info(f"Tahmin ve Oneri sonucu: {full_response}")
         return jsonify({"response": full_response}) 
     except Exception as e:
         logging.error(f"ML tahmini yapilamadi: {e}")
         return jsonify({"error": str(e)}), 400
 
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl")
+
+def iter_ndjson_products(stream):
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except ValueError as e:
+            yield index, ValueError(f"Gecersiz JSON satiri: {e}")
+        index += 1
+
+def read_batch_products():
+    # NDJSON govde satir satir okunur, tamami bellege alinmaz.
+    # JSON govde bir dizi ya da {"products": [...]} olabilir.
+    if request.mimetype in NDJSON_MIMETYPES:
+        return iter_ndjson_products(request.stream)
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("products")
+    if not isinstance(data, list):
+        return None
+    return enumerate(data)
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    with_recommendations = request.args.get("recommendations", "").lower() in ("1", "true", "evet", "yes")
+    products = read_batch_products()
+    if products is None:
+        return jsonify({"error": "Govde bir urun listesi (JSON dizi) veya NDJSON olmali."}), 400
+
+    def generate():
+        chunk = []
+        for index, product in products:
+            if not isinstance(product, dict):
+                error = product if isinstance(product, Exception) else "Urun bir JSON nesnesi olmali."
+                yield json.dumps({"index": index, "error": str(error)}) + "\n"
+                continue
+            chunk.append((index, product))
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                for result in score_products_chunk(chunk, with_recommendations):
+                    yield json.dumps(result) + "\n"
+                chunk = []
+        if chunk:
+            for result in score_products_chunk(chunk, with_recommendations):
+                yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def catalog_price_chunks(store, rows, countries, version):
+    # (ilk_satir, fiyatlar, kargo_ucretleri) parcalari. Tamamlanmis fiyat matrisi bu model
+    # surumune ve kataloga aitse fiyatlar oradan okunur; degilse parca parca (derlenmis motorda
+    # kodlanmis satir sablonlarindan) tahmin edilir.
+    matrix = price_matrix_builder.current if price_matrix_builder is not None else None
+    use_matrix = (matrix is not None and matrix.complete and matrix.version == version.version
+                  and matrix.countries == countries and len(matrix.keys) == len(store))
+    templates = None if use_matrix else row_templates_for(version, store)
+    shipping_costs = store.shipping_costs
+    for start in range(0, len(rows), ARBITRAGE_CHUNK_SIZE):
+        chunk = rows[start:start + ARBITRAGE_CHUNK_SIZE]
+        if use_matrix:
+            prices = matrix.values[chunk]
+        elif templates is not None:
+            prices = templates.country_matrix(chunk, countries)
+        else:
+            prices = score_country_matrix([country_sweep_base(store.record(row)) for row in chunk], countries, version)
+        yield start, prices, shipping_costs[chunk]
+
+@app.route("/arbitrage", methods=["GET"])
+def arbitrage():
+    # Katalog (ya da ?category=) icin en karli k alis/satis ulke rotasi:
+    # kazanc = satis ulkesi fiyati - alis ulkesi fiyati - shipping_cost.
+    # ?per_product= urun basina en fazla rota, ?min_profit= alt kazanc siniri (USD).
+    k = min(max(request.args.get("k", 10, type=int), 1), ARBITRAGE_MAX_K)
+    per_product = max(request.args.get("per_product", 1, type=int), 1)
+    min_profit = request.args.get("min_profit", 0.0, type=float)
+    category = request.args.get("category") or None
+    version = model_registry.current
+    store, countries = product_names_data, catalog_index.countries
+    rows = store.select_rows(category=category)
+    with timed("arbitrage_search"):
+        ranked = rank_routes(catalog_price_chunks(store, rows, countries, version), k, per_product, min_profit)
+    routes = []
+    for profit, index, buy, sell, buy_price, sell_price, shipping_cost in ranked:
+        product = store.record(int(rows[index]))
+        routes.append({
+            "product_id": product['product_id'],
+            "product_name": product['product_name_clean'],
+            "category": product['category'],
+            **route_record(countries[buy], buy_price, countries[sell], sell_price, shipping_cost, profit),
+        })
+    return jsonify({"model_version": version.version, "products": len(rows), "countries": list(countries),
+                    "routes": routes})
+
+@app.route("/catalog/market", methods=["GET"])
+def catalog_market():
+    # ?country= / ?category= hucresi icin urun sayisi ve kargo ucreti medyani (katalog indeksinden,
+    # O(1)); parametre verilmezse o eksen toplanir. ?feature= ile o ozelligin aday degerleri de doner.
+    index = catalog_index
+    country = request.args.get("country") or None
+    category = request.args.get("category") or None
+    resolved_country, resolved_category = index.canonical("country", country), index.canonical("category", category)
+    if (country and resolved_country is None) or (category and resolved_category is None):
+        return jsonify({"error": "Katalogda olmayan ulke veya kategori."}), 404
+    body = {
+        "country": resolved_country,
+        "category": resolved_category,
+        "products": index.product_count(resolved_country, resolved_category),
+        "shipping_cost_median": catalog_shipping_median(index, resolved_country, resolved_category),
+    }
+    feature = request.args.get("feature")
+    if feature:
+        body["candidates"] = list(index.candidates(feature))
+    return jsonify(body)
+
+@app.route("/predict/cache", methods=["GET"])
+def predict_cache_stats():
+    return jsonify(prediction_cache.stats())
+
+@app.route("/chat/sessions", methods=["GET"])
+def chat_session_stats():
+    return jsonify(chat_state.stats())
+
+@app.route("/chat/cache", methods=["GET"])
+def chat_cache_stats():
+    return jsonify(llm_client.stats())
+
+def collect_service_metrics():
+    status = warmup.status()
+    families = [("service_ready", "gauge", "Baslangic isinmasi tamamlandi mi", [({}, int(warmup.ready))]),
+                ("startup_step_seconds", "gauge", "Baslangic isinmasi adim sureleri (sn)",
+                 [({"step": step["name"]}, step["seconds"]) for step in status["steps"]])]
+    if not warmup.ready:
+        return families
+    families += stats_gauges("prediction_cache", prediction_cache.stats(), "Tahmin onbellegi")
+    families += stats_gauges("llm_cache", llm_client.stats(), "Gemini yanit onbellegi")
+    families += stats_gauges("chat_sessions", chat_state.stats(), "Sohbet oturum store'u")
+    current = model_registry.current.info()
+    families.append(("model_info", "gauge", "Devredeki model surumu",
+                     [({"version": str(current["version"]), "engine": current["engine"]}, 1)]))
+    families += stats_gauges("model", {k: current[k] for k in ("version", "load_seconds", "warmup_seconds")}, "Devredeki model surumu")
+    if price_matrix_builder is not None:
+        families += stats_gauges("price_matrix", price_matrix_builder.stats(), "Urun x ulke fiyat matrisi")
+    templates = row_templates_stats()
+    if templates is not None:
+        families += stats_gauges("row_templates", templates, "Kodlanmis katalog satir sablonlari")
+    families += stats_gauges("event_streams", stream_hub.stats(), "/chat/stream olay akislari")
+    return families
+
+metrics_registry.register_collector(collect_service_metrics)
+instrument_app(app, slow_ms=SLOW_REQUEST_MS, profile_dir=PROFILE_DIR)
+
+READINESS_EXEMPT_ENDPOINTS = {"healthz", "readyz", "metrics"}
+
+@app.before_request
+def require_ready():
+    # Isinma bitmeden gelen istekler beklemez; 503 ve Retry-After ile geri cevrilir.
+    if warmup.ready or request.method == "OPTIONS" or request.endpoint in READINESS_EXEMPT_ENDPOINTS:
+        return None
+    if warmup.failed:
+        return jsonify({"error": "Servis baslatilamadi.", **warmup.status()}), 500
+    return jsonify({"error": "Servis henuz hazir degil, lutfen biraz sonra tekrar deneyin.", **warmup.status()}), 503, {"Retry-After": "1"}
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    # Canlilik: surec ayakta ve isinma basarisiz olmadiysa 200.
+    status = warmup.status()
+    return jsonify({"status": status["status"], "error": status["error"]}), 500 if warmup.failed else 200
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    # Hazirlik: model, katalog ve onbellekler yuklendiyse 200; aksi halde adim ilerlemesiyle 503.
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+def admin_authorized():
+    # ADMIN_TOKEN tanimli degilse yonetim uclari yalnizca ayni makineden (loopback) cagrilabilir.
+    if ADMIN_TOKEN is None:
+        return request.remote_addr in LOOPBACK_ADDRESSES
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode())
+
+@app.route("/admin/model", methods=["GET"])
+def admin_model_info():
+    if not admin_authorized():
+        return jsonify({"error": "Yetkisiz."}), 403
+    price_matrix = price_matrix_builder.stats() if price_matrix_builder is not None else None
+    return jsonify({**model_registry.stats(), "price_matrix": price_matrix, "row_templates": row_templates_stats()})
+
+@app.route("/admin/model/reload", methods=["POST"])
+def admin_model_reload():
+    # Varsayilan: arka planda yukle, 202 don. ?wait=1 ile yukleme bitene kadar bekler.
+    # ?force=1 dosyalar degismemis olsa da yeniden yukler.
+    if not admin_authorized():
+        return jsonify({"error": "Yetkisiz."}), 403
+    force = request.args.get("force", "").lower() in ("1", "true", "evet", "yes")
+    if request.args.get("wait", "").lower() not in ("1", "true", "evet", "yes"):
+        started = model_registry.reload_async(force=force)
+        return jsonify({"started": started, **model_registry.stats()}), 202
+    try:
+        loaded = model_registry.reload(force=force)
+    except Exception as e:
+        return jsonify({"error": str(e), **model_registry.stats()}), 500
+    return jsonify({"reloaded": loaded is not None, **model_registry.stats()})
+
+def catalog_stats():
+    index = catalog_index
+    return {
+        "products": len(product_names_data),
+        "countries": len(index.countries),
+        "categories": len(index.categories),
+        "applied_seq": catalog_delta_seq,
+        "delta": catalog_delta.stats(),
+    }
+
+@app.route("/admin/catalog", methods=["GET"])
+def admin_catalog_info():
+    if not admin_authorized():
+        return jsonify({"error": "Yetkisiz."}), 403
+    return jsonify(catalog_stats())
+
+@app.route("/admin/catalog", methods=["POST"])
+def admin_catalog_ingest():
+    # Govde /predict/batch ile ayni bicimde (JSON dizi, {"products": [...]} ya da NDJSON).
+    # Gecerli urunler delta kaydina yazilir ve bu surece hemen uygulanir; diger worker'lar
+    # CATALOG_POLL_INTERVAL icinde alir. Ayni ada sahip urun guncellenir.
+    if not admin_authorized():
+        return jsonify({"error": "Yetkisiz."}), 403
+    products = read_batch_products()
+    if products is None:
+        return jsonify({"error": "Govde bir urun listesi (JSON dizi) veya NDJSON olmali."}), 400
+    records, rejected = [], []
+    for index, product in products:
+        try:
+            if isinstance(product, Exception):
+                raise product
+            if not isinstance(product, dict):
+                raise ValueError("Urun bir JSON nesnesi olmali.")
+            records.append(catalog_record(product))
+        except ValueError as e:
+            rejected.append({"index": index, "error": str(e)})
+    names = {record['product_name_clean'].lower() for record in records}
+    updated = sum(1 for name in names if name in product_names_data)
+    if records:
+        catalog_delta.append(records)
+        sync_catalog()
+    return jsonify({"accepted": len(records), "added": len(names) - updated, "updated": updated,
+                    "rejected": rejected, **catalog_stats()})
+
+if BACKEND_WARMUP == "sync":
+    try:
+        start_warmup(background=False)
+    except Exception:
+        exit(1)
+elif BACKEND_WARMUP != "manual":
+    start_warmup()
+
 if __name__ == "__main__":
     app.run(port=5000, debug=True)
 
@@ -0,0 +1,82 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "model"))
+
+import joblib
+
+from inference import RowTemplates, compile_model
+from predict import DEFAULT_COUNTRIES, expand_countries_batch, load_model_and_features
+
+
+# Derlenmis motorda ulke taramasi: DataFrame kurup kodlama, dict'leri dogrudan kodlama
+# (encode_records) ve onceden kodlanmis satir sablonlari (RowTemplates) karsilastirmasi.
+#
+#   python bench_encoding.py --rows 1 100 10000
+
+def make_bases(n_rows, data_path, feature_cols):
+    base = pd.read_excel(data_path)
+    base["product_name_clean"] = base["product_name"].str.lower()
+    base["category_clean"] = base["category"].str.lower()
+    base["month"] = base["last_updated"].dt.month
+    reps = -(-n_rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).head(n_rows)
+    cols = [col for col in feature_cols if col != "country" and col in df.columns]
+    return [{col: (value.item() if isinstance(value, np.generic) else value) for col, value in record.items()}
+            for record in df[cols].to_dict("records")]
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description="Ulke taramasinda girdi kodlama maliyeti (derlenmis motor)")
+    ap.add_argument("--model_path", default=str(ROOT / "model" / "model.joblib"))
+    ap.add_argument("--features_path", default=str(ROOT / "model" / "feature_columns.json"))
+    ap.add_argument("--data_path", default=str(ROOT / "synthetic_ecommerce_data.xlsx"))
+    ap.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10_000])
+    args = ap.parse_args()
+
+    _, feature_cols = load_model_and_features(args.model_path, args.features_path)
+    compiled = compile_model(joblib.load(args.model_path))
+    countries = list(DEFAULT_COUNTRIES)
+
+    print(f"{'urun':>7} {'dataframe_ms':>13} {'encode_ms':>10} {'sablon_ms':>10} {'hizlanma':>9} {'max_fark':>9}")
+    for n_rows in args.rows:
+        bases = make_bases(n_rows, args.data_path, feature_cols)
+        start = time.perf_counter()
+        templates = RowTemplates.from_records(compiled, bases, range(len(bases)))
+        build_s = time.perf_counter() - start
+        rows = np.arange(len(bases))
+
+        def dataframe_path():
+            df = expand_countries_batch(bases, countries)
+            for col in feature_cols:
+                if col not in df.columns:
+                    df[col] = None
+            return compiled.predict(df[feature_cols]).reshape(len(bases), len(countries))
+
+        def encode_path():
+            Z = compiled.expand_countries(compiled.encode_records(bases), countries)
+            return compiled.predict_encoded(Z).reshape(len(bases), len(countries))
+
+        repeat = 50 if n_rows <= 100 else 3
+        dataframe_s = timeit(dataframe_path, repeat)
+        encode_s = timeit(encode_path, repeat)
+        template_s = timeit(lambda: templates.country_matrix(rows, countries), repeat)
+        diff = float(np.max(np.abs(dataframe_path() - templates.country_matrix(rows, countries))))
+        print(f"{n_rows:>7} {dataframe_s * 1000:>13.3f} {encode_s * 1000:>10.3f} {template_s * 1000:>10.3f} "
+              f"{dataframe_s / template_s:>8.1f}x {diff:>9.2g}   (sablon kurulumu {build_s * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
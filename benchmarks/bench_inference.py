@@ -0,0 +1,58 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "model"))
+
+import joblib
+
+from inference import compile_model
+from predict import coerce_types_and_align, load_model_and_features
+
+
+def make_frame(n_rows, data_path):
+    base = pd.read_excel(data_path)
+    base["product_name_clean"] = base["product_name"].str.lower()
+    base["country_clean"] = base["country"].str.lower()
+    base["category_clean"] = base["category"].str.lower()
+    base["month"] = base["last_updated"].dt.month
+    reps = -(-n_rows // len(base))
+    return pd.concat([base] * reps, ignore_index=True).head(n_rows)
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description="sklearn ve derlenmis (NumPy) tahmin motoru karsilastirmasi")
+    ap.add_argument("--model_path", default=str(ROOT / "model" / "model.joblib"))
+    ap.add_argument("--features_path", default=str(ROOT / "model" / "feature_columns.json"))
+    ap.add_argument("--data_path", default=str(ROOT / "synthetic_ecommerce_data.xlsx"))
+    ap.add_argument("--rows", type=int, nargs="+", default=[1, 6, 100, 10_000, 100_000])
+    args = ap.parse_args()
+
+    model, feature_cols = load_model_and_features(args.model_path, args.features_path)
+    start = time.perf_counter()
+    compiled = compile_model(joblib.load(args.model_path))
+    print(f"derleme + parite kontrolu: {time.perf_counter() - start:.2f} sn, {compiled.info()}")
+
+    print(f"{'satir':>9} {'sklearn_ms':>11} {'derlenmis_ms':>13} {'hizlanma':>9} {'max_fark':>9}")
+    for n_rows in args.rows:
+        X = coerce_types_and_align(make_frame(n_rows, args.data_path), feature_cols)
+        repeat = 50 if n_rows <= 100 else 3
+        sklearn_s = timeit(lambda: model.predict(X), repeat)
+        compiled_s = timeit(lambda: compiled.predict(X), repeat)
+        diff = float(np.max(np.abs(model.predict(X) - compiled.predict(X))))
+        print(f"{n_rows:>9} {sklearn_s * 1000:>11.3f} {compiled_s * 1000:>13.3f} {sklearn_s / compiled_s:>8.1f}x {diff:>9.2g}")
+
+if __name__ == "__main__":
+    main()
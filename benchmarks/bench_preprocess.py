@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "model"))
+
+from preprocess import FeaturePreprocessor
+
+
+def legacy_coerce_types_and_align(df: pd.DataFrame, feature_cols):
+    # model/predict.py'deki onceki coerce_types_and_align (karsilastirma icin).
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            s = df[col].astype(str).str.lower()
+            if s.isin(["true", "false"]).any():
+                df.loc[s.eq("true"), col] = True
+                df.loc[s.eq("false"), col] = False
+                df[col] = df[col].astype("boolean").astype(bool)
+            else:
+                try:
+                    df[col] = pd.to_numeric(df[col])
+                except Exception:
+                    pass
+    for c in feature_cols:
+        if c not in df.columns:
+            df[c] = np.nan
+    df = df[feature_cols]
+    return df
+
+def make_frame(n_rows, data_path):
+    base = pd.read_excel(data_path)
+    base["product_name_clean"] = base["product_name"].str.lower()
+    base["month"] = base["last_updated"].dt.month
+    reps = -(-n_rows // len(base))
+    return pd.concat([base] * reps, ignore_index=True).head(n_rows)
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description="coerce_types_and_align mikro benchmark'i")
+    ap.add_argument("--features_path", default=str(ROOT / "model" / "feature_columns.json"))
+    ap.add_argument("--data_path", default=str(ROOT / "synthetic_ecommerce_data.xlsx"))
+    ap.add_argument("--rows", type=int, nargs="+", default=[1, 1_000_000])
+    args = ap.parse_args()
+
+    with open(args.features_path, "r", encoding="utf-8") as f:
+        feature_cols = json.load(f)
+    preprocessor = FeaturePreprocessor(feature_cols)
+
+    print(f"{'satir':>9} {'onceki_ms':>11} {'yeni_ms':>9} {'hizlanma':>9}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows, args.data_path)
+        repeat = 200 if n_rows <= 100 else 3
+        legacy_s = timeit(lambda: legacy_coerce_types_and_align(df, feature_cols), repeat)
+        new_s = timeit(lambda: preprocessor.transform(df), repeat)
+        print(f"{n_rows:>9} {legacy_s * 1000:>11.3f} {new_s * 1000:>9.3f} {legacy_s / new_s:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
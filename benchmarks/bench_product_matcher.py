@@ -0,0 +1,71 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from product_matcher import ProductMatcher
+
+WORDS = [
+    "last", "phone", "age", "shoes", "smart", "watch", "wireless", "speaker", "cotton", "shirt",
+    "kitchen", "knife", "set", "yoga", "mat", "lego", "car", "toy", "face", "cream", "running",
+    "jacket", "coffee", "maker", "gaming", "mouse", "steel", "bottle", "baby", "doll",
+]
+
+
+def make_catalog(n_products, seed):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n_products:
+        n_words = rng.randint(2, 4)
+        names.add(" ".join(rng.choice(WORDS) for _ in range(n_words)) + f" {rng.randint(0, 10 ** 6)}")
+    return list(names)
+
+def make_messages(names, n_messages, seed):
+    rng = random.Random(seed + 1)
+    messages = []
+    for i in range(n_messages):
+        if i % 2 == 0:
+            messages.append(f"merhaba, {rng.choice(names)} icin fiyat tahmini alabilir miyim?")
+        else:
+            messages.append("merhaba, " + " ".join(rng.choice(WORDS) for _ in range(8)) + " ihracat icin hangi ulke?")
+    return messages
+
+def linear_scan(names, message):
+    for name in names:
+        if name in message:
+            return name
+    return None
+
+def main():
+    ap = argparse.ArgumentParser(description="Urun adi eslestirme benchmark'i (lineer tarama vs Aho-Corasick)")
+    ap.add_argument("--products", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--messages", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    print(f"{'urun':>8} {'kurulum_s':>10} {'lineer_ms/msj':>14} {'ac_ms/msj':>10} {'hizlanma':>9}")
+    for n_products in args.products:
+        names = make_catalog(n_products, args.seed)
+        messages = make_messages(names, args.messages, args.seed)
+
+        t0 = time.perf_counter()
+        matcher = ProductMatcher(names)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for message in messages:
+            linear_scan(names, message)
+        linear_ms = (time.perf_counter() - t0) * 1000 / len(messages)
+
+        t0 = time.perf_counter()
+        for message in messages:
+            matcher.longest_match(message)
+        matcher_ms = (time.perf_counter() - t0) * 1000 / len(messages)
+
+        print(f"{n_products:>8} {build_s:>10.2f} {linear_ms:>14.3f} {matcher_ms:>10.3f} {linear_ms / matcher_ms:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
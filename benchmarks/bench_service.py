@@ -0,0 +1,357 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# /predict ve /chat icin gecikme ve verim benchmark'i. Her katalog boyutu ve her mod icin
+# ayri bir surec baslatilir (RSS olcumleri birbirine karismasin):
+#   inproc: backend ayni surecte yuklenir, istekler Flask test istemcisiyle gonderilir.
+#   http:   backend serve.py'nin thread havuzlu sunucusuyla calisir, istekler yerel HTTP ile gelir.
+# Gemini her iki modda da llm_client.FakeGenerativeModel ile degistirilir.
+#
+#   python benchmarks/bench_service.py --sizes 1000 10000 100000 --output sonuc.json
+#   python benchmarks/bench_service.py --compare onceki.json --output yeni.json
+
+ENDPOINTS = ("predict_cold", "predict_cached", "chat_match", "chat_confirm", "chat_llm")
+NOUNS = ("Phone", "Speaker", "T-shirt", "Shoes", "Laptop", "Watch", "Blender", "Puzzle", "Jacket", "Ball",
+         "Camera", "Lamp", "Backpack", "Headphones", "Kettle", "Doll", "Racket", "Mug", "Tablet", "Scarf")
+SYLLABLES = ("ka", "lo", "mi", "ter", "va", "no", "rex", "pi", "san", "dor", "li", "ma", "zu", "ben", "tor", "ra")
+
+
+def make_catalog(n_rows, base_path, seed=0):
+    # Kaynak veri setinin semasinda sentetik katalog: satirlar kaynaktan (ulke/sehir/para birimi
+    # tutarli kalsin diye) yerine koyarak orneklenir; urun kimlikleri, adlari, fiyat ve kargo
+    # ucretleri yeniden uretilir. Benzersiz ad orani kaynaktakine (~%48) yakin tutulur.
+    rng = np.random.default_rng(seed)
+    base = pd.read_excel(base_path)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    n_names = max(1, int(n_rows * len(base["product_name"].unique()) / len(base)))
+    syllables = np.array(SYLLABLES)
+    words = ["".join(syllables[rng.integers(0, len(syllables), 3)]).title() for _ in range(n_names)]
+    names = [f"{w} {NOUNS[i % len(NOUNS)]}" for i, w in enumerate(words)]
+    df["product_id"] = [f"P{i:08x}" for i in rng.permutation(n_rows)]
+    df["product_name"] = np.array(names, dtype=object)[rng.integers(0, n_names, n_rows)]
+    ratio = (df["price_usd"] / df["price"]).fillna(1.0)
+    df["price"] = np.round(rng.uniform(5, 500, n_rows), 2)
+    df["price_usd"] = np.round(df["price"] * ratio, 2)
+    df["shipping_cost"] = np.round(rng.uniform(0, 20, n_rows), 2)
+    return df
+
+def catalog_records(catalog_path):
+    df = pd.read_csv(catalog_path)
+    df["product_name_clean"] = df["product_name"].str.strip().str.lower()
+    df["month"] = pd.to_datetime(df["last_updated"]).dt.month
+    cols = ["product_name_clean", "category", "brand", "country", "city", "shipping_cost", "seller", "stock", "platform", "month"]
+    return df[cols].drop_duplicates("product_name_clean").to_dict("records")
+
+def session_address(i):
+    # Her sanal kullanici ayri bir oturum: /chat oturumu istemci adresine baglidir.
+    i += 2
+    return f"127.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+def build_flows(records, endpoint, n, seed=0):
+    # Akis: ayni oturumdan sirayla gonderilen (etiket, yol, govde) istekleri.
+    rng = np.random.default_rng(seed)
+    picks = [records[i] for i in rng.integers(0, len(records), n)]
+    if endpoint == "predict_cold":
+        # Her istek farkli kargo ucreti tasir: tahmin onbellegine dusmez.
+        return [[("predict_cold", "/predict", {**p, "shipping_cost": round(float(rng.uniform(0, 20)), 4)})] for p in picks]
+    if endpoint == "predict_cached":
+        hot = records[:8]  # isinma ile ayni urunler: olcumde yalnizca onbellek isabeti kalir
+        return [[("predict_cached", "/predict", hot[i % len(hot)])] for i in range(n)]
+    if endpoint == "chat_match":
+        return [[("chat_match", "/chat", {"message": f"{p['product_name_clean']} icin fiyat"}),
+                 ("chat_confirm", "/chat", {"message": "evet"})] for p in picks]
+    if endpoint == "chat_llm":
+        return [[("chat_llm", "/chat", {"message": f"Ihracat icin hangi belgeler gerekir? ({i})"})] for i in range(n)]
+    raise ValueError(endpoint)
+
+
+class RSSSampler:
+    # Verilen surecin RSS'ini arka planda orneklerek tepe degeri tutar (Linux /proc).
+
+    def __init__(self, pid, interval=0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def read_kb(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        if self.pid == os.getpid():
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self.read_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_kb = self.read_kb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, self.read_kb())
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_kb / 1024, 1) if self.peak_kb else None
+
+
+def run_flows(flows, concurrency, send, session_offset=0):
+    # Akislari concurrency thread'e dagitir; her istegin gecikmesi etiketine gore toplanir.
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def run(i):
+        flow = flows[i]
+        session = session_address(session_offset + i)
+        for label, path, body in flow:
+            start = time.perf_counter()
+            try:
+                ok = send(session, path, body)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.setdefault(label, []).append(elapsed)
+                if not ok:
+                    errors[label] = errors.get(label, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, range(len(flows))))
+    return latencies, errors, time.perf_counter() - start
+
+def summarize(label, latencies, errors, wall, peak_mb):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "endpoint": label,
+        "requests": len(ms),
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "rps": round(len(ms) / wall, 1),
+        "peak_rss_mb": peak_mb,
+    }
+
+def measure(endpoints, records, args, send, pid):
+    results = []
+    for i, endpoint in enumerate(endpoints):
+        if endpoint == "chat_confirm":
+            continue  # chat_match akisinin ikinci adimi olarak olculur
+        # Isinma istekleri olcume katilmaz; her adimin oturum adresleri digerleriyle cakismaz.
+        offset = i * 2 * (args.warmup + args.requests)
+        warm = build_flows(records, endpoint, args.warmup, seed=args.seed + 1000 + i)
+        run_flows(warm, args.concurrency, send, session_offset=offset)
+        flows = build_flows(records, endpoint, args.requests, seed=args.seed + i)
+        with RSSSampler(pid) as rss:
+            latencies, errors, wall = run_flows(flows, args.concurrency, send, session_offset=offset + args.warmup)
+        for label in latencies:
+            results.append(summarize(label, latencies[label], errors.get(label, 0), wall, rss.peak_mb))
+    return results
+
+
+def import_backend(args):
+    # Backend'i verilen katalogla yukler ve Gemini'yi sahte modelle degistirir.
+    os.environ["DATA_FILE_PATH"] = str(args.catalog)
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ["BACKEND_WARMUP"] = "sync"  # startup_s: import + isinma, servis hazir olana kadar
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    start = time.perf_counter()
+    import backend
+    from llm_client import FakeGenerativeModel
+    startup_s = time.perf_counter() - start
+    backend.llm_client.client.model = FakeGenerativeModel(latency=args.llm_latency)
+    return backend, startup_s
+
+def worker_inproc(args):
+    backend, startup_s = import_backend(args)
+    records = catalog_records(args.catalog)
+    local = threading.local()
+
+    def send(session, path, body):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = backend.app.test_client()
+        response = client.post(path, json=body, environ_base={"REMOTE_ADDR": session})
+        return response.status_code == 200
+
+    rss_mb = RSSSampler(os.getpid()).read_kb() / 1024
+    results = measure(args.endpoints, records, args, send, os.getpid())
+    print(json.dumps({"startup_s": round(startup_s, 3), "rss_after_load_mb": round(rss_mb, 1), "endpoints": results}))
+
+def worker_http(args):
+    backend, startup_s = import_backend(args)
+    from serve import PooledWSGIServer
+    server = PooledWSGIServer("127.0.0.1", 0, backend.app, threads=args.threads)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start())
+    rss_mb = RSSSampler(os.getpid()).read_kb() / 1024
+    print(json.dumps({"port": server.server_port, "startup_s": round(startup_s, 3), "rss_after_load_mb": round(rss_mb, 1)}), flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+
+def http_sender(port):
+    def send(session, path, body):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60, source_address=(session, 0))
+        try:
+            conn.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            return response.status == 200
+        finally:
+            conn.close()
+    return send
+
+
+def worker_command(args, mode, catalog):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--_worker", mode, "--catalog", str(catalog),
+           "--requests", str(args.requests), "--warmup", str(args.warmup), "--concurrency", str(args.concurrency),
+           "--threads", str(args.threads), "--llm_latency", str(args.llm_latency), "--seed", str(args.seed),
+           "--endpoints", *args.endpoints]
+    return cmd
+
+def run_mode(args, mode, catalog):
+    stderr = None if args.verbose else subprocess.DEVNULL
+    cmd = worker_command(args, mode, catalog)
+    if mode == "inproc":
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True, check=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+    try:
+        ready = json.loads(proc.stdout.readline())
+        records = catalog_records(catalog)
+        results = measure(args.endpoints, records, args, http_sender(ready["port"]), proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {"startup_s": ready["startup_s"], "rss_after_load_mb": ready["rss_after_load_mb"], "endpoints": results}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current, baseline, threshold):
+    # p95 gecikmesi ya da RPS esikten fazla kotulesen satirlari isaretler.
+    def key(r):
+        return (r["catalog_rows"], r["mode"], r["endpoint"])
+    before = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\n{'katalog':>8} {'mod':>7} {'endpoint':>15} {'p95 once':>9} {'p95 simdi':>10} {'rps once':>9} {'rps simdi':>10}")
+    for r in current["results"]:
+        old = before.get(key(r))
+        if old is None:
+            continue
+        worse = r["p95_ms"] > old["p95_ms"] * (1 + threshold) or r["rps"] < old["rps"] * (1 - threshold)
+        regressions += worse
+        print(f"{r['catalog_rows']:>8} {r['mode']:>7} {r['endpoint']:>15} {old['p95_ms']:>9.2f} {r['p95_ms']:>10.2f} "
+              f"{old['rps']:>9.1f} {r['rps']:>10.1f}{'  GERILEME' if worse else ''}")
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="/predict ve /chat gecikme/verim benchmark'i")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Sentetik katalog satir sayilari")
+    ap.add_argument("--modes", nargs="+", choices=["inproc", "http"], default=["inproc", "http"])
+    ap.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    ap.add_argument("--requests", type=int, default=300, help="Endpoint basina olculen istek (akis) sayisi")
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4, help="Es zamanli istemci sayisi")
+    ap.add_argument("--threads", type=int, default=8, help="http modunda sunucu thread sayisi")
+    ap.add_argument("--llm_latency", type=float, default=0.05, help="Sahte Gemini yanit gecikmesi (sn)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--data_path", default=str(ROOT / "synthetic_ecommerce_data.xlsx"), help="Sema ve dagilim kaynagi")
+    ap.add_argument("--work_dir", default=str(ROOT / ".cache" / "bench"), help="Uretilen kataloglarin yazilacagi klasor")
+    ap.add_argument("--output", default=None, help="Sonuc JSON dosyasi")
+    ap.add_argument("--compare", default=None, help="Karsilastirilacak onceki sonuc JSON dosyasi")
+    ap.add_argument("--threshold", type=float, default=0.15, help="Gerileme esigi (oran)")
+    ap.add_argument("--verbose", action="store_true", help="Worker loglarini goster")
+    ap.add_argument("--_worker", choices=["inproc", "http"], help=argparse.SUPPRESS)
+    ap.add_argument("--catalog", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._worker == "inproc":
+        return worker_inproc(args)
+    if args._worker == "http":
+        return worker_http(args)
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "inference_engine": os.getenv("INFERENCE_ENGINE", "sklearn"),
+            "args": {k: v for k, v in vars(args).items() if not k.startswith("_") and k != "catalog"},
+        },
+        "runs": [],
+        "results": [],
+    }
+    print(f"{'katalog':>8} {'mod':>7} {'endpoint':>15} {'istek':>6} {'hata':>5} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'rps':>8} {'rss_mb':>7}")
+    for size in args.sizes:
+        catalog = work_dir / f"catalog-{size}-{args.seed}.csv"
+        if not catalog.exists():
+            make_catalog(size, args.data_path, seed=args.seed).to_csv(catalog, index=False)
+        for mode in args.modes:
+            run = run_mode(args, mode, catalog)
+            report["runs"].append({"catalog_rows": size, "mode": mode, "startup_s": run["startup_s"],
+                                   "rss_after_load_mb": run["rss_after_load_mb"]})
+            for r in run["endpoints"]:
+                r = {"catalog_rows": size, "mode": mode, **r}
+                report["results"].append(r)
+                print(f"{size:>8} {mode:>7} {r['endpoint']:>15} {r['requests']:>6} {r['errors']:>5} {r['p50_ms']:>8.2f} "
+                      f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rps']:>8.1f} {r['peak_rss_mb'] or 0:>7.1f}")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSonuclar yazildi: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{regressions} satirda gerileme var.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Baslangic suresi olcumu:
+#   1) python -X importtime ile "import backend" (isinma yok) ve "import backend + isinma"
+#      icin en pahali modulleri listeler.
+#   2) serve.py'yi (varsayilan ve --lazy) baslatip /healthz ve /readyz'in ilk 200 donus
+#      surelerini olcer.
+#
+#   python benchmarks/bench_startup.py --top 15 --output baslangic.json
+
+SCENARIOS = {
+    "import": "import backend",
+    "import+isinma": "import backend; backend.start_warmup(background=False)",
+}
+
+
+def child_env():
+    env = dict(os.environ, BACKEND_WARMUP="manual", PYTHONPATH=str(ROOT))
+    env.setdefault("GOOGLE_API_KEY", "benchmark")
+    return env
+
+def import_profile(code, top):
+    # -X importtime ciktisi: "import time: self [us] | cumulative | imported package"
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=child_env(),
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"module": name[1:].rstrip(), "self_ms": int(self_us) / 1000,
+                        "cumulative_ms": int(cumulative_us) / 1000})
+    roots = [m for m in modules if not m["module"].startswith(" ")]
+    return {
+        "wall_s": round(wall, 3),
+        "imports_ms": round(sum(m["cumulative_ms"] for m in roots), 1),
+        "n_modules": len(modules),
+        "top_cumulative": sorted(roots, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "top_self": sorted(({**m, "module": m["module"].strip()} for m in modules),
+                           key=lambda m: m["self_ms"], reverse=True)[:top],
+    }
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def get_status(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    try:
+        conn.request("GET", path)
+        return conn.getresponse().status
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+def serve_startup(workers, lazy, timeout):
+    port = free_port()
+    cmd = [sys.executable, str(ROOT / "serve.py"), "--port", str(port), "--workers", str(workers)]
+    if lazy:
+        cmd.append("--lazy")
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    live_s = ready_s = None
+    try:
+        while time.perf_counter() - start < timeout and proc.poll() is None:
+            if live_s is None and get_status(port, "/healthz") == 200:
+                live_s = time.perf_counter() - start
+            if live_s is not None and get_status(port, "/readyz") == 200:
+                ready_s = time.perf_counter() - start
+                break
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {"mode": "lazy" if lazy else "preload", "workers": workers,
+            "live_s": round(live_s, 3) if live_s is not None else None,
+            "ready_s": round(ready_s, 3) if ready_s is not None else None}
+
+def main():
+    ap = argparse.ArgumentParser(description="Backend baslangic suresi ve import profili")
+    ap.add_argument("--top", type=int, default=10, help="Listelenecek en pahali modul sayisi")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--skip_serve", action="store_true", help="Yalnizca import profilini cikar")
+    ap.add_argument("--output", help="Sonuclari JSON olarak yaz")
+    args = ap.parse_args()
+
+    report = {"imports": {}, "serve": []}
+    for label, code in SCENARIOS.items():
+        profile = import_profile(code, args.top)
+        report["imports"][label] = profile
+        print(f"\n[{label}] sure {profile['wall_s']:.2f} sn, importlar {profile['imports_ms']:.0f} ms, "
+              f"{profile['n_modules']} modul")
+        print(f"{'modul':<40} {'kumulatif_ms':>13} {'kendi_ms':>9}")
+        for m in profile["top_cumulative"]:
+            print(f"{m['module']:<40} {m['cumulative_ms']:>13.1f} {m['self_ms']:>9.1f}")
+
+    if not args.skip_serve:
+        print(f"\n{'mod':<8} {'worker':>6} {'canli_sn':>9} {'hazir_sn':>9}")
+        for lazy in (False, True):
+            for _ in range(args.repeat):
+                run = serve_startup(args.workers, lazy, args.timeout)
+                report["serve"].append(run)
+                fmt = lambda v: f"{v:>9.3f}" if v is not None else f"{'-':>9}"
+                print(f"{run['mode']:<8} {run['workers']:>6} {fmt(run['live_s'])} {fmt(run['ready_s'])}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
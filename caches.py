@@ -0,0 +1,220 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_MISSING = object()
+_ABSENT = ...  # anahtar hic verilmemis (None'dan farkli; varsayilanlar buna gore secilir)
+
+
+class LRUCache:
+    # Thread-safe, boyutu sinirli LRU onbellek; istege bagli TTL (saniye) destekler.
+    # Sayaclar stats() ile okunur.
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize pozitif olmali")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value, generation=None):
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # Hesaplama surerken onbellek bosaltildi; eski sonucu geri yazma.
+                return
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        generation = self._generation
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, generation=generation)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _canonical_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, str):
+        # Bosluklar korunur: model "LG " ile "LG"yi farkli kategori olarak gorur.
+        return value
+    return str(value)
+
+
+class PredictionCache(LRUCache):
+    # Anahtar, model surumu ve feature_cols sirasiyla normalize edilmis feature vektorudur: takas
+    # ile istek arasinda baska modelin sonucu okunamaz ya da yazilamaz. Farkli bir model nesnesi
+    # gorulunce eski surumun (artik okunmayacak) girdileri bosaltilir.
+
+    def __init__(self, feature_cols, maxsize=4096, ttl=None, clock=time.monotonic):
+        super().__init__(maxsize=maxsize, ttl=ttl, clock=clock)
+        self.feature_cols = list(feature_cols)
+        self._model = None
+
+    def key_for(self, data: dict, version=None, feature_cols=None):
+        feature_cols = self.feature_cols if feature_cols is None else feature_cols
+        return (version,) + tuple(_canonical_value(data[col]) if col in data else _ABSENT for col in feature_cols)
+
+    def bind_model(self, model, feature_cols=None):
+        if model is not self._model:
+            if self._model is not None:
+                self.clear()
+            if feature_cols is not None:
+                self.feature_cols = list(feature_cols)
+            self._model = model
+
+
+class SingleFlight:
+    # Ayni anahtar icin es zamanli cagrilari birlestirir: ilk cagiran fonksiyonu calistirir,
+    # digerleri onun sonucunu (ya da hatasini) bekler.
+
+    class _Call:
+        __slots__ = ("event", "value", "error")
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class SQLiteCache:
+    # Surec disi kalici onbellek katmani (anahtar -> JSON deger). Birden fazla surec
+    # ayni dosyayi paylasabilir; TTL yazma zamanina gore uygulanir.
+
+    def __init__(self, path, ttl=None, table="cache"):
+        import sqlite3
+        self.path = str(path)
+        self.ttl = ttl
+        self.table = table
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._sqlite3 = sqlite3
+        with self._conn() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # fork sonrasi ust surecin baglantisi kullanilmaz.
+            conn = self._sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute(f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        value, created = row
+        if self.ttl is not None and created + self.ttl < time.time():
+            with self._conn() as conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return default
+        return json.loads(value)
+
+    def put(self, key, value):
+        with self._conn() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, created) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), time.time()))
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
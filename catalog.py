@@ -0,0 +1,410 @@
+import hashlib
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+
+def _freeze(arr):
+    arr = np.ascontiguousarray(arr)
+    arr.setflags(write=False)
+    return arr
+
+def _source_column(df: pd.DataFrame, feature: str):
+    # *_clean feature'lari veri setinde yoksa ham kolondan okunur (product_name_clean -> product_name).
+    if feature in df.columns:
+        return feature
+    if feature.endswith("_clean") and feature[:-len("_clean")] in df.columns:
+        return feature[:-len("_clean")]
+    return None
+
+def _record_value(record, feature):
+    # _source_column'un kayit (dict) karsiligi.
+    if feature in record:
+        return record[feature]
+    if feature.endswith("_clean"):
+        return record.get(feature[:-len("_clean")])
+    return None
+
+def _median(values):
+    values = values[~np.isnan(values)]
+    return np.median(values) if len(values) else np.nan
+
+def _present(value):
+    return value is not None and not (isinstance(value, float) and math.isnan(value)) and value != ""
+
+_BOOL_TOKENS = {"true": True, "false": False}
+
+def _parse_stock(value):
+    # model/preprocess.py'deki bool donusumuyle ayni: true/false metinleri (buyuk/kucuk harf
+    # duyarsiz), sayilar ve sayisal metinler (0 -> False). JSON/CSV'den gelen "false" True olmaz.
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, str):
+        token = value.strip().lower()
+        if token in _BOOL_TOKENS:
+            return _BOOL_TOKENS[token]
+        try:
+            value = float(token)
+        except ValueError:
+            raise ValueError(f"Gecersiz stock: {value!r}")
+    try:
+        return bool(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"Gecersiz stock: {value!r}")
+
+def catalog_record(raw):
+    # Disaridan gelen (API, CLI, CSV satiri) urunu ProductStore kayit bicimine getirir.
+    # product_name (ya da product_name_clean), category ve country zorunludur; eksik metin
+    # alanlari bos, stock True, month last_updated'dan ya da bugunden alinir.
+    name = raw.get("product_name_clean") if _present(raw.get("product_name_clean")) else raw.get("product_name")
+    if not _present(name) or not str(name).strip():
+        raise ValueError("product_name zorunlu.")
+    name = str(name).strip()
+    for field in ("category", "country"):
+        if not _present(raw.get(field)):
+            raise ValueError(f"{field} zorunlu.")
+
+    try:
+        shipping_cost = float(raw["shipping_cost"]) if _present(raw.get("shipping_cost")) else 0.0
+    except (TypeError, ValueError):
+        raise ValueError(f"Gecersiz shipping_cost: {raw.get('shipping_cost')!r}")
+    if math.isnan(shipping_cost):
+        shipping_cost = 0.0
+
+    if _present(raw.get("month")):
+        month = raw["month"]
+    elif _present(raw.get("last_updated")):
+        month = pd.Timestamp(raw["last_updated"]).month
+    else:
+        month = datetime.now().month
+    try:
+        month = int(month)
+    except (TypeError, ValueError):
+        raise ValueError(f"Gecersiz month: {month!r}")
+    if not 1 <= month <= 12:
+        raise ValueError(f"Gecersiz month: {month}")
+
+    text = {field: str(raw[field]).strip() if _present(raw.get(field)) else "" for field in ProductStore.TEXT_FIELDS}
+    return {
+        'product_id': text['product_id'] or "P" + hashlib.md5(name.lower().encode()).hexdigest()[:8],
+        'product_name_clean': name,
+        'category': text['category'],
+        'brand': text['brand'],
+        'country': text['country'],
+        'shipping_cost': shipping_cost,
+        'city': text['city'],
+        'seller': text['seller'],
+        'stock': _parse_stock(raw["stock"]) if _present(raw.get("stock")) else True,
+        'platform': text['platform'],
+        'month': month,
+    }
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    # Degismez arama tablolari; katalog buyudukce with_records ile yenisi uretilir.
+    # Ulke/kategori kodlari pd.factorize ile veri setindeki ilk gorulme sirasina gore verilir.
+    # row_*: gecerli satirlarin ulke/kategori kodlari ve kargo ucretleri (medyan guncellemesi icin).
+    # Istek yolunda: canonical() girdi degerini katalogdaki yazimina (buyuk/kucuk harf, bosluk
+    # duyarsiz), product_count() / shipping_cost_median() ulke x kategori hucresini O(1) dondurur.
+    feature_values: MappingProxyType
+    countries: tuple
+    categories: tuple
+    country_codes: MappingProxyType
+    category_codes: MappingProxyType
+    product_counts: np.ndarray
+    shipping_cost_medians: np.ndarray
+    row_countries: np.ndarray
+    row_categories: np.ndarray
+    row_shipping_costs: np.ndarray
+    _lookups: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        lookups = {}
+        for feature, values in self.feature_values.items():
+            lookup = lookups[feature] = {}
+            for value in values:
+                lookup.setdefault(value.strip().casefold(), value)
+        object.__setattr__(self, "_lookups", lookups)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, feature_cols):
+        feature_values = {}
+        for feature in feature_cols:
+            col = _source_column(df, feature)
+            if col is None or df[col].dtype != object:
+                continue
+            feature_values[feature] = tuple(str(v) for v in pd.unique(df[col].dropna()))
+
+        country_idx, countries = pd.factorize(df["country"])
+        category_idx, categories = pd.factorize(df["category"])
+        n_countries, n_categories = len(countries), len(categories)
+
+        # Satir: ulke, sutun: kategori. Son satir/sutun ilgili eksen icin toplamdir.
+        valid = (country_idx >= 0) & (category_idx >= 0)
+        product_counts = np.zeros((n_countries + 1, n_categories + 1), dtype=np.int32)
+        np.add.at(product_counts, (country_idx[valid], category_idx[valid]), 1)
+        product_counts[n_countries, :n_categories] = product_counts[:n_countries, :n_categories].sum(axis=0)
+        product_counts[:, n_categories] = product_counts[:, :n_categories].sum(axis=1)
+
+        shipping_cost_medians = np.full((n_countries + 1, n_categories + 1), np.nan, dtype=np.float32)
+        shipping = pd.DataFrame({
+            "country": country_idx, "category": category_idx, "shipping_cost": df["shipping_cost"].to_numpy(),
+        })[valid]
+        for (i, j), median in shipping.groupby(["country", "category"])["shipping_cost"].median().items():
+            shipping_cost_medians[i, j] = median
+        for i, median in shipping.groupby("country")["shipping_cost"].median().items():
+            shipping_cost_medians[i, n_categories] = median
+        for j, median in shipping.groupby("category")["shipping_cost"].median().items():
+            shipping_cost_medians[n_countries, j] = median
+        shipping_cost_medians[n_countries, n_categories] = shipping["shipping_cost"].median()
+
+        return cls(
+            feature_values=MappingProxyType(feature_values),
+            countries=tuple(str(c) for c in countries),
+            categories=tuple(str(c) for c in categories),
+            country_codes=MappingProxyType({str(c): i for i, c in enumerate(countries)}),
+            category_codes=MappingProxyType({str(c): j for j, c in enumerate(categories)}),
+            product_counts=_freeze(product_counts),
+            shipping_cost_medians=_freeze(shipping_cost_medians),
+            row_countries=_freeze(country_idx[valid].astype(np.int32)),
+            row_categories=_freeze(category_idx[valid].astype(np.int32)),
+            row_shipping_costs=_freeze(shipping["shipping_cost"].to_numpy(dtype=float)),
+        )
+
+    def with_records(self, records):
+        # Kayitlar (catalog_record bicimi) yeni satirlar olarak eklenmis bir indeks dondurur.
+        # Aday degerler ve ulke/kategori kodlari sona eklenir, sayilar artimli guncellenir;
+        # kargo medyanlari yalnizca yeni satirlarin dustugu hucreler icin yeniden hesaplanir.
+        feature_values = {feature: list(values) for feature, values in self.feature_values.items()}
+        for feature, values in feature_values.items():
+            seen = set(values)
+            for record in records:
+                value = _record_value(record, feature)
+                if value is not None and str(value) not in seen:
+                    seen.add(str(value))
+                    values.append(str(value))
+
+        countries, categories = list(self.countries), list(self.categories)
+        country_codes, category_codes = dict(self.country_codes), dict(self.category_codes)
+        new_countries, new_categories, new_shipping = [], [], []
+        for record in records:
+            if record.get("country") is None or record.get("category") is None:
+                continue
+            country, category = str(record["country"]), str(record["category"])
+            if country not in country_codes:
+                country_codes[country] = len(countries)
+                countries.append(country)
+            if category not in category_codes:
+                category_codes[category] = len(categories)
+                categories.append(category)
+            new_countries.append(country_codes[country])
+            new_categories.append(category_codes[category])
+            new_shipping.append(float(record.get("shipping_cost", np.nan)))
+
+        old_countries, old_categories = len(self.countries), len(self.categories)
+        n_countries, n_categories = len(countries), len(categories)
+        product_counts = np.zeros((n_countries + 1, n_categories + 1), dtype=np.int32)
+        product_counts[:old_countries, :old_categories] = self.product_counts[:old_countries, :old_categories]
+        np.add.at(product_counts, (np.array(new_countries, dtype=np.intp), np.array(new_categories, dtype=np.intp)), 1)
+        product_counts[n_countries, :n_categories] = product_counts[:n_countries, :n_categories].sum(axis=0)
+        product_counts[:, n_categories] = product_counts[:, :n_categories].sum(axis=1)
+
+        row_countries = np.concatenate([self.row_countries, np.array(new_countries, dtype=np.int32)])
+        row_categories = np.concatenate([self.row_categories, np.array(new_categories, dtype=np.int32)])
+        row_shipping_costs = np.concatenate([self.row_shipping_costs, np.array(new_shipping, dtype=float)])
+        medians = np.full((n_countries + 1, n_categories + 1), np.nan, dtype=np.float32)
+        medians[:old_countries, :old_categories] = self.shipping_cost_medians[:old_countries, :old_categories]
+        medians[:old_countries, n_categories] = self.shipping_cost_medians[:old_countries, old_categories]
+        medians[n_countries, :old_categories] = self.shipping_cost_medians[old_countries, :old_categories]
+        for i, j in set(zip(new_countries, new_categories)):
+            medians[i, j] = _median(row_shipping_costs[(row_countries == i) & (row_categories == j)])
+        for i in set(new_countries):
+            medians[i, n_categories] = _median(row_shipping_costs[row_countries == i])
+        for j in set(new_categories):
+            medians[n_countries, j] = _median(row_shipping_costs[row_categories == j])
+        medians[n_countries, n_categories] = _median(row_shipping_costs)
+
+        return CatalogIndex(
+            feature_values=MappingProxyType({feature: tuple(values) for feature, values in feature_values.items()}),
+            countries=tuple(countries),
+            categories=tuple(categories),
+            country_codes=MappingProxyType(country_codes),
+            category_codes=MappingProxyType(category_codes),
+            product_counts=_freeze(product_counts),
+            shipping_cost_medians=_freeze(medians),
+            row_countries=_freeze(row_countries),
+            row_categories=_freeze(row_categories),
+            row_shipping_costs=_freeze(row_shipping_costs),
+        )
+
+    def candidates(self, feature):
+        return self.feature_values.get(feature, ())
+
+    def canonical(self, feature, value):
+        if value is None:
+            return None
+        return self._lookups.get(feature, {}).get(str(value).strip().casefold())
+
+    def _cell(self, country=None, category=None):
+        i = len(self.countries) if country is None else self.country_codes.get(country)
+        j = len(self.categories) if category is None else self.category_codes.get(category)
+        if i is None or j is None:
+            return None
+        return i, j
+
+    def product_count(self, country=None, category=None):
+        cell = self._cell(country, category)
+        return 0 if cell is None else int(self.product_counts[cell])
+
+    def shipping_cost_median(self, country=None, category=None):
+        cell = self._cell(country, category)
+        if cell is None or np.isnan(self.shipping_cost_medians[cell]):
+            return None
+        return float(self.shipping_cost_medians[cell])
+
+
+class ProductStore(Mapping):
+    # Urun adi (kucuk harf) -> urun kaydi eslemesi. Kayitlar satir satir dict olarak degil,
+    # kolon bazli dizilerde tutulur; metin kolonlari kategori kodu + sozluk olarak saklanir.
+    # Kayit dict'i yalnizca istendiginde uretilir ve her seferinde yeni bir kopyadir.
+    # Veri setinde ayni ada sahip satirlardan ilki, with_records ile gelenlerde sonuncusu gecerlidir.
+    __slots__ = ("_index", "_text_codes", "_text_values", "_shipping_cost", "_stock", "_month")
+
+    TEXT_FIELDS = ("product_id", "product_name_clean", "category", "brand", "country", "city", "seller", "platform")
+
+    def __init__(self, index, text_codes, text_values, shipping_cost, stock, month):
+        self._index = index
+        self._text_codes = text_codes
+        self._text_values = text_values
+        self._shipping_cost = shipping_cost
+        self._stock = stock
+        self._month = month
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        product_name_col = 'product_name_clean' if 'product_name_clean' in df.columns else 'product_name'
+        names = df[product_name_col].astype(str)
+        keys = names.str.lower()
+        first = ~keys.duplicated(keep="first")
+        df, names, keys = df[first], names[first], keys[first]
+
+        text_codes, text_values = {}, {}
+        for field in cls.TEXT_FIELDS:
+            values = names if field == "product_name_clean" else df[field].astype(str)
+            codes, uniques = pd.factorize(values)
+            text_codes[field] = _freeze(codes.astype(np.min_scalar_type(max(len(uniques) - 1, 0))))
+            text_values[field] = tuple(uniques)
+
+        shipping_cost = df['shipping_cost'].astype(float).fillna(0.0).to_numpy()
+        stock = df['stock'].to_numpy().astype(bool)
+        if 'last_updated' in df.columns:
+            month = pd.to_datetime(df['last_updated']).dt.month.fillna(pd.Timestamp.now().month)
+        else:
+            month = pd.Series(pd.Timestamp.now().month, index=df.index)
+
+        return cls(
+            index={key: row for row, key in enumerate(keys)},
+            text_codes=text_codes,
+            text_values=text_values,
+            shipping_cost=_freeze(shipping_cost),
+            stock=_freeze(stock),
+            month=_freeze(month.to_numpy().astype(np.int8)),
+        )
+
+    def with_records(self, records):
+        # Kayitlar (catalog_record bicimi) uygulanmis yeni bir store dondurur: yeni adlar sona
+        # eklenir, var olan adin satiri yerinde guncellenir. Mevcut nesne degismez; veri seti
+        # yeniden okunmaz, yalnizca kolon dizileri kopyalanip genisletilir.
+        index = dict(self._index)
+        n_old = len(index)
+        changed = {}
+        for record in records:
+            key = str(record['product_name_clean']).lower()
+            row = index.get(key)
+            if row is None:
+                row = index[key] = len(index)
+            changed[row] = record
+        n_rows = len(index)
+
+        text_codes, text_values = {}, {}
+        for field in self.TEXT_FIELDS:
+            values = list(self._text_values[field])
+            lookup = {value: code for code, value in enumerate(values)}
+            updates = {}
+            for row, record in changed.items():
+                value = str(record[field])
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(values)
+                    values.append(value)
+                updates[row] = code
+            codes = np.zeros(n_rows, dtype=np.promote_types(self._text_codes[field].dtype,
+                                                            np.min_scalar_type(max(len(values) - 1, 0))))
+            codes[:n_old] = self._text_codes[field]
+            codes[list(updates)] = list(updates.values())
+            text_codes[field] = _freeze(codes)
+            text_values[field] = tuple(values)
+
+        rows = list(changed)
+        shipping_cost = np.zeros(n_rows, dtype=self._shipping_cost.dtype)
+        stock = np.zeros(n_rows, dtype=bool)
+        month = np.zeros(n_rows, dtype=np.int8)
+        shipping_cost[:n_old], stock[:n_old], month[:n_old] = self._shipping_cost, self._stock, self._month
+        shipping_cost[rows] = [float(changed[row]['shipping_cost']) for row in rows]
+        stock[rows] = [bool(changed[row]['stock']) for row in rows]
+        month[rows] = [int(changed[row]['month']) for row in rows]
+
+        return ProductStore(index, text_codes, text_values, _freeze(shipping_cost), _freeze(stock), _freeze(month))
+
+    def record(self, row):
+        text = {field: self._text_values[field][self._text_codes[field][row]] for field in self.TEXT_FIELDS}
+        return {
+            'product_id': text['product_id'],
+            'product_name_clean': text['product_name_clean'],
+            'category': text['category'],
+            'brand': text['brand'],
+            'country': text['country'],
+            'shipping_cost': float(self._shipping_cost[row]),
+            'city': text['city'],
+            'seller': text['seller'],
+            'stock': bool(self._stock[row]),
+            'platform': text['platform'],
+            'month': int(self._month[row]),
+        }
+
+    def row_of(self, name):
+        return self._index.get(name)
+
+    @property
+    def shipping_costs(self):
+        return self._shipping_cost
+
+    def select_rows(self, **filters):
+        # Metin kolonu filtreleri (buyuk/kucuk harf duyarsiz), orn. select_rows(category="Toys").
+        # None degerli filtreler yok sayilir. Donus: artan satir numaralari.
+        mask = np.ones(len(self._index), dtype=bool)
+        for field, value in filters.items():
+            if value is None:
+                continue
+            value = str(value).strip().lower()
+            codes = [code for code, text in enumerate(self._text_values[field]) if text.lower() == value]
+            mask &= np.isin(self._text_codes[field], codes)
+        return np.flatnonzero(mask)
+
+    def __getitem__(self, name):
+        return self.record(self._index[name])
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
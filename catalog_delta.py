@@ -0,0 +1,143 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Veri setine sonradan eklenen ya da guncellenen urunlerin kalici, yalnizca eklemeli kaydi.
+# Her kayda artan bir sira numarasi verilir; servis surecleri son uyguladiklari numaradan
+# sonrasini okuyup katalog yapilarina artimli uygular (backend.sync_catalog). Ayni ada sahip
+# sonraki kayit oncekini gunceller.
+#
+#   python catalog_delta.py add yeni_urunler.csv        (.csv, .xlsx, .json, .ndjson)
+#   python catalog_delta.py list --since 10
+#   python catalog_delta.py stats
+
+DEFAULT_PATH = os.path.join(".cache", "catalog_delta.sqlite")
+
+
+class CatalogDeltaStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._poll_interval = None
+        self._poll_callback = None
+        self._poller = None
+        self._poller_pid = None
+        self._fork_hook = False
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS catalog_delta ("
+                         "seq INTEGER PRIMARY KEY AUTOINCREMENT, record TEXT NOT NULL, added_at REAL NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # fork sonrasi ust surecin baglantisi kullanilmaz.
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def append(self, records):
+        # Kayitlar tek islemde yazilir; son sira numarasi doner.
+        now = time.time()
+        with self._conn() as conn:
+            conn.executemany("INSERT INTO catalog_delta (record, added_at) VALUES (?, ?)",
+                             [(json.dumps(record, ensure_ascii=False), now) for record in records])
+        return self.last_seq()
+
+    def since(self, seq=0):
+        # [(sira, kayit), ...], sira numarasina gore artan.
+        rows = self._conn().execute("SELECT seq, record FROM catalog_delta WHERE seq > ? ORDER BY seq", (seq,))
+        return [(row_seq, json.loads(record)) for row_seq, record in rows]
+
+    def last_seq(self):
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM catalog_delta").fetchone()[0]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM catalog_delta").fetchone()[0]
+
+    def start_polling(self, callback, interval=5.0):
+        # callback() interval saniyede bir cagrilir (baska surecin ya da CLI'nin ekledigi kayitlari
+        # almak icin). fork edilen worker'larda thread yeniden baslatilir.
+        self._poll_interval = interval
+        self._poll_callback = callback
+        if not self._fork_hook and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._restart_poller)
+            self._fork_hook = True
+        self._restart_poller()
+
+    def _restart_poller(self):
+        if self._poll_interval is None:
+            return
+        if self._poller is not None and self._poller.is_alive() and self._poller_pid == os.getpid():
+            return
+        self._poller_pid = os.getpid()
+        self._poller = threading.Thread(target=self._poll, name="catalog-delta-poller", daemon=True)
+        self._poller.start()
+
+    def _poll(self):
+        seen = None
+        while True:
+            time.sleep(self._poll_interval)
+            try:
+                seq = self.last_seq()
+                if seq != seen:
+                    self._poll_callback()
+                    seen = seq
+            except Exception as e:
+                logging.error(f"Katalog delta kayitlari uygulanamadi: {e}")
+
+    def stats(self):
+        return {"path": self.path, "records": len(self), "last_seq": self.last_seq(), "polling": self._poll_interval}
+
+
+def read_products(path):
+    path = str(path)
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("products", []) if isinstance(data, dict) else data
+    from data_cache import read_source
+    return read_source(path).to_dict("records")
+
+def main():
+    from catalog import catalog_record
+
+    ap = argparse.ArgumentParser(description="Katalog delta kaydina urun ekleme/guncelleme")
+    ap.add_argument("--store", default=os.getenv("CATALOG_DELTA_PATH", DEFAULT_PATH))
+    sub = ap.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Dosyadaki urunleri ekle ya da guncelle")
+    add.add_argument("path")
+    listing = sub.add_parser("list", help="Kayitlari listele")
+    listing.add_argument("--since", type=int, default=0)
+    sub.add_parser("stats")
+    args = ap.parse_args()
+
+    store = CatalogDeltaStore(args.store)
+    if args.command == "add":
+        records, rejected = [], 0
+        for index, product in enumerate(read_products(args.path)):
+            try:
+                records.append(catalog_record(product))
+            except (ValueError, AttributeError) as e:
+                rejected += 1
+                print(f"satir {index} reddedildi: {e}")
+        seq = store.append(records) if records else store.last_seq()
+        print(f"{len(records)} urun yazildi, {rejected} reddedildi (son sira: {seq}).")
+    elif args.command == "list":
+        for seq, record in store.since(args.since):
+            print(seq, json.dumps(record, ensure_ascii=False))
+    else:
+        print(json.dumps(store.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
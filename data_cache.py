@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+    _CACHE_SUFFIX = ".feather"
+except ImportError:
+    feather = None
+    _CACHE_SUFFIX = ".pkl"
+
+DEFAULT_CACHE_DIR = ".cache"
+_DIGEST_LEN = 16
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def read_source(path):
+    path = str(path)
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path)
+    raise ValueError("Desteklenmeyen veri dosyasi uzantisi. Lutfen .csv veya .xlsx kullanin.")
+
+def cache_path_for(path, cache_dir=DEFAULT_CACHE_DIR, digest=None):
+    path = Path(path)
+    digest = digest or file_hash(path)
+    return Path(cache_dir) / f"{path.stem}-{digest[:_DIGEST_LEN]}{_CACHE_SUFFIX}"
+
+def _read_cache(cache_path):
+    if cache_path.suffix == ".feather":
+        # memory_map ile dosya sayfa onbelleginden kopyasiz okunur.
+        return feather.read_table(cache_path, memory_map=True).to_pandas()
+    return pd.read_pickle(cache_path)
+
+def _stale_caches(cache_path):
+    # Ayni kaynagin eski ozetli onbellekleri: tam olarak <stem>-<16 hex>.feather|.pkl. Ad onekini
+    # paylasan baska veri setlerinin (data.xlsx / data-2024.xlsx) onbellekleri eslesmez.
+    stem = cache_path.name[:-len(cache_path.suffix) - _DIGEST_LEN - 1]
+    pattern = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{{_DIGEST_LEN}}}\.(feather|pkl)")
+    return [p for p in cache_path.parent.iterdir() if p != cache_path and pattern.fullmatch(p.name)]
+
+def _write_cache(df, cache_path):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+    if cache_path.suffix == ".feather":
+        df.reset_index(drop=True).to_feather(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+    for stale in _stale_caches(cache_path):
+        stale.unlink(missing_ok=True)
+
+def load_dataset(path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    # Kaynak dosya (.xlsx/.csv) ilk acilista kolonsal bir onbellege cevrilir; sonraki
+    # acilislar onbellekten okunur. Onbellek adi dosya iceriginin ozetini tasidigi icin
+    # kaynak degistiginde otomatik olarak yeniden olusturulur.
+    start = time.perf_counter()
+    if not use_cache:
+        df = read_source(path)
+        logging.info(f"Veri seti {time.perf_counter() - start:.3f} sn'de kaynaktan okundu: {path}")
+        return df
+
+    cache_path = cache_path_for(path, cache_dir)
+    if cache_path.exists():
+        try:
+            df = _read_cache(cache_path)
+            logging.info(f"Veri seti {time.perf_counter() - start:.3f} sn'de onbellekten yuklendi: {cache_path}")
+            return df
+        except Exception as e:
+            logging.warning(f"Veri onbellegi okunamadi, kaynaktan yeniden olusturuluyor: {e}")
+
+    df = read_source(path)
+    try:
+        _write_cache(df, cache_path)
+    except Exception as e:
+        logging.warning(f"Veri onbellegi yazilamadi: {e}")
+    logging.info(f"Veri seti {time.perf_counter() - start:.3f} sn'de kaynaktan okundu ve onbellege yazildi: {cache_path}")
+    return df
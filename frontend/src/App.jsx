@@ -211,11 +211,24 @@ export default function App() {
       setCurrentChatTitle(`${userMessage.text} Analizi`);
     }
 
+    const botId = `bot-${Date.now()}`;
+    const setBotText = (text) => {
+      setMessages((prevMessages) => {
+        const exists = prevMessages.some((message) => message.id === botId);
+        if (!exists) {
+          return [...prevMessages, { id: botId, sender: 'bot', text }];
+        }
+        return prevMessages.map((message) => (message.id === botId ? { ...message, text } : message));
+      });
+    };
+
     try {
-      const response = await fetch('http://127.0.0.1:5000/chat', {
+      // Yanit olaylar halinde gelir (NDJSON): Gemini metni parca parca, tahminde önce fiyat sonra ülkeler.
+      const response = await fetch('http://127.0.0.1:5000/chat/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': 'application/x-ndjson',
         },
         body: JSON.stringify({ message: currentInput }),
       });
@@ -224,15 +237,34 @@ export default function App() {
         throw new Error(`API hatasi: ${response.status} ${response.statusText}`);
       }
 
-      const data = await response.json();
-
-      const botResponse = {
-        id: `bot-${Date.now()}`,
-        sender: 'bot',
-        text: data.response,
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let streamedText = '';
+      let predictedPrice = null;
+
+      const handleEvent = ({ event, data }) => {
+        if (event === 'delta') {
+          streamedText += data.text;
+          setBotText(streamedText);
+        } else if (event === 'price') {
+          predictedPrice = data.predicted_price;
+          setBotText(`Tahmini Fiyat: ${predictedPrice.toFixed(2)} $ — ülke önerileri hazirlaniyor...`);
+        } else if (event === 'recommendation') {
+          setBotText({ predictedPrice, ...data });
+        } else if (event === 'message' || event === 'error') {
+          setBotText(data.response ?? data.error);
+        }
       };
-      
-      setMessages((prevMessages) => [...prevMessages, botResponse]);
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
 
     } catch (error) {
       console.error('Mesaj gönderilirken bir hata oluştu:', error);
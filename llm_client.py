@@ -0,0 +1,428 @@
+import asyncio
+import heapq
+import itertools
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from caches import LRUCache, SingleFlight, SQLiteCache
+
+
+class LLMError(Exception):
+    pass
+
+class LLMTimeoutError(LLMError):
+    pass
+
+class LLMBusyError(LLMError):
+    pass
+
+
+_END = object()
+
+
+class _DeadlineWatcher:
+    # Tum istemcilerin akis zaman sinirlarini tek bir thread'de izler: sinir dolunca kayitli
+    # fonksiyon bir kez cagrilir. Akis basina bekleyen thread acilmaz. Biten akislar listeden
+    # silinmez; sinirlari geldiginde cagrilan fonksiyon etkisiz kalir. fork sonrasi cocukta
+    # ust surecin thread'i yoktur: liste bosaltilir, ilk kayitta yeni thread baslar.
+
+    def __init__(self):
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._started = False
+
+    def add(self, deadline, fn):
+        with self._cond:
+            if not self._started:
+                threading.Thread(target=self._run, args=(self._cond,), name="llm-deadlines", daemon=True).start()
+                self._started = True
+            heapq.heappush(self._heap, (deadline, next(self._seq), fn))
+            self._cond.notify()
+
+    def _run(self, cond):
+        while True:
+            with cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, fn = heapq.heappop(self._heap)
+            try:
+                fn()
+            except Exception:
+                pass
+
+
+_deadlines = _DeadlineWatcher()
+
+
+class _StreamState:
+    # Tek bir akisin sonu: on_text ve on_end ayni kilit altinda cagrilir, on_end bir kez cagrilir
+    # ve ondan sonra parca iletilmez (zaman asimi ile gec gelen parca yarismaz).
+
+    def __init__(self, on_text, on_end, deadline):
+        self.on_text = on_text
+        self.on_end = on_end
+        self.deadline = deadline
+        self.ended = False
+        self._lock = threading.Lock()
+
+    def deliver(self, text):
+        with self._lock:
+            if self.ended:
+                return False
+            if time.monotonic() >= self.deadline:
+                self._end(LLMTimeoutError("LLM yaniti zaman asimina ugradi."))
+                return False
+            if self.on_text(text) is False:
+                self._end(None)
+                return False
+            return True
+
+    def finish(self, error):
+        with self._lock:
+            if not self.ended:
+                self._end(error)
+
+    def expire(self):
+        self.finish(LLMTimeoutError("LLM yaniti zaman asimina ugradi."))
+
+    def _end(self, error):
+        self.ended = True
+        self.on_end(error)
+
+
+class LLMClient:
+    # Gemini cagrilarini istek thread'inden ayiran sarmalayici. Cagrilar ayri bir thread
+    # havuzunda calisir; her cagrinin bir zaman siniri vardir ve ayni anda en fazla
+    # max_concurrency cagri calisir. Zaman asiminda istek thread'i hemen serbest kalir;
+    # yarim kalan cagri (akislarda okuma dahil) bitene kadar eszamanlilik kotasindan dusulmez.
+    # Kota doluysa istek thread'i en fazla acquire_timeout saniye bekler (0: hic beklemez),
+    # sonra LLMBusyError firlatilir; akislar hic beklemez.
+    # model: generate_content(prompt, stream=False) arayuzune sahip herhangi bir nesne.
+
+    def __init__(self, model, max_concurrency=4, timeout=20.0, acquire_timeout=0.0):
+        self.model = model
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self, deadline, wait=None):
+        wait = min(self.acquire_timeout if wait is None else wait, deadline - time.monotonic())
+        acquired = self._semaphore.acquire(timeout=wait) if wait > 0 else self._semaphore.acquire(blocking=False)
+        if not acquired:
+            raise LLMBusyError("LLM esszamanlilik siniri dolu.")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self, _=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._semaphore.release()
+
+    @property
+    def in_flight(self):
+        # Kotadan dusulmus (calisan ya da zaman asimindan sonra hala bitmemis) cagri sayisi.
+        return self._in_flight
+
+    def _submit(self, fn, *args):
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _generate(self, prompt):
+        return self.model.generate_content(prompt).text
+
+    def submit(self, prompt, timeout=None):
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        self._acquire(deadline)
+        return self._submit(self._generate, prompt), deadline
+
+    def generate(self, prompt, timeout=None):
+        future, deadline = self.submit(prompt, timeout)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeoutError:
+            future.cancel()
+            raise LLMTimeoutError("LLM yaniti zaman asimina ugradi.") from None
+
+    async def agenerate(self, prompt, timeout=None):
+        future, deadline = self.submit(prompt, timeout)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError("LLM yaniti zaman asimina ugradi.") from None
+
+    def _read_stream(self, prompt, state):
+        # Havuz thread'inde: modelin akisini okuyup parcalari iletir. Akis zaman asimiyla ya da
+        # birakilarak bittiyse sonraki parcada cikar; kotadaki yer ancak o zaman bosalir.
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                text = getattr(chunk, "text", "")
+                if state.ended or (text and not state.deliver(text)):
+                    return
+            state.finish(None)
+        except Exception as e:
+            state.finish(e)
+
+    def start_stream(self, prompt, on_text, on_end, timeout=None):
+        # Akisi bekleyen bir thread olmadan baslatir: on_text(parca) LLM thread'inde her parca icin
+        # cagrilir (False donerse akis birakilir), on_end(hata ya da None) en sonda bir kez cagrilir.
+        # Esszamanlilik siniri doluysa beklemeden LLMBusyError firlatilir (istek thread'i bloklanmaz).
+        # Zaman siniri ortak izleyici thread'de uygulanir: ilk parcasi hic gelmeyen akis da
+        # zamaninda LLMTimeoutError ile biter; takilan okuma bitene kadar kotadan dusulmez.
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        self._acquire(deadline, wait=0)
+        state = _StreamState(on_text, on_end, deadline)
+        self._submit(self._read_stream, prompt, state)
+        _deadlines.add(deadline, state.expire)
+        return deadline
+
+    def stream(self, prompt, timeout=None):
+        # Yanit parcalarini geldikce dondurur. Zaman siniri tum akis icindir.
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+
+        def on_text(text):
+            if cancelled.is_set():
+                return False
+            chunks.put(text)
+
+        deadline = self.start_stream(prompt, on_text, lambda error: chunks.put(_END if error is None else error), timeout)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMTimeoutError("LLM yaniti zaman asimina ugradi.")
+                try:
+                    item = chunks.get(timeout=remaining)
+                except queue.Empty:
+                    raise LLMTimeoutError("LLM yaniti zaman asimina ugradi.") from None
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    # Yalnizca buyuk/kucuk harf ve bosluk farklarini yok sayar: "Ihracat  nasil yapilir?" ile
+    # "ihracat nasil yapilir?" ayni anahtara duser. Noktalama korunur ("2+2" ile "2-2", "1.5" ile
+    # "15" ya da tireli model numaralari farkli sorulardir).
+    return _SPACE_RE.sub(" ", prompt.casefold()).strip()
+
+
+class CachedLLMClient:
+    # LLMClient onune konan yanit onbellegi: bellekte LRU, istege bagli SQLite katmani ve
+    # ayni anda gelen ayni sorular icin tek ucus (single-flight) birlestirme.
+    # Hata ve zaman asimi sonuclari onbellege yazilmaz. Disk tablosu anahtar bicimiyle birlikte
+    # adlandirilir: bicim degisince eski anahtarlarla yazilmis yanitlar okunmaz.
+
+    def __init__(self, client, maxsize=1024, ttl=None, disk_path=None):
+        self.client = client
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(disk_path, ttl=ttl, table="llm_prompt_responses") if disk_path else None
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.latency_saved = 0.0
+        self.llm_calls = 0
+        self.llm_latency = 0.0
+
+    def _lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except Exception:
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.memory.put(key, entry)
+        return entry
+
+    def _store(self, key, text, latency):
+        entry = {"text": text, "latency": latency}
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, entry)
+            except Exception:
+                pass
+
+    def _record_call(self, latency):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_latency += latency
+
+    def _record_saved(self, latency):
+        with self._lock:
+            self.latency_saved += latency
+
+    def generate(self, prompt, timeout=None):
+        key = normalize_prompt(prompt)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._record_saved(entry["latency"])
+            return entry["text"]
+
+        def call():
+            start = time.perf_counter()
+            text = self.client.generate(prompt, timeout=timeout)
+            latency = time.perf_counter() - start
+            self._record_call(latency)
+            self._store(key, text, latency)
+            return text, latency
+
+        (text, latency), shared = self._flight.do(key, call)
+        if shared:
+            self._record_saved(latency)
+        return text
+
+    def stream(self, prompt, timeout=None):
+        key = normalize_prompt(prompt)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._record_saved(entry["latency"])
+            yield entry["text"]
+            return
+        start = time.perf_counter()
+        parts = []
+        for part in self.client.stream(prompt, timeout=timeout):
+            parts.append(part)
+            yield part
+        latency = time.perf_counter() - start
+        self._record_call(latency)
+        self._store(key, "".join(parts), latency)
+
+    def start_stream(self, prompt, on_text, on_end, timeout=None):
+        # LLMClient.start_stream ile ayni; onbellekte varsa yanit tek parca halinde cagiran
+        # thread'de verilir, yoksa tamamlanan akis onbellege yazilir.
+        key = normalize_prompt(prompt)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._record_saved(entry["latency"])
+            on_text(entry["text"])
+            on_end(None)
+            return
+        start = time.perf_counter()
+        parts = []
+        abandoned = []
+
+        def collect(text):
+            parts.append(text)
+            if on_text(text) is False:
+                abandoned.append(True)
+                return False
+
+        def finish(error):
+            # Yarida birakilan akis onbellege yazilmaz.
+            if error is None and not abandoned:
+                latency = time.perf_counter() - start
+                self._record_call(latency)
+                self._store(key, "".join(parts), latency)
+            on_end(error)
+
+        self.client.start_stream(prompt, collect, finish, timeout=timeout)
+
+    def stats(self):
+        memory = self.memory.stats()
+        with self._lock:
+            lookups = memory["hits"] + memory["misses"]
+            hits = memory["hits"] + self.disk_hits
+            return {
+                **memory,
+                "hits": hits,
+                "misses": lookups - hits,
+                "memory_hits": memory["hits"],
+                "disk_hits": self.disk_hits,
+                "disk_size": len(self.disk) if self.disk is not None else None,
+                "coalesced": self._flight.coalesced,
+                "in_flight": self.client.in_flight,
+                "llm_calls": self.llm_calls,
+                "llm_latency_seconds": round(self.llm_latency, 3),
+                "latency_saved_seconds": round(self.latency_saved, 3),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LazyGenerativeModel:
+    # google.generativeai paketi ilk cagrida (ya da isinmada load() ile) import edilip
+    # yapilandirilir; paketin yarim saniyelik importu uygulama baslangicini geciktirmez.
+
+    def __init__(self, model_name, api_key=None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate_content(self, prompt, stream=False):
+        return self.load().generate_content(prompt, stream=stream)
+
+
+class FakeGenerativeModel:
+    # Gercek API yerine yerel gelistirme ve benchmark icin: sabit bir yaniti
+    # istenen gecikmeyle, istenirse parca parca dondurur.
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, reply="Bu bir deneme yanitidir.", latency=0.0, chunk_size=16):
+        self.reply = reply
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _text_for(self, prompt):
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        text = self._text_for(prompt)
+        if stream:
+            return self._stream(text)
+        time.sleep(self.latency)
+        return self._Response(text)
+
+    def _stream(self, text):
+        n_chunks = max(1, -(-len(text) // self.chunk_size))
+        for i in range(n_chunks):
+            time.sleep(self.latency / n_chunks)
+            yield self._Response(text[i * self.chunk_size:(i + 1) * self.chunk_size])
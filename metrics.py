@@ -0,0 +1,277 @@
+import bisect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Surec ici olcum katmani: asama sureleri histogramlarda toplanir ve /metrics uzerinden
+# Prometheus metin formatinda verilir. serve.py ile calisirken her worker kendi sayaclarini tutar;
+# worker'larda (SERVE_WORKER ortam degiskeni) tum orneklere worker="<pid>" etiketi eklenir: bir
+# okuma hangi worker'a duserse dussun seriler karismaz, sayaclar sifirlanmis gorunmez. Worker'lar
+# arasi toplam sorguda alinir: sum without (worker) (...).
+#
+#   @timed("prepare_dataframe")            # fonksiyon
+#   with timed("model_predict"): ...       # kod blogu
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "ecommerce"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms = {}  # (ad, etiketler) -> Histogram
+        self._help = {}
+        self._collectors = {}  # ad -> toplayici
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram())
+                self._help.setdefault(name, help_text)
+        return hist
+
+    def register_collector(self, collector, name=None):
+        # collector() -> [(ad, tip, aciklama, [(etiketler, deger), ...]), ...]; her okumada cagrilir.
+        # Ayni adla (varsayilan: modul.fonksiyon) tekrar kayit oncekinin yerine gecer; modul yeniden
+        # import edildiginde ayni aileler iki kez yazilmaz.
+        name = name or f"{collector.__module__}.{collector.__qualname__}"
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self):
+        worker = os.getenv("SERVE_WORKER")
+        extra = (("worker", worker),) if worker else ()
+        lines = []
+        by_name = {}
+        for (name, labels), hist in list(self._histograms.items()):
+            by_name.setdefault(name, []).append((labels, hist))
+        for name in sorted(by_name):
+            full = f"{PREFIX}_{name}"
+            lines.append(f"# HELP {full} {self._help.get(name, '')}")
+            lines.append(f"# TYPE {full} histogram")
+            for labels, hist in sorted(by_name[name], key=lambda item: item[0]):
+                counts, total, count = hist.snapshot()
+                cumulative = 0
+                for bound, n in zip(hist.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{full}_bucket{_labels(labels + extra + (('le', le),))} {cumulative}")
+                lines.append(f"{full}_sum{_labels(labels + extra)} {total!r}")
+                lines.append(f"{full}_count{_labels(labels + extra)} {count}")
+        with self._lock:
+            collectors = list(self._collectors.values())
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logging.warning(f"Metrik toplayici hata verdi: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                full = f"{PREFIX}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{full}{_labels(tuple(sorted(labels.items())) + extra)} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+_METRIC_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+def stats_gauges(prefix, stats, help_text=""):
+    # stats() sozlugundeki sayisal alanlari gauge olarak verir (onbellek, oturum, LLM istatistikleri).
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        families.append((_METRIC_NAME_RE.sub("_", f"{prefix}_{key}"), "gauge", help_text, [({}, value)]))
+    return families
+
+
+REGISTRY = MetricsRegistry()
+_trace = threading.local()
+_stage_histograms = {}
+
+
+def _stage_histogram(stage):
+    hist = _stage_histograms.get(stage)
+    if hist is None:
+        hist = _stage_histograms[stage] = REGISTRY.histogram(
+            "stage_duration_seconds", "Istek asamalarinin suresi (sn)", stage=stage)
+    return hist
+
+
+class timed:
+    # Asama suresini olcer; hem dekorator hem context manager olarak kullanilir. Bir HTTP
+    # istegi icinde calisiyorsa sure istegin asama dokumune de eklenir (yavas istek logu).
+
+    __slots__ = ("stage", "_hist", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self._hist = _stage_histogram(stage)
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.stage, time.perf_counter() - self._start, self._hist)
+
+    def __call__(self, fn):
+        stage, hist = self.stage, self._hist
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - start, hist)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+def record_stage(stage, seconds, hist=None):
+    (hist or _stage_histogram(stage)).observe(seconds)
+    stages = getattr(_trace, "stages", None)
+    if stages is not None:
+        stages.append((stage, seconds))
+
+
+class SamplingProfiler:
+    # Profili istenen thread'lerin yigitlarini interval araliklarla ornekler (sys._current_frames).
+    # Ornekler "collapsed stack" formatinda toplanir; flamegraph araclariyla okunabilir.
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._active = {}  # thread id -> Counter
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def begin(self, thread_id):
+        samples = Counter()
+        with self._lock:
+            self._active[thread_id] = samples
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def end(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _stack(self, frame):
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[self._stack(frame)] += 1
+
+
+def instrument_app(app, slow_ms=1000.0, profile_dir=None, profile_interval=0.005):
+    # Her istegin suresini endpoint/metot/durum etiketleriyle olcer. slow_ms'i asan istekler
+    # asama dokumuyle loglanir; profile_dir verilirse bu isteklerin ornekleme profili
+    # <profile_dir>/<zaman>-<endpoint>-<ms>ms.folded dosyasina yazilir.
+    from flask import request
+
+    profiler = SamplingProfiler(interval=profile_interval) if profile_dir else None
+    if profile_dir:
+        Path(profile_dir).mkdir(parents=True, exist_ok=True)
+
+    @app.before_request
+    def _start_trace():
+        _trace.stages = []
+        _trace.status = "500"
+        _trace.start = time.perf_counter()
+        if profiler is not None:
+            profiler.begin(threading.get_ident())
+
+    @app.after_request
+    def _record_status(response):
+        _trace.status = str(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_trace(exc):
+        # Akis yanitlarinda (stream_with_context) istek baglami govde bitince kapanir;
+        # sure yanitin tamami icin olculur.
+        stages = getattr(_trace, "stages", None)
+        if stages is None:
+            return
+        _trace.stages = None
+        seconds = time.perf_counter() - _trace.start
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        method = request.method
+        REGISTRY.histogram("http_request_duration_seconds", "HTTP istek suresi (sn)",
+                           endpoint=endpoint, method=method, status=_trace.status).observe(seconds)
+        samples = profiler.end(threading.get_ident()) if profiler is not None else None
+        if seconds * 1000 < slow_ms:
+            return
+        breakdown = ", ".join(f"{stage}={s * 1000:.1f}ms" for stage, s in stages)
+        logging.warning(f"Yavas istek: {method} {endpoint} {seconds * 1000:.1f} ms ({breakdown})")
+        if samples:
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{_METRIC_NAME_RE.sub('_', endpoint).strip('_') or 'root'}-{int(seconds * 1000)}ms.folded"
+            try:
+                with open(Path(profile_dir) / name, "w", encoding="utf-8") as f:
+                    for stack, count in samples.most_common():
+                        f.write(f"{stack} {count}\n")
+            except OSError as e:
+                logging.warning(f"Profil yazilamadi: {e}")
+
+    return profiler
@@ -0,0 +1,196 @@
+import argparse
+import heapq
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .batch_scoring import _init_worker, _ordered_pool_map, _worker_state, iter_chunks
+    from .inference import ENGINES
+    from .predict import DEFAULT_COUNTRIES, predict_country_matrix
+except ImportError:
+    from batch_scoring import _init_worker, _ordered_pool_map, _worker_state, iter_chunks
+    from inference import ENGINES
+    from predict import DEFAULT_COUNTRIES, predict_country_matrix
+
+# Ticaret rotasi (arbitraj) taramasi. Rota: urunu tahmini fiyatin dusuk oldugu ulkeden alip
+# yuksek oldugu ulkede satmak; kazanc = satis fiyati - alis fiyati - shipping_cost.
+# Urun x ulke fiyatlari parca parca tek model.predict cagrisiyla hesaplanir. Her parcada adaylar
+# np.argpartition ile, parcalar arasinda en iyi K rota K boyutlu bir min-heap ile secilir; tam
+# siralama yalnizca sondaki K rota icin yapilir.
+#
+#   python arbitrage.py --input ../synthetic_ecommerce_data.xlsx --top_k 20 --workers 4
+#   python arbitrage.py --input katalog.csv --category Electronics --per_product 3 --output rotalar.json
+
+
+def chunk_routes(prices, shipping_costs, k, routes_per_product=1, min_profit=0.0):
+    # prices: (urun, ulke) fiyat dizisi. Urun basina en iyi routes_per_product rota, sonra parcanin
+    # en iyi k rotasi secilir. Donus: [(kazanc, satir, alis_ulke, satis_ulke), ...], sirasiz.
+    prices = np.asarray(prices, dtype=np.float64)
+    m, n = prices.shape
+    if m == 0 or n < 2 or k <= 0:
+        return []
+    shipping_costs = np.nan_to_num(np.asarray(shipping_costs, dtype=np.float64))
+    # profits[urun, alis, satis]
+    profits = prices[:, None, :] - prices[:, :, None] - shipping_costs[:, None, None]
+    profits[:, np.arange(n), np.arange(n)] = -np.inf
+    flat = profits.reshape(m, n * n)
+
+    r = min(routes_per_product, n * (n - 1))
+    pairs = np.argpartition(flat, n * n - r, axis=1)[:, n * n - r:]
+    values = np.take_along_axis(flat, pairs, axis=1).ravel()
+    rows = np.repeat(np.arange(m), r)
+    pairs = pairs.ravel()
+    keep = values >= min_profit
+    values, rows, pairs = values[keep], rows[keep], pairs[keep]
+    if len(values) > k:
+        top = np.argpartition(values, len(values) - k)[len(values) - k:]
+        values, rows, pairs = values[top], rows[top], pairs[top]
+    return list(zip(values.tolist(), rows.tolist(), (pairs // n).tolist(), (pairs % n).tolist()))
+
+
+class TopRoutes:
+    # En iyi k rotayi tutan min-heap. Esit kazancta once eklenen rota kalir.
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._seq = 0
+
+    def push(self, profit, route):
+        item = (profit, -self._seq, route)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def result(self):
+        return [route for _, _, route in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+
+def rank_routes(chunks, k=10, routes_per_product=1, min_profit=0.0):
+    # chunks: (ilk_satir, fiyatlar, kargo_ucretleri) akisi. Donus: kazanca gore azalan en iyi k
+    # rota, (kazanc, satir, alis_ulke, satis_ulke, alis_fiyati, satis_fiyati, kargo).
+    top = TopRoutes(k)
+    for offset, prices, shipping_costs in chunks:
+        for profit, row, buy, sell in chunk_routes(prices, shipping_costs, k, routes_per_product, min_profit):
+            top.push(profit, (profit, offset + row, buy, sell,
+                              float(prices[row][buy]), float(prices[row][sell]), float(shipping_costs[row])))
+    return top.result()
+
+def route_record(buy_country, buy_price, sell_country, sell_price, shipping_cost, profit):
+    return {
+        "buy_country": buy_country,
+        "buy_price": round(float(buy_price), 2),
+        "sell_country": sell_country,
+        "sell_price": round(float(sell_price), 2),
+        "shipping_cost": round(float(shipping_cost), 2),
+        "profit": round(float(profit), 2),
+        "margin_pct": round(100 * float(profit) / float(buy_price), 1) if buy_price > 0 else None,
+    }
+
+def _shipping_column(df: pd.DataFrame):
+    if "shipping_cost" not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df["shipping_cost"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+def score_routes_chunk(df: pd.DataFrame, countries_list, k, routes_per_product=1, min_profit=0.0, id_cols=()):
+    # Havuz isci surecinde calisir. Donus: (urun sayisi, [(kazanc, rota kaydi), ...]) -- parcanin en
+    # iyi k rotasi.
+    model, feature_cols = _worker_state["model"], _worker_state["feature_cols"]
+    df = df.reset_index(drop=True)
+    prices = predict_country_matrix(model, feature_cols, df, countries_list)
+    shipping_costs = _shipping_column(df)
+    routes = []
+    for profit, row, buy, sell in chunk_routes(prices, shipping_costs, k, routes_per_product, min_profit):
+        record = {col: df.at[row, col] for col in id_cols if col in df.columns}
+        record = {col: (value.item() if isinstance(value, np.generic) else value) for col, value in record.items()}
+        routes.append((profit, {**record, **route_record(countries_list[buy], prices[row, buy], countries_list[sell],
+                                                           prices[row, sell], shipping_costs[row], profit)}))
+    return len(df), routes
+
+def _filter_category(chunks, category):
+    category = category.strip().lower()
+    for chunk in chunks:
+        yield chunk[chunk["category"].astype(str).str.strip().str.lower() == category]
+
+def find_routes(model_path, features_path, input_path, countries_list=None, k=10, category=None,
+                routes_per_product=1, min_profit=0.0, id_cols=("product_id", "product_name", "category"),
+                chunksize=20000, workers=1, engine="sklearn", log=None):
+    # Katalog dosyasini parca parca okuyup (istege bagli kategori filtresiyle) en iyi k rotayi bulur.
+    # workers > 1 ise parcalar ayri sureclerde skorlanir; sonuc parca sirasiyla birlestirilir,
+    # bu yuzden esitlik durumlari dahil isci sayisindan bagimsizdir.
+    log = log or (lambda msg: print(msg, file=sys.stderr))
+    countries_list = list(countries_list or DEFAULT_COUNTRIES)
+    fn = partial(score_routes_chunk, countries_list=countries_list, k=k, routes_per_product=routes_per_product,
+                 min_profit=min_profit, id_cols=list(id_cols))
+    chunks = iter_chunks(input_path, chunksize)
+    if category:
+        chunks = _filter_category(chunks, category)
+    top = TopRoutes(k)
+    n_rows = 0
+    start = time.perf_counter()
+
+    def consume(results):
+        nonlocal n_rows
+        for n, routes in results:
+            n_rows += n
+            for profit, route in routes:
+                top.push(profit, route)
+            log(f"{n_rows} urun tarandi ({time.perf_counter() - start:.1f} sn)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path, features_path, engine)) as executor:
+            consume(_ordered_pool_map(executor, fn, chunks, max_pending=workers * 2))
+    else:
+        _init_worker(model_path, features_path, engine)
+        consume(map(fn, chunks))
+    return top.result(), n_rows
+
+def main():
+    ap = argparse.ArgumentParser(description="Urun x ulke arbitraj (ticaret rotasi) taramasi")
+    ap.add_argument("--model_path", default="model.joblib", help="Joblib model yolu")
+    ap.add_argument("--features_path", default="feature_columns.json", help="Özellik listesi JSON yolu")
+    ap.add_argument("--input", required=True, help="Katalog dosyası (.csv, .parquet, .xlsx)")
+    ap.add_argument("--countries", nargs="*", default=None, help="Taranacak ülkeler (varsayılan: DEFAULT_COUNTRIES)")
+    ap.add_argument("--category", help="Yalnızca bu kategorideki ürünler")
+    ap.add_argument("--top_k", type=int, default=20, help="Listelenecek rota sayısı")
+    ap.add_argument("--per_product", type=int, default=1, help="Ürün başına en fazla rota sayısı")
+    ap.add_argument("--min_profit", type=float, default=0.0, help="Bu kazancın altındaki rotalar atlanır (USD)")
+    ap.add_argument("--chunksize", type=int, default=20000, help="Parça başına ürün sayısı")
+    ap.add_argument("--workers", type=int, default=1, help="Parçaları paralel skorlayan süreç sayısı")
+    ap.add_argument("--engine", choices=ENGINES, default="sklearn", help="Tahmin motoru (compiled: NumPy ağaç motoru)")
+    ap.add_argument("--output", help="Rotaları JSON olarak yaz")
+    args = ap.parse_args()
+
+    for path, label in ((args.model_path, "Model"), (args.features_path, "Özellik listesi"), (args.input, "Girdi")):
+        if not Path(path).exists():
+            print(f"{label} bulunamadı: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    start = time.perf_counter()
+    routes, n_rows = find_routes(
+        args.model_path, args.features_path, args.input, countries_list=args.countries, k=args.top_k,
+        category=args.category, routes_per_product=args.per_product, min_profit=args.min_profit,
+        chunksize=args.chunksize, workers=args.workers, engine=args.engine,
+    )
+    print(f"{n_rows} ürün, {len(routes)} rota, {time.perf_counter() - start:.2f} sn")
+    print(f"{'urun':<28} {'alis':<10} {'fiyat':>9} {'satis':<10} {'fiyat':>9} {'kargo':>7} {'kazanc':>9} {'marj_%':>7}")
+    for route in routes:
+        name = str(route.get("product_name", route.get("product_id", "")))[:28]
+        margin = f"{route['margin_pct']:>7.1f}" if route["margin_pct"] is not None else f"{'-':>7}"
+        print(f"{name:<28} {route['buy_country']:<10} {route['buy_price']:>9.2f} {route['sell_country']:<10} "
+              f"{route['sell_price']:>9.2f} {route['shipping_cost']:>7.2f} {route['profit']:>9.2f} {margin}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(routes, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
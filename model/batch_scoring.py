@@ -0,0 +1,135 @@
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .predict import load_model_and_features, predict_country_matrix, predict_from_dataframe
+except ImportError:
+    from predict import load_model_and_features, predict_country_matrix, predict_from_dataframe
+
+# Her surecte (ana surec ya da havuz isci sureci) bir kez yuklenen model.
+_worker_state = {}
+
+
+def iter_chunks(path, chunksize):
+    # Girdi dosyasini parca parca okur; dosyanin tamami bellege alinmaz.
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif suffix == ".xlsx":
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h) for h in next(rows, ())]
+            buf = []
+            for row in rows:
+                buf.append(row)
+                if len(buf) >= chunksize:
+                    yield pd.DataFrame(buf, columns=header)
+                    buf = []
+            if buf:
+                yield pd.DataFrame(buf, columns=header)
+        finally:
+            wb.close()
+    else:
+        raise ValueError(f"Desteklenmeyen girdi uzantisi: {suffix}. Lutfen .csv, .parquet veya .xlsx kullanin.")
+
+
+class ChunkWriter:
+    # Skorlanan parcalari cikti dosyasina sirayla ekler (.csv veya .parquet).
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.suffix = self.path.suffix.lower()
+        if self.suffix not in (".csv", ".parquet"):
+            raise ValueError(f"Desteklenmeyen cikti uzantisi: {self.suffix}. Lutfen .csv veya .parquet kullanin.")
+        self._file = None
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        if self.suffix == ".csv":
+            first = self._file is None
+            if first:
+                self._file = open(self.path, "w", encoding="utf-8", newline="")
+            df.to_csv(self._file, header=first, index=False)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet_writer is None:
+            self._schema = table.schema
+            self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            table = table.cast(self._schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(model_path, features_path, engine="sklearn"):
+    _worker_state["model"], _worker_state["feature_cols"] = load_model_and_features(model_path, features_path, engine)
+
+def score_chunk(df: pd.DataFrame, countries_list=None, id_cols=()):
+    model, feature_cols = _worker_state["model"], _worker_state["feature_cols"]
+    out = df[[c for c in id_cols if c in df.columns]].reset_index(drop=True)
+    out["prediction_price_usd"] = predict_from_dataframe(model, feature_cols, df).to_numpy()
+    if countries_list:
+        matrix = predict_country_matrix(model, feature_cols, df, countries_list)
+        for j, country in enumerate(countries_list):
+            out[f"price_{country}"] = matrix[:, j]
+    return out
+
+def _ordered_pool_map(executor, fn, iterable, max_pending):
+    # Sirayi koruyarak paralel calistirir; bellekte en fazla max_pending parca bekler.
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def score_file(model_path, features_path, input_path, output_path,
+               countries_list=None, id_cols=("product_id",), chunksize=50000, workers=1, engine="sklearn", log=None):
+    log = log or (lambda msg: print(msg, file=sys.stderr))
+    fn = partial(score_chunk, countries_list=list(countries_list or []), id_cols=list(id_cols or []))
+    chunks = iter_chunks(input_path, chunksize)
+    n_rows = 0
+    start = time.perf_counter()
+    with ChunkWriter(output_path) as writer:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, features_path, engine)) as executor:
+                for out in _ordered_pool_map(executor, fn, chunks, max_pending=workers * 2):
+                    writer.write(out)
+                    n_rows += len(out)
+                    log(f"{n_rows} satır skorlandı ({time.perf_counter() - start:.1f} sn)")
+        else:
+            _init_worker(model_path, features_path, engine)
+            for chunk in chunks:
+                out = fn(chunk)
+                writer.write(out)
+                n_rows += len(out)
+                log(f"{n_rows} satır skorlandı ({time.perf_counter() - start:.1f} sn)")
+    return n_rows
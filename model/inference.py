@@ -0,0 +1,427 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Egitilmis sklearn modelini duz NumPy dizilerine donusturen hafif tahmin motoru.
+# Desteklenen yapi: Pipeline([ColumnTransformer(...), agac modeli]) ya da tek basina agac modeli.
+#   - Kategorik kolonlar: [SimpleImputer] + OneHotEncoder. One-hot matris hic uretilmez; her deger
+#     onceden kurulan sozlukle kategori koduna cevrilir ve "one-hot kolon j <= esik" bolmeleri
+#     "kod == c" karsilastirmasina derlenir.
+#   - Sayisal kolonlar: passthrough, SimpleImputer, StandardScaler (sirali).
+#   - Modeller: DecisionTreeRegressor, RandomForestRegressor, ExtraTreesRegressor,
+#     GradientBoostingRegressor.
+# Kategori sozlukleri (modelin OneHotEncoder kategorileri) yuklemede bir kez kurulur; encode_records
+# kayitlari DataFrame kurmadan kodlar, RowTemplates sik gelen girdilerin kodlanmis satirlarini tutar,
+# predict_encoded hazir kodlanmis bloklari dogrudan agaclara verir.
+# Tum agaclar tek bir dugum dizisinde tutulur; bir toplu tahmin, en derin agacin derinligi kadar
+# vektorize adimda tum satirlar ve agaclar icin birlikte yapilir.
+# Desteklenmeyen bir yapi UnsupportedModelError firlatir; load_engine bu durumda sklearn'e doner.
+
+ENGINES = ("sklearn", "compiled")
+_BLOCK_ROWS = 65536
+
+
+class UnsupportedModelError(ValueError):
+    pass
+
+class ParityError(ValueError):
+    pass
+
+
+def _is_nan(value):
+    return isinstance(value, float) and value != value
+
+
+class _CategoricalSlot:
+    # Bir girdi kolonunun kategori koduna cevrilmesi. Bilinmeyen deger -1 olur (hicbir one-hot
+    # kolonu 1 olmaz; handle_unknown='ignore' ile ayni).
+    kind = "categorical"
+
+    def __init__(self, column, categories, fill_value=None, impute=False):
+        self.column = column
+        self.categories = list(categories)
+        self.codes = {value: code for code, value in enumerate(self.categories)}
+        self.fill_value = fill_value
+        self.impute = impute
+
+    def encode(self, values):
+        codes, fill = self.codes, self.fill_value
+        if self.impute:
+            return np.fromiter((codes.get(fill if _is_nan(v) else v, -1) for v in values), dtype=np.float64, count=len(values))
+        return np.fromiter((codes.get(v, -1) for v in values), dtype=np.float64, count=len(values))
+
+
+class _NumericSlot:
+    kind = "numeric"
+
+    def __init__(self, column, fill_value=None, steps=()):
+        self.column = column
+        self.fill_value = fill_value
+        self.steps = list(steps)  # (kaydirma, olcek) ciftleri: x = (x - kaydirma) / olcek
+
+    def encode(self, values):
+        x = np.asarray(values, dtype=np.float64)
+        if self.fill_value is not None:
+            x = np.where(np.isnan(x), self.fill_value, x)
+        elif np.isnan(x).any():
+            # Eksik deger davranisi sklearn surumune gore degisir; bu girdi sklearn'e birakilir.
+            raise ValueError(f"'{self.column}' kolonunda doldurulmamis eksik deger var.")
+        for shift, scale in self.steps:
+            x = (x - shift) / scale
+        # sklearn agaclari girdiyi float32'ye cevirip karsilastirir.
+        return x.astype(np.float32).astype(np.float64)
+
+
+def _named_columns(columns, feature_names):
+    if isinstance(columns, str):
+        return [columns]
+    columns = list(columns)
+    if all(isinstance(c, str) for c in columns):
+        return columns
+    if feature_names is not None and all(isinstance(c, (int, np.integer)) and not isinstance(c, bool) for c in columns):
+        return [feature_names[c] for c in columns]
+    raise UnsupportedModelError(f"Kolon secimi desteklenmiyor: {columns!r}")
+
+def _imputer_fill(imputer, i):
+    from sklearn.impute import SimpleImputer
+    if type(imputer) is not SimpleImputer or imputer.add_indicator:
+        raise UnsupportedModelError(f"Desteklenmeyen imputer: {imputer!r}")
+    if not _is_nan(imputer.missing_values):
+        raise UnsupportedModelError("Yalnizca NaN eksik degerleri destekleniyor.")
+    return imputer.statistics_[i]
+
+def _column_slots(transformer, columns):
+    # Bir ColumnTransformer adiminin (slot, cikti genisligi) listesi.
+    from sklearn.pipeline import Pipeline
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    steps = list(transformer.steps) if isinstance(transformer, Pipeline) else [(None, transformer)]
+    steps = [step for _, step in steps if step != "passthrough" and step is not None]
+    if steps and isinstance(steps[-1], OneHotEncoder):
+        encoder = steps[-1]
+        if len(steps) > 2 or (len(steps) == 2 and type(steps[0]) is not SimpleImputer):
+            raise UnsupportedModelError("OneHotEncoder'dan once yalnizca SimpleImputer destekleniyor.")
+        if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+            raise UnsupportedModelError("OneHotEncoder drop/infrequent ayarlari desteklenmiyor.")
+        if encoder.handle_unknown not in ("ignore", "infrequent_if_exist"):
+            raise UnsupportedModelError("Bilinmeyen kategoride hata veren OneHotEncoder desteklenmiyor.")
+        imputer = steps[0] if len(steps) == 2 else None
+        slots = []
+        for i, column in enumerate(columns):
+            fill = _imputer_fill(imputer, i) if imputer is not None else None
+            slot = _CategoricalSlot(column, encoder.categories_[i], fill_value=fill, impute=imputer is not None)
+            slots.append((slot, len(slot.categories)))
+        return slots
+
+    slots = [_NumericSlot(column) for column in columns]
+    for step in steps:
+        if isinstance(step, SimpleImputer):
+            if any(slot.steps or slot.fill_value is not None for slot in slots):
+                raise UnsupportedModelError("SimpleImputer sayisal adimlarin basinda olmali.")
+            for i, slot in enumerate(slots):
+                slot.fill_value = float(_imputer_fill(step, i))
+        elif type(step) is StandardScaler:
+            for i, slot in enumerate(slots):
+                shift = float(step.mean_[i]) if step.with_mean else 0.0
+                scale = float(step.scale_[i]) if step.with_std else 1.0
+                slot.steps.append((shift, scale))
+        else:
+            raise UnsupportedModelError(f"Desteklenmeyen donusturucu: {step!r}")
+    return [(slot, 1) for slot in slots]
+
+def _preprocessor_slots(preprocessor, estimator):
+    from sklearn.compose import ColumnTransformer
+
+    if preprocessor is None:
+        names = getattr(estimator, "feature_names_in_", None)
+        if names is None:
+            raise UnsupportedModelError("Kolon adlari olmadan egitilmis model desteklenmiyor.")
+        return [(_NumericSlot(name), 1) for name in names]
+    if type(preprocessor) is not ColumnTransformer:
+        raise UnsupportedModelError(f"Desteklenmeyen on isleme adimi: {preprocessor!r}")
+    feature_names = getattr(preprocessor, "feature_names_in_", None)
+    slots = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        columns = _named_columns(columns, feature_names)
+        if not columns:
+            continue
+        slots.extend(_column_slots(transformer, columns))
+    return slots
+
+
+class _Forest:
+    # Tum agaclarin dugumleri tek dizide. Her dugum "lo < x <= hi ise ikinci cocuga git"
+    # testine indirgenir: sayisal dugumde (esik, +inf], kategorik dugumde kategori kodunun
+    # cevresindeki (kod - 0.5, kod + 0.5] araligi. Yapraklar kendine doner.
+
+    def __init__(self, trees, column_map, weight, bias):
+        features, lows, highs, children, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for tree in trees:
+            t = tree.tree_
+            if t.n_outputs != 1:
+                raise UnsupportedModelError("Cok cikisli agaclar desteklenmiyor.")
+            n = t.node_count
+            leaf = t.children_left == -1
+            feature = np.where(leaf, 0, t.feature)
+            code = column_map[feature, 1]
+            is_cat = (code >= 0) & ~leaf
+            left = np.where(leaf, np.arange(n), t.children_left)
+            right = np.where(leaf, np.arange(n), t.children_right)
+            # One-hot kolonun degeri 1 (eslesme) ya da 0'dir; hangi cocuga gidilecegi esikten bulunur.
+            match_child = np.where(1.0 <= t.threshold, left, right)
+            other_child = np.where(0.0 <= t.threshold, left, right)
+            features.append(column_map[feature, 0])
+            lows.append(np.where(is_cat, code - 0.5, t.threshold))
+            highs.append(np.where(is_cat, code + 0.5, np.inf))
+            children.append(np.stack([np.where(is_cat, other_child, left),
+                                      np.where(is_cat, match_child, right)], axis=1) + offset)
+            values.append(t.value[:, 0, 0])
+            roots.append(offset)
+            offset += n
+            depth = max(depth, t.max_depth)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.low = np.concatenate(lows).astype(np.float64)
+        self.high = np.concatenate(highs).astype(np.float64)
+        self.children = np.concatenate(children).astype(np.intp).ravel()
+        self.value = np.concatenate(values).astype(np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = depth
+        self.weight = weight
+        self.bias = bias
+
+    @property
+    def n_nodes(self):
+        return len(self.value)
+
+    def leaves(self, Z):
+        n, n_slots = Z.shape
+        flat = Z.ravel()
+        row_offset = (np.arange(n, dtype=np.intp) * n_slots)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots)))
+        for _ in range(self.depth):
+            x = flat[row_offset + self.feature[node]]
+            second = (x > self.low[node]) & (x <= self.high[node])
+            node = self.children[2 * node + second]
+        return self.value[node]
+
+    def predict(self, Z):
+        values = self.leaves(Z)
+        # sklearn ile ayni toplama sirasi (agaclar sirayla eklenir): sonuclar bit bit ayni kalir.
+        if self.bias is None:
+            return np.cumsum(values, axis=1)[:, -1] / values.shape[1]
+        terms = np.empty((len(values), values.shape[1] + 1))
+        terms[:, 0] = self.bias
+        terms[:, 1:] = self.weight * values
+        return np.cumsum(terms, axis=1)[:, -1]
+
+
+def _forest_for(estimator, column_map):
+    from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
+    from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor, GradientBoostingRegressor
+
+    if type(estimator) in (DecisionTreeRegressor, ExtraTreeRegressor):
+        return _Forest([estimator], column_map, weight=1.0, bias=None)
+    if type(estimator) in (RandomForestRegressor, ExtraTreesRegressor):
+        return _Forest(estimator.estimators_, column_map, weight=1.0, bias=None)
+    if type(estimator) is GradientBoostingRegressor:
+        init = estimator.init_
+        if isinstance(init, str) and init == "zero":
+            bias = 0.0
+        elif hasattr(init, "constant_"):
+            bias = float(np.ravel(init.constant_)[0])
+        else:
+            raise UnsupportedModelError("GradientBoosting icin yalnizca sabit baslangic tahmini destekleniyor.")
+        return _Forest(estimator.estimators_[:, 0], column_map, weight=float(estimator.learning_rate), bias=bias)
+    raise UnsupportedModelError(f"Desteklenmeyen model tipi: {type(estimator).__name__}")
+
+
+class CompiledModel:
+    # sklearn modeli ile ayni predict(DataFrame) arayuzu. DataFrame olmayan girdi ya da motorun
+    # isleyemedigi bir deger gelirse cagri orijinal modele devredilir; sonuc veya hata sklearn'inkiyle ayni olur.
+
+    def __init__(self, estimator):
+        from sklearn.pipeline import Pipeline
+
+        self.estimator = estimator
+        if isinstance(estimator, Pipeline):
+            steps = [step for _, step in estimator.steps if step != "passthrough" and step is not None]
+            if len(steps) > 2:
+                raise UnsupportedModelError("Pipeline en fazla bir on isleme adimi ve bir modelden olusmali.")
+            preprocessor, final = (steps[0], steps[-1]) if len(steps) == 2 else (None, steps[-1])
+        else:
+            preprocessor, final = None, estimator
+
+        slots = _preprocessor_slots(preprocessor, final)
+        column_map = []  # donusmus kolon -> (slot, kategori kodu; sayisal ise -1)
+        for i, (slot, width) in enumerate(slots):
+            column_map.extend((i, code if slot.kind == "categorical" else -1) for code in range(width))
+        n_features = getattr(final, "n_features_in_", None)
+        if n_features is not None and n_features != len(column_map):
+            raise UnsupportedModelError(f"Donusmus kolon sayisi ({len(column_map)}) modelinkiyle ({n_features}) uyusmuyor.")
+        self.slots = [slot for slot, _ in slots]
+        self.forest = _forest_for(final, np.asarray(column_map, dtype=np.intp).reshape(-1, 2))
+        self.fallbacks = 0
+
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        Z = np.empty((len(df), len(self.slots)), dtype=np.float64)
+        for i, slot in enumerate(self.slots):
+            Z[:, i] = slot.encode(df[slot.column].to_numpy())
+        return Z
+
+    def encode_records(self, records) -> np.ndarray:
+        # dict listesini DataFrame kurmadan kodlar; eksik alan None sayilir. Sonuc, ayni kayitlarla
+        # kurulan DataFrame'in encode() ciktisiyla aynidir. pandas'in tip cikariminin sonucu
+        # degistirebilecegi girdilerde (kategorik kolonda metin olmayan deger) ValueError firlatir;
+        # cagiran DataFrame yoluna doner.
+        records = list(records)
+        Z = np.empty((len(records), len(self.slots)), dtype=np.float64)
+        for i, slot in enumerate(self.slots):
+            values = np.empty(len(records), dtype=object)
+            values[:] = [record.get(slot.column) for record in records]
+            if slot.kind == "categorical" and any(v is not None and not isinstance(v, str) for v in values):
+                raise ValueError(f"'{slot.column}' kolonunda metin olmayan kategori degeri var.")
+            Z[:, i] = slot.encode(values)
+        return Z
+
+    def expand_countries(self, Z, countries):
+        # Kodlanmis satirlari her ulke icin cogaltir (expand_frame_countries ile ayni sira: ulkeler
+        # satir icinde ardisik); ulke slotlarina onceden kodlanmis ulke kodlari yazilir.
+        countries = np.asarray(list(countries), dtype=object)
+        out = np.repeat(Z, len(countries), axis=0)
+        for i, slot in enumerate(self.slots):
+            if slot.column == "country":
+                out[:, i] = np.tile(slot.encode(countries), len(Z))
+        return out
+
+    def predict_encoded(self, Z):
+        # encode()/encode_records() ciktisi icin tahmin; kodlama adimi atlanir.
+        if len(Z) <= _BLOCK_ROWS:
+            return self.forest.predict(Z)
+        return np.concatenate([self.forest.predict(Z[start:start + _BLOCK_ROWS])
+                               for start in range(0, len(Z), _BLOCK_ROWS)])
+
+    def _predict(self, df):
+        if len(df) <= _BLOCK_ROWS:
+            return self.forest.predict(self.encode(df))
+        return np.concatenate([
+            self.forest.predict(self.encode(df.iloc[start:start + _BLOCK_ROWS]))
+            for start in range(0, len(df), _BLOCK_ROWS)
+        ])
+
+    def predict(self, X):
+        if not isinstance(X, pd.DataFrame):
+            return self.estimator.predict(X)
+        try:
+            return self._predict(X)
+        except Exception:
+            self.fallbacks += 1
+            return self.estimator.predict(X)
+
+    def synthetic_frame(self, n=256, seed=0):
+        # Parite kontrolu icin: kategorilerden, eksik/bilinmeyen degerlerden ve sayisal
+        # istatistiklerin cevresinden rastgele satirlar.
+        rng = np.random.default_rng(seed)
+        columns = {}
+        for slot in self.slots:
+            if slot.column in columns:
+                continue
+            if slot.kind == "categorical":
+                pool = np.array(slot.categories + [None, np.nan, "__bilinmeyen__"], dtype=object)
+                columns[slot.column] = pool[rng.integers(0, len(pool), n)]
+            else:
+                center = slot.fill_value if slot.fill_value is not None else 0.0
+                x = center + rng.normal(0, max(abs(center), 1.0), n)
+                if slot.fill_value is not None:
+                    x[rng.random(n) < 0.1] = np.nan
+                columns[slot.column] = x
+        return pd.DataFrame(columns)
+
+    def check_parity(self, sample=None, rtol=1e-9, atol=1e-9):
+        frames = [self.synthetic_frame()]
+        if sample is not None and len(sample):
+            frames.append(sample)
+        for frame in frames:
+            expected = np.asarray(self.estimator.predict(frame), dtype=np.float64).ravel()
+            got = self._predict(frame)
+            if not np.allclose(got, expected, rtol=rtol, atol=atol, equal_nan=True):
+                worst = float(np.nanmax(np.abs(got - expected)))
+                raise ParityError(f"Derlenmis model sklearn ile uyusmuyor (en buyuk fark {worst:.3g}).")
+
+    def info(self):
+        return {"engine": "compiled", "slots": len(self.slots), "trees": len(self.forest.roots),
+                "nodes": self.forest.n_nodes, "depth": self.forest.depth, "fallbacks": self.fallbacks}
+
+
+class RowTemplates:
+    # Sik tekrarlanan girdilerin (katalog urunleri) bir kez kodlanmis satirlari. Anahtari ayni olan
+    # bir istek kodlama yapilmadan bu satirla, ulke taramasinda ise yalnizca ulke slotu degistirilerek
+    # skorlanir. keys: satirlarla ayni sirada hashable anahtarlar (ilk gelen gecerlidir).
+
+    def __init__(self, model, Z, keys):
+        self.model = model
+        self.Z = Z
+        self.keys = list(keys)
+        self.rows = {}
+        for row, key in enumerate(self.keys):
+            self.rows.setdefault(key, row)
+
+    @classmethod
+    def from_records(cls, model, records, keys):
+        return cls(model, model.encode_records(records), keys)
+
+    def with_rows(self, rows, records, keys):
+        # Verilen satirlari (mevcut ya da sona eklenen) yeni kayitlarla kodlanmis bir kopya;
+        # diger satirlar yeniden kodlanmaz.
+        rows = list(rows)
+        n = max([len(self.Z)] + [row + 1 for row in rows])
+        Z = np.empty((n, self.Z.shape[1]), dtype=np.float64)
+        Z[:len(self.Z)] = self.Z
+        all_keys = self.keys + [None] * (n - len(self.keys))
+        if rows:
+            Z[rows] = self.model.encode_records(records)
+            for row, key in zip(rows, keys):
+                all_keys[row] = key
+        return RowTemplates(self.model, Z, all_keys)
+
+    def __len__(self):
+        return len(self.Z)
+
+    def row(self, key):
+        return self.rows.get(key)
+
+    def country_matrix(self, rows, countries):
+        # (len(rows) x ulke sayisi) tahmini fiyatlar.
+        countries = list(countries)
+        base = self.Z[rows]
+        return self.model.predict_encoded(self.model.expand_countries(base, countries)).reshape(len(base), len(countries))
+
+    def stats(self):
+        return {"rows": len(self.Z), "keys": len(self.rows), "nbytes": int(self.Z.nbytes)}
+
+
+def compile_model(estimator, sample=None):
+    compiled = CompiledModel(estimator)
+    compiled.check_parity(sample)
+    return compiled
+
+def load_engine(estimator, engine="sklearn", sample=None):
+    # engine="compiled" ise modeli derler ve sklearn ile karsilastirir; desteklenmeyen yapi ya da
+    # uyumsuzlukta sklearn modeli oldugu gibi kullanilir.
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen tahmin motoru: {engine}. Secenekler: {', '.join(ENGINES)}")
+    if engine == "sklearn":
+        return estimator
+    try:
+        return compile_model(estimator, sample)
+    except (UnsupportedModelError, ParityError) as e:
+        logging.warning(f"Derlenmis tahmin motoru kullanilamiyor, sklearn'e donuluyor: {e}")
+        return estimator
+
+def engine_info(model):
+    return model.info() if isinstance(model, CompiledModel) else {"engine": "sklearn", "model": type(model).__name__}
@@ -8,51 +8,73 @@ import joblib
 import numpy as np
 import pandas as pd
 
+try:
+    from .preprocess import compiled_preprocessor
+    from .inference import ENGINES, load_engine
+except ImportError:
+    from preprocess import compiled_preprocessor
+    from inference import ENGINES, load_engine
 
-def load_model_and_features(model_path: str, features_path: str):
-    model = joblib.load(model_path)
+DEFAULT_COUNTRIES = ["USA", "Germany", "France", "India", "Turkey", "China"]
+
+
+def load_model_and_features(model_path: str, features_path: str, engine: str = "sklearn"):
+    model = load_engine(joblib.load(model_path), engine)
     with open(features_path, "r", encoding="utf-8") as f:
         feature_cols = json.load(f)
     return model, feature_cols
 
 def coerce_types_and_align(df: pd.DataFrame, feature_cols):
-    df = df.copy()
-    for col in df.columns:
-        if df[col].dtype == object:
-            s = df[col].astype(str).str.lower()
-            if s.isin(["true", "false"]).any():
-                df.loc[s.eq("true"), col] = True
-                df.loc[s.eq("false"), col] = False
-                df[col] = df[col].astype("boolean").astype(bool)
-            else:
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except Exception:
-                    pass
-    for c in feature_cols:
-        if c not in df.columns:
-            df[c] = np.nan
-    df = df[feature_cols]
-    return df
+    return compiled_preprocessor(tuple(feature_cols)).transform(df)
 
 def predict_from_dataframe(model, feature_cols, df_in: pd.DataFrame) -> pd.Series:
     df_prepped = coerce_types_and_align(df_in, feature_cols)
     preds = model.predict(df_prepped)
     return pd.Series(preds, index=df_in.index, name="prediction_price_usd")
 
+def records_frame(records) -> pd.DataFrame:
+    # Bazi kayitlarda olmayan metin alanlari NaN yerine None olur; tek kayitlik
+    # DataFrame'de eksik alanin aldigi degerle ayni kalsin diye.
+    df = pd.DataFrame(list(records))
+    for col in df.columns:
+        if df[col].dtype == object and df[col].isna().any():
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+def expand_countries(base_input: dict, countries_list) -> pd.DataFrame:
+    return expand_countries_batch([base_input], countries_list)
+
+def expand_countries_batch(base_inputs, countries_list) -> pd.DataFrame:
+    return expand_frame_countries(records_frame(base_inputs), countries_list)
+
+def expand_frame_countries(base: pd.DataFrame, countries_list) -> pd.DataFrame:
+    # Her satiri her ulke icin bir satir olacak sekilde cogaltir (girdi sirasiyla,
+    # ulkeler satir icinde ardisik); tum satirlar tek model.predict cagrisinda skorlanir.
+    countries_list = list(countries_list)
+    df = base.iloc[np.repeat(np.arange(len(base)), len(countries_list))].reset_index(drop=True)
+    df["country"] = countries_list * len(base)
+    return df
+
+def predict_country_matrix(model, feature_cols, df_in: pd.DataFrame, countries_list) -> np.ndarray:
+    # (satir sayisi x ulke sayisi) tahmini fiyat matrisi.
+    countries_list = list(countries_list)
+    if len(df_in) == 0 or not countries_list:
+        return np.empty((len(df_in), len(countries_list)))
+    df_countries = expand_frame_countries(df_in, countries_list)
+    preds = model.predict(coerce_types_and_align(df_countries, feature_cols))
+    return np.asarray(preds, dtype=float).reshape(len(df_in), len(countries_list))
+
+def predict_prices_for_countries(model, feature_cols, base_input, countries_list) -> np.ndarray:
+    countries_list = list(countries_list)
+    if not countries_list:
+        return np.empty(0)
+    df_countries = expand_countries(base_input, countries_list)
+    return predict_from_dataframe(model, feature_cols, df_countries).to_numpy()
+
 def best_trade_route_for_product(model, feature_cols, base_input, countries_list):
-    predictions = []
-    for country in countries_list:
-        sample = base_input.copy()
-        sample["country"] = country
-        df_sample = pd.DataFrame([sample])
-        pred_price = predict_from_dataframe(model, feature_cols, df_sample).iloc[0]
-        predictions.append({
-            "country": country,
-            "price_usd": round(float(pred_price), 2)
-        })
-    
-   
+    predictions = predict_for_all_countries(model, feature_cols, base_input, countries_list)
+    predictions = [{"country": p["country"], "price_usd": p["predicted_price_usd"]} for p in predictions]
+
     cheapest = min(predictions, key=lambda x: x["price_usd"])
     most_expensive = max(predictions, key=lambda x: x["price_usd"])
     profit = round(most_expensive["price_usd"] - cheapest["price_usd"], 2)
@@ -79,23 +101,25 @@ def parse_kv_pairs(kv_list):
     return out
 
 def predict_for_all_countries(model, feature_cols, base_input, countries_list):
-    results = []
-    for country in countries_list:
-        sample = base_input.copy()
-        sample['country'] = country
-        df_sample = pd.DataFrame([sample])
-        pred_price = predict_from_dataframe(model, feature_cols, df_sample).iloc[0]
-        results.append({
-            "country": country,
-            "predicted_price_usd": round(float(pred_price), 2)
-        })
-    return results
+    countries_list = list(countries_list)
+    preds = predict_prices_for_countries(model, feature_cols, base_input, countries_list)
+    return [
+        {"country": country, "predicted_price_usd": round(float(pred_price), 2)}
+        for country, pred_price in zip(countries_list, preds)
+    ]
 
 def main():
     ap = argparse.ArgumentParser(description="E-ticaret fiyat tahmin modeli")
     ap.add_argument("--model_path", default="ecomm_price_model_rf.joblib", help="Joblib model yolu")
     ap.add_argument("--features_path", default="feature_columns.json", help="Özellik listesi JSON yolu")
     ap.add_argument("--kv", action="append", help='Tek örnek için key=value çiftleri')
+    ap.add_argument("--input", help="Toplu skorlama için girdi dosyası (.csv, .parquet, .xlsx)")
+    ap.add_argument("--output", help="Toplu skorlama çıktısı (.csv veya .parquet)")
+    ap.add_argument("--chunksize", type=int, default=50000, help="Parça başına satır sayısı")
+    ap.add_argument("--countries", nargs="*", default=None, help="Ülke fiyat matrisi için ülkeler (boş: matris yazma)")
+    ap.add_argument("--id_cols", nargs="*", default=["product_id"], help="Çıktıya aynen kopyalanacak kolonlar")
+    ap.add_argument("--workers", type=int, default=1, help="Parçaları paralel skorlayan süreç sayısı")
+    ap.add_argument("--engine", choices=ENGINES, default="sklearn", help="Tahmin motoru (compiled: NumPy ağaç motoru)")
     args = ap.parse_args()
 
     if not Path(args.model_path).exists():
@@ -105,11 +129,27 @@ def main():
         print(f"Özellik listesi bulunamadı: {args.features_path}", file=sys.stderr)
         sys.exit(1)
 
-    model, feature_cols = load_model_and_features(args.model_path, args.features_path)
+    if args.input:
+        if not args.output:
+            print("--input ile birlikte --output verilmeli", file=sys.stderr)
+            sys.exit(2)
+        try:
+            from .batch_scoring import score_file
+        except ImportError:
+            from batch_scoring import score_file
+        n_rows = score_file(
+            args.model_path, args.features_path, args.input, args.output,
+            countries_list=args.countries, id_cols=args.id_cols,
+            chunksize=args.chunksize, workers=args.workers, engine=args.engine,
+        )
+        print(f"{n_rows} satır skorlandı: {args.output}")
+        return
+
+    model, feature_cols = load_model_and_features(args.model_path, args.features_path, args.engine)
 
     if args.kv:
         sample = parse_kv_pairs(args.kv)
-        all_countries = ["USA", "Germany", "France","India","Turkey","China"]
+        all_countries = DEFAULT_COUNTRIES
 
         predictions = predict_for_all_countries(model, feature_cols, sample, all_countries)
 
@@ -124,6 +164,7 @@ def main():
    
     print("Kullanim örneği:")
     print('python predict.py --kv "category=Electronics" --kv "brand=Sony" --kv "city=Berlin" --kv "shipping_cost=6.0" --kv "seller=DemoSeller" --kv "stock=True" --kv "platform=Amazon" --kv "month=7"')
+    print('python predict.py --input katalog.csv --output fiyatlar.csv --countries USA Germany Turkey --workers 4')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,107 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# feature_columns.json yalnizca kolon adlarini tutar; bilinen kolonlarin tipleri burada.
+# Listede olmayan kolonlar "auto" ile eski cikarim kurallarina gore donusturulur.
+FEATURE_DTYPES = {
+    "category": "category",
+    "brand": "category",
+    "country": "category",
+    "city": "category",
+    "seller": "category",
+    "platform": "category",
+    "product_name_clean": "category",
+    "country_clean": "category",
+    "category_clean": "category",
+    "shipping_cost": "numeric",
+    "month": "numeric",
+    "stock": "bool",
+}
+
+_BOOL_TOKENS = {"true": True, "false": False}
+
+
+def _to_numeric(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return pd.to_numeric(s, errors="coerce")
+
+def _to_bool(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s
+    # Tek tek deger yerine benzersiz degerler uzerinden eslenir; katalogda birkac farkli deger vardir.
+    uniques = pd.unique(s)
+    mapping = {}
+    for v in uniques:
+        if isinstance(v, (bool, np.bool_)):
+            mapping[v] = bool(v)
+        elif isinstance(v, str) and v.strip().lower() in _BOOL_TOKENS:
+            mapping[v] = _BOOL_TOKENS[v.strip().lower()]
+        else:
+            mapping[v] = pd.to_numeric(v, errors="coerce") if v is not None else np.nan
+    out = s.map(mapping)
+    if out.isna().any():
+        return out.astype(float)
+    if all(isinstance(v, bool) for v in mapping.values()):
+        return out.astype(bool)
+    return out.astype(float)
+
+def _to_category(s: pd.Series) -> pd.Series:
+    return s
+
+def _auto(s: pd.Series) -> pd.Series:
+    # coerce_types_and_align'in onceki davranisi: true/false metinleri bool, sayisal metinler sayi olur.
+    if s.dtype != object:
+        return s
+    lowered = s.astype(str).str.lower()
+    if lowered.isin(["true", "false"]).any():
+        out = s.copy()
+        out[lowered.eq("true")] = True
+        out[lowered.eq("false")] = False
+        return out.astype("boolean").astype(bool)
+    try:
+        return pd.to_numeric(s)
+    except Exception:
+        return s
+
+_CONVERTERS = {
+    "numeric": _to_numeric,
+    "bool": _to_bool,
+    "category": _to_category,
+    "auto": _auto,
+}
+
+
+class FeaturePreprocessor:
+    # feature listesinden bir kez derlenen donusturucu: her kolon icin tipi ve donusum
+    # fonksiyonu onceden secilir, hizalama ve tip donusumu tek geciste yapilir.
+
+    def __init__(self, feature_cols, dtypes=None):
+        dtypes = {**FEATURE_DTYPES, **(dtypes or {})}
+        self.feature_cols = list(feature_cols)
+        self.dtypes = {col: dtypes.get(col, "auto") for col in self.feature_cols}
+        self._converters = [(col, _CONVERTERS[self.dtypes[col]]) for col in self.feature_cols]
+
+    @classmethod
+    def from_json(cls, features_path, dtypes=None):
+        with open(features_path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), dtypes=dtypes)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = {}
+        for col, convert in self._converters:
+            if col in df.columns:
+                columns[col] = convert(df[col])
+            else:
+                columns[col] = pd.Series(np.nan, index=df.index)
+        return pd.DataFrame(columns, index=df.index, copy=False)
+
+    __call__ = transform
+
+
+@lru_cache(maxsize=8)
+def compiled_preprocessor(feature_cols: tuple) -> FeaturePreprocessor:
+    return FeaturePreprocessor(feature_cols)
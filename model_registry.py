@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+
+from model.inference import engine_info
+from model.predict import load_model_and_features
+
+
+def artifact_fingerprint(*paths):
+    # Dosya degisikligini yeniden okumadan anlamak icin (mtime_ns, boyut) ciftleri.
+    fingerprint = []
+    for path in paths:
+        st = os.stat(path)
+        fingerprint.append((st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    # Yuklu bir model surumu. Nesne degismez: takas yalnizca registry'nin referansini
+    # degistirir, eski surumu elinde tutan istekler onunla tamamlanir.
+    version: int
+    model: object = field(repr=False)
+    feature_cols: tuple
+    fingerprint: tuple
+    loaded_at: float
+    load_seconds: float
+    warmup_seconds: float = 0.0
+
+    def info(self):
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+            "warmup_seconds": round(self.warmup_seconds, 4),
+            "n_features": len(self.feature_cols),
+            **engine_info(self.model),
+        }
+
+
+class ModelRegistry:
+    # Model ve feature listesini dosyadan yukler, ornek bir toplu tahminle isitir ve tek bir
+    # atamayla devreye alir. Yeniden yukleme admin cagrisiyla (reload / reload_async) ya da
+    # dosyalari izleyen arka plan thread'iyle (start_watching) tetiklenir. Yukleme veya isitma
+    # basarisiz olursa mevcut surum calismaya devam eder.
+    # warmup: fn(ModelVersion); hata firlatirsa yeni surum reddedilir.
+    # engine: "sklearn" ya da "compiled" (model/inference.py; desteklenmezse sklearn'e doner).
+
+    def __init__(self, model_path, features_path, warmup=None, history_size=20, engine="sklearn"):
+        self.model_path = str(model_path)
+        self.features_path = str(features_path)
+        self.engine = engine
+        self.warmup = warmup
+        self.history = deque(maxlen=history_size)
+        self._current = None
+        self._next_version = 1
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._background = None
+        self._watch_interval = None
+        self._watcher = None
+        self._watcher_pid = None
+        self._fork_hook = False
+
+    @property
+    def current(self) -> ModelVersion:
+        current = self._current
+        if current is None:
+            raise RuntimeError("Henuz yuklu bir model surumu yok.")
+        return current
+
+    def subscribe(self, listener):
+        # listener(yeni, eski): her basarili takastan sonra, takasi yapan thread'de cagrilir.
+        self._listeners.append(listener)
+
+    def fingerprint(self):
+        return artifact_fingerprint(self.model_path, self.features_path)
+
+    def is_stale(self):
+        current = self._current
+        return current is None or self.fingerprint() != current.fingerprint
+
+    def _load_version(self, version):
+        fingerprint = self.fingerprint()
+        start = time.perf_counter()
+        model, feature_cols = load_model_and_features(self.model_path, self.features_path, self.engine)
+        loaded = ModelVersion(version, model, tuple(feature_cols), fingerprint,
+                              loaded_at=time.time(), load_seconds=time.perf_counter() - start)
+        if self.warmup is None:
+            return loaded
+        start = time.perf_counter()
+        self.warmup(loaded)
+        return replace(loaded, warmup_seconds=time.perf_counter() - start)
+
+    def reload(self, force=False):
+        # Yeni surumu cagiran thread'de yukler ve isitir. Dosyalar degismediyse (force
+        # verilmedikce) None doner. Hata yukari firlatilir; mevcut surum yerinde kalir.
+        with self._reload_lock:
+            previous = self._current
+            if not force and not self.is_stale():
+                return None
+            version = self._next_version
+            self._next_version += 1
+            try:
+                loaded = self._load_version(version)
+            except Exception as e:
+                self.history.append({"version": version, "status": "failed", "error": str(e), "at": time.time()})
+                logging.error(f"Model surumu {version} yuklenemedi, mevcut surum kullaniliyor: {e}")
+                raise
+            self._current = loaded
+            self.history.append({**loaded.info(), "status": "active"})
+            logging.info(f"Model surumu {version} devrede (yukleme {loaded.load_seconds:.2f} sn, "
+                         f"isitma {loaded.warmup_seconds:.2f} sn).")
+        for listener in self._listeners:
+            try:
+                listener(loaded, previous)
+            except Exception as e:
+                logging.error(f"Model takasi dinleyicisi hata verdi: {e}")
+        return loaded
+
+    def reload_async(self, force=False):
+        # Arka planda yeniden yukler. Zaten bir yukleme suruyorsa yenisini baslatmaz.
+        background = self._background
+        if background is not None and background.is_alive():
+            return False
+
+        def run():
+            try:
+                self.reload(force=force)
+            except Exception:
+                pass  # reload hatayi kaydetti ve logladi
+
+        self._background = threading.Thread(target=run, name="model-reload", daemon=True)
+        self._background.start()
+        return True
+
+    def start_watching(self, interval=5.0):
+        # Dosyalari interval saniyede bir yoklar. Yazimi yarim kalmis bir dosyayi okumamak icin
+        # parmak izi iki ardisik yoklamada ayni kalinca yukler. fork edilen worker'larda
+        # izleyici thread yeniden baslatilir.
+        self._watch_interval = interval
+        if not self._fork_hook and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._restart_watcher)
+            self._fork_hook = True
+        self._restart_watcher()
+
+    def _restart_watcher(self):
+        if self._watch_interval is None:
+            return
+        if self._watcher is not None and self._watcher.is_alive() and self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        self._watcher = threading.Thread(target=self._watch, args=(self._watch_interval,),
+                                         name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        seen = None
+        failed = None
+        while True:
+            time.sleep(interval)
+            try:
+                fingerprint = self.fingerprint()
+            except OSError:
+                seen = None  # dosya degistirilirken gecici olarak yok olabilir
+                continue
+            stable = fingerprint == seen
+            seen = fingerprint
+            current = self._current
+            if not stable or fingerprint == failed or (current is not None and fingerprint == current.fingerprint):
+                continue
+            try:
+                self.reload()
+            except Exception:
+                failed = fingerprint  # ayni bozuk dosya tekrar tekrar denenmesin
+
+    def stats(self):
+        current = self._current
+        return {
+            "current": current.info() if current is not None else None,
+            "model_path": self.model_path,
+            "features_path": self.features_path,
+            "watching": self._watch_interval,
+            "reloading": self._background is not None and self._background.is_alive(),
+            "history": list(self.history),
+        }
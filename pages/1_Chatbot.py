@@ -1,12 +1,17 @@
 import os
 import streamlit as st
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-model = genai.GenerativeModel("models/gemini-2.5-pro")
+
+@st.cache_resource
+def get_model():
+    # Streamlit her etkilesimde sayfayi bastan calistirir; istemci surec basina bir kez,
+    # ilk mesajda kurulur.
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel("models/gemini-2.5-pro")
 
 st.title("💬 E-Ticaret Chatbot")
 st.write("Ucuz üretim - pahali satiş için akilli öneriler alin.")
@@ -19,7 +24,7 @@ user_input = st.text_input("✍️ Mesajinizi yazin:")
 if st.button("Gönder"):
     if user_input.strip() != "":
         st.session_state.chat_history.append(("Sen", user_input))
-        response = model.generate_content(user_input)
+        response = get_model().generate_content(user_input)
         st.session_state.chat_history.append(("Bot", response.text))
     else:
         st.warning("Lütfen bir mesaj yazin.")
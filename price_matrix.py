@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Katalog urunleri x ulkeler icin onceden hesaplanmis tahmini fiyat matrisi (float32).
+# Satirlar ProductStore satir sirasindadir; bir istek, ulke taramasinin girdisi (ulke haric
+# feature degerleri) bir katalog urunununkiyle ayniysa onerileri modeli cagirmadan tek satirdan
+# alir. Tamamlanan matris <cache_dir>/price_matrix-<ozet>.f32 dosyasina yazilir ve memory-map ile
+# acilir; ozet model dosyasinin parmak izi, feature listesi, ulke listesi ve katalog anahtarlarindan
+# uretildigi icin herhangi biri degisince yeni dosya olusur.
+#
+#   python price_matrix.py     -> matrisi servis baslamadan (cevrimdisi) hesaplayip diske yazar
+
+DEFAULT_CACHE_DIR = ".cache"
+
+
+def row_key(base, feature_cols):
+    # Ulke taramasinin model girdisi: ulke haric tum feature'lar (eksik olanlar None).
+    return tuple(base.get(col) for col in feature_cols if col != "country")
+
+def top_k_indices(values, k):
+    # En yuksek k degerin indeksleri, artan indeks sirasinda. Esit degerlerde (kararli
+    # siralamadaki gibi) once gelen ulke secilir.
+    n = len(values)
+    if k >= n:
+        return np.arange(n)
+    kth = values[np.argpartition(values, n - k)[n - k]]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    return np.sort(np.concatenate([above, ties]))
+
+def matrix_digest(fingerprint, feature_cols, countries, keys):
+    h = hashlib.sha256()
+    h.update(repr((fingerprint, tuple(feature_cols), tuple(countries))).encode())
+    for key in keys:
+        h.update(repr(key).encode())
+    return h.hexdigest()
+
+
+class PriceMatrix:
+    # Satirlar parca parca doldurulabilir: hesaplanmamis satirlar icin lookup None doner ve
+    # cagiran canli tahmine duser.
+
+    def __init__(self, version, model_key, countries, keys, values, filled, digest, path=None):
+        self.version = version
+        self.model_key = model_key  # (model dosyasi parmak izi, feature listesi)
+        self.countries = tuple(countries)
+        self.keys = keys
+        self.rows = {}
+        for row, key in enumerate(keys):
+            self.rows.setdefault(key, row)
+        self.values = values
+        self.filled = filled
+        self.digest = digest
+        self.path = path
+
+    @property
+    def complete(self):
+        return bool(self.filled.all())
+
+    def lookup(self, key):
+        row = self.rows.get(key)
+        if row is None or not self.filled[row]:
+            return None
+        return self.values[row]
+
+    def top_countries(self, key, k=5):
+        values = self.lookup(key)
+        if values is None:
+            return None
+        return [(self.countries[i], values[i]) for i in top_k_indices(values, k)]
+
+    def stats(self):
+        return {
+            "model_version": self.version,
+            "rows": len(self.keys),
+            "countries": len(self.countries),
+            "filled_rows": int(self.filled.sum()),
+            "complete": self.complete,
+            "memory_mapped": isinstance(self.values, np.memmap),
+            "nbytes": int(self.values.nbytes),
+        }
+
+
+class PriceMatrixBuilder:
+    # Matrisi diskten yukler ya da hesaplar. Katalog degistiginde (ayni model ve ulkeler) onceki
+    # matristeki satirlar anahtarla eslesip kopyalanir, yalnizca yeni satirlar hesaplanir.
+    # Model degistiginde tum satirlar yeniden hesaplanir; hesaplama bitene kadar eski surumun
+    # matrisi kullanilmaz (cagiran surum numarasini karsilastirir).
+    # score(bases) -> (len(bases), ulke sayisi) fiyat dizisi.
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, chunk_size=1024):
+        self.cache_dir = Path(cache_dir)
+        self.chunk_size = chunk_size
+        self.current = None
+        self.last_build_seconds = None
+        self._job = None
+        self._thread = None
+        self._fork_hook = False
+
+    def build(self, version, feature_cols, countries, keys, bases, score, background=True):
+        # bases(rows) -> satirlarin ulke taramasi girdileri (dict listesi).
+        feature_cols, countries, keys = tuple(feature_cols), tuple(countries), list(keys)
+        digest = matrix_digest(version.fingerprint, feature_cols, countries, keys)
+        path = self.cache_dir / f"price_matrix-{digest[:16]}.f32"
+        shape = (len(keys), len(countries))
+        model_key = (version.fingerprint, feature_cols)
+        self._job = None  # suren bir hesaplama varsa durur
+
+        loaded = self._open(path, shape)
+        if loaded is not None:
+            matrix = PriceMatrix(version.version, model_key, countries, keys, loaded,
+                                 np.ones(len(keys), dtype=bool), digest, path)
+            self._publish(matrix)
+            logging.info(f"Fiyat matrisi diskten yuklendi: {path} ({shape[0]} urun x {shape[1]} ulke)")
+            return matrix
+
+        values = np.zeros(shape, dtype=np.float32)
+        filled = np.zeros(len(keys), dtype=bool)
+        previous = self.current
+        if previous is not None and previous.model_key == model_key and previous.countries == countries:
+            for row, key in enumerate(keys):
+                old = previous.lookup(key)
+                if old is not None:
+                    values[row] = old
+                    filled[row] = True
+        matrix = PriceMatrix(version.version, model_key, countries, keys, values, filled, digest, path)
+        self._publish(matrix)
+
+        job = (matrix, bases, score)
+        self._job = job
+        if not background:
+            self._run(job)
+            return matrix
+        if not self._fork_hook and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._resume)
+            self._fork_hook = True
+        self._start(job)
+        return matrix
+
+    def _publish(self, matrix):
+        self.current = matrix
+
+    def _start(self, job):
+        self._thread = threading.Thread(target=self._run, args=(job,), name="price-matrix", daemon=True)
+        self._thread.start()
+
+    def _resume(self):
+        # fork edilen worker'da yarim kalan hesaplama worker'in kendi kopyasinda surdurulur.
+        job = self._job
+        if job is not None and not job[0].complete:
+            self._start(job)
+
+    def _run(self, job):
+        matrix, bases, score = job
+        start = time.perf_counter()
+        missing = np.flatnonzero(~matrix.filled)
+        try:
+            for i in range(0, len(missing), self.chunk_size):
+                if self._job is not job:
+                    return  # daha yeni bir hesaplama basladi
+                rows = missing[i:i + self.chunk_size]
+                matrix.values[rows] = score(bases(rows))
+                matrix.filled[rows] = True
+        except Exception as e:
+            logging.error(f"Fiyat matrisi hesaplanamadi, oneriler canli tahminle uretilecek: {e}")
+            return
+        if self._job is not job:
+            return
+        self.last_build_seconds = time.perf_counter() - start
+        logging.info(f"Fiyat matrisi {self.last_build_seconds:.2f} sn'de hesaplandi "
+                     f"({len(missing)} / {len(matrix.keys)} satir).")
+        self._save(matrix)
+
+    def _open(self, path, shape):
+        if not path.exists():
+            return None
+        try:
+            if path.stat().st_size != shape[0] * shape[1] * 4:
+                raise ValueError("dosya boyutu beklenenle uyusmuyor")
+            if shape[0] == 0 or shape[1] == 0:
+                return np.zeros(shape, dtype=np.float32)
+            return np.memmap(path, dtype=np.float32, mode="r", shape=shape)
+        except Exception as e:
+            logging.warning(f"Fiyat matrisi dosyasi okunamadi, yeniden hesaplanacak: {e}")
+            return None
+
+    def _save(self, matrix):
+        # Gecici dosyaya yazilip tek adimda yerine konur; eski ozetli dosyalar silinir. Yazilan
+        # dosya memory-map ile yeniden acilir (fork edilen worker'lar sayfa onbellegini paylasir).
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = matrix.path.with_name(matrix.path.name + f".{os.getpid()}.tmp")
+            matrix.values.tofile(tmp_path)
+            os.replace(tmp_path, matrix.path)
+            for stale in self.cache_dir.glob("price_matrix-*.f32"):
+                if stale != matrix.path:
+                    stale.unlink(missing_ok=True)
+            mapped = self._open(matrix.path, matrix.values.shape)
+            if mapped is not None:
+                matrix.values = mapped
+        except OSError as e:
+            logging.warning(f"Fiyat matrisi diske yazilamadi: {e}")
+
+    def stats(self):
+        matrix = self.current
+        return {
+            **(matrix.stats() if matrix is not None else {}),
+            "building": self._thread is not None and self._thread.is_alive(),
+            "last_build_seconds": self.last_build_seconds,
+        }
+
+
+if __name__ == "__main__":
+    os.environ["BACKEND_WARMUP"] = "manual"
+    os.environ["PRICE_MATRIX"] = "sync"
+    import backend
+    backend.start_warmup(background=False)
+    print(backend.price_matrix_builder.stats())
@@ -0,0 +1,147 @@
+import copy
+from array import array
+from collections import deque
+
+_CHAR_BITS = 21  # ord() en fazla 0x10FFFF
+
+
+class ProductMatcher:
+    # Aho-Corasick otomati: katalogdaki tum urun adlarini mesaj uzerinde tek geciste bulur.
+    # Gecisler tek bir dict'te (node << 21 | ord(ch)) anahtariyla tutulur; dugum basina
+    # ayri dict acmaktan cok daha az bellek harcar.
+
+    def __init__(self, names=()):
+        self.names = []
+        self._extra = None  # with_names ile eklenen adlarin otomati
+        self._goto = {}
+        self._fail = array("i", [0])
+        self._depth = array("i", [0])
+        self._pattern = array("i", [-1])   # dugumde biten urun adi
+        self._longest = array("i", [-1])   # dugumun en uzun son eki olan urun adi
+        self._dict_link = array("i", [-1])  # cikti zincirindeki bir sonraki dugum
+        for name in names:
+            self._insert(name)
+        self._build_links()
+
+    def __len__(self):
+        return len(self.names) + (len(self._extra) if self._extra is not None else 0)
+
+    def __contains__(self, name):
+        node = 0
+        for ch in name:
+            node = self._goto.get((node << _CHAR_BITS) | ord(ch))
+            if node is None:
+                break
+        else:
+            if name and self._pattern[node] != -1:
+                return True
+        return self._extra is not None and name in self._extra
+
+    def with_names(self, names, merge_ratio=0.125):
+        # Adlar eklenmis yeni bir eslestirici dondurur; mevcut nesne degismez. Eklenen adlar
+        # kucuk, ayri bir otomatta tutulur, boylece her eklemede yalnizca o otomat kurulur.
+        # Eklenenler ana otomatin merge_ratio katini asinca hepsi tek otomatta yeniden kurulur.
+        new = [name for name in dict.fromkeys(names) if name and name not in self]
+        if not new:
+            return self
+        added = (self._extra.names if self._extra is not None else []) + new
+        if len(added) > merge_ratio * len(self.names):
+            return ProductMatcher(self.names + added)
+        matcher = copy.copy(self)
+        matcher._extra = ProductMatcher(added)
+        return matcher
+
+    def _insert(self, name):
+        if not name:
+            return
+        node = 0
+        for ch in name:
+            key = (node << _CHAR_BITS) | ord(ch)
+            nxt = self._goto.get(key)
+            if nxt is None:
+                nxt = len(self._fail)
+                self._goto[key] = nxt
+                self._fail.append(0)
+                self._depth.append(self._depth[node] + 1)
+                self._pattern.append(-1)
+                self._longest.append(-1)
+                self._dict_link.append(-1)
+            node = nxt
+        if self._pattern[node] == -1:
+            self._pattern[node] = len(self.names)
+            self.names.append(name)
+
+    def _build_links(self):
+        children = [[] for _ in range(len(self._fail))]
+        for key, child in self._goto.items():
+            children[key >> _CHAR_BITS].append((key & ((1 << _CHAR_BITS) - 1), child))
+
+        queue = deque()
+        for _, child in children[0]:
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            fail = self._fail[node]
+            self._dict_link[node] = fail if self._pattern[fail] != -1 else self._dict_link[fail]
+            self._longest[node] = self._pattern[node] if self._pattern[node] != -1 else self._longest[fail]
+            for ch, child in children[node]:
+                f = fail
+                while True:
+                    nxt = self._goto.get((f << _CHAR_BITS) | ch)
+                    if nxt is not None:
+                        self._fail[child] = nxt
+                        break
+                    if f == 0:
+                        self._fail[child] = 0
+                        break
+                    f = self._fail[f]
+                queue.append(child)
+
+    def _step(self, node, ch):
+        goto = self._goto
+        while True:
+            nxt = goto.get((node << _CHAR_BITS) | ch)
+            if nxt is not None:
+                return nxt
+            if node == 0:
+                return 0
+            node = self._fail[node]
+
+    def find_all(self, text):
+        # (baslangic, bitis, urun_adi) listesi; ayni konumda biten tum eslesmeler dahil.
+        if self._extra is not None:
+            matches = self._find_all(text) + self._extra.find_all(text)
+            return sorted(matches, key=lambda match: (match[1], match[0]))
+        return self._find_all(text)
+
+    def _find_all(self, text):
+        matches = []
+        node = 0
+        for end, ch in enumerate(text, 1):
+            node = self._step(node, ord(ch))
+            out = node if self._pattern[node] != -1 else self._dict_link[node]
+            while out != -1:
+                matches.append((end - self._depth[out], end, self.names[self._pattern[out]]))
+                out = self._dict_link[out]
+        return matches
+
+    def longest_match(self, text):
+        # En uzun eslesen urun adi; esitlikte mesajda once gecen secilir.
+        name, length, end = self._longest_match(text)
+        if self._extra is not None:
+            extra_name, extra_length, extra_end = self._extra._longest_match(text)
+            if extra_length > length or (extra_length == length and extra_end < end):
+                name = extra_name
+        return name
+
+    def _longest_match(self, text):
+        best_id, best_len, best_end, node = -1, 0, len(text) + 1, 0
+        for end, ch in enumerate(text, 1):
+            node = self._step(node, ord(ch))
+            pattern_id = self._longest[node]
+            if pattern_id != -1:
+                length = len(self.names[pattern_id])
+                if length > best_len:
+                    best_id, best_len, best_end = pattern_id, length, end
+        return (self.names[best_id] if best_id != -1 else None), best_len, best_end
@@ -0,0 +1,326 @@
+import argparse
+import gc
+import importlib
+import io
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# Uretim sunucusu: model, veri seti ve urun store'u ana surecte bir kez yuklenir, sonra
+# N worker fork edilir. Salt okunur bellek sayfalari copy-on-write ile paylasilir; her
+# worker kendi sinirli thread havuzuyla ayni dinleme soketinden istek kabul eder.
+# Olay akislari (/chat/stream) baglantiyi istek thread'inden ayirir (environ["serve.detach"]);
+# bekleyen bir akis havuzdaki thread'i tutmaz.
+# Sohbet oturumlari birden fazla worker'da surec icinde tutulamaz (onay adimi baska worker'a
+# duser): --workers > 1 iken SESSION_STORE_URL verilmemisse paylasilan SQLite store
+# (<DATA_CACHE_DIR>/sessions.sqlite) kullanilir, acikca memory:// verilmisse sunucu baslamaz.
+#
+#   python serve.py --workers 4 --threads 8
+#   python serve.py --lazy     -> once fork, her worker kendi isinmasini arka planda yapar
+#                                 (/readyz 200 olana kadar 503; bellek paylasilmaz)
+#   kill -HUP <ana surec>   -> ana surec kendini yeniden calistirir (exec): backend temiz bir
+#                              surecte yuklenir, yeni worker'lar baslayinca eskiler kapatilir
+#   kill -TERM <ana surec>  -> worker'lar eldeki istekleri bitirip kapanir
+#   /metrics: her worker kendi sayaclarini worker="<pid>" etiketiyle verir (metrics.py)
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # Keep-alive kapali: bos bekleyen baglantilar havuzdaki thread'leri tutmasin.
+    protocol_version = "HTTP/1.0"
+    handoff = None
+
+    def make_environ(self):
+        environ = super().make_environ()
+        environ["serve.detach"] = self.detach
+        return environ
+
+    def detach(self, callback):
+        # Uygulama yanit govdesini istek thread'i disinda yazacaksa (streaming.StreamHub) cagirir:
+        # werkzeug'un yazdigi durum satiri ve basliklar sokete degil tampona gider; istek bitince
+        # callback(soket, basliklar) cagrilir ve soket kapatilmaz.
+        self._detached = (callback, self.wfile)
+        self.wfile = io.BytesIO()
+
+    def finish(self):
+        detached = getattr(self, "_detached", None)
+        if detached is not None:
+            callback, socket_wfile = detached
+            self.handoff = (callback, self.wfile.getvalue())
+            self.wfile = socket_wfile
+        super().finish()
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    multithread = True
+
+    def __init__(self, host, port, app, threads=8, fd=None):
+        super().__init__(host, port, app, handler=_RequestHandler, fd=fd)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        # Tum thread'ler doluysa kabul dongusu bekler; istek bos thread'i olan baska worker'a duser.
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self._pool.submit(self._process_request_thread, request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _process_request_thread(self, request, client_address):
+        handoff = None
+        try:
+            handoff = self.finish_request(request, client_address).handoff
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            try:
+                if handoff is not None:
+                    callback, head = handoff
+                    callback(request, head)
+                else:
+                    self.shutdown_request(request)
+            except Exception:
+                self.handle_error(request, client_address)
+                self.shutdown_request(request)
+            finally:
+                self._slots.release()
+
+    def drain(self):
+        self._pool.shutdown(wait=True)
+
+
+def configure_session_store(workers):
+    url = os.getenv("SESSION_STORE_URL")
+    if workers <= 1 or (url and not url.startswith("memory://")):
+        return
+    if url:
+        raise SystemExit(f"SESSION_STORE_URL={url} ile {workers} worker calistirilamaz: her worker kendi "
+                         f"oturumlarini tutar. sqlite:///yol/sessions.sqlite kullanin ya da --workers 1 verin.")
+    path = os.path.join(os.getenv("DATA_CACHE_DIR", ".cache"), "sessions.sqlite")
+    os.environ["SESSION_STORE_URL"] = f"sqlite:///{path}"
+    logging.info(f"{workers} worker icin sohbet oturumlari paylasilan store'da tutulacak: {path}")
+
+def load_module(module_name):
+    # Isinmayi sunucu yonetir: modul importta kendi basina baslatmasin.
+    os.environ.setdefault("BACKEND_WARMUP", "manual")
+    return importlib.import_module(module_name)
+
+def load_app(module_name):
+    return load_module(module_name).app
+
+def start_module_warmup(module, background=False):
+    # Modul start_warmup() sunuyorsa (backend.py) baslangic isinmasini calistirir.
+    start_warmup = getattr(module, "start_warmup", None)
+    if start_warmup is not None:
+        start_warmup(background=background)
+
+def run_worker(app, sock, threads):
+    # /metrics ornekleri worker="<pid>" etiketiyle verilir (metrics.py).
+    os.environ["SERVE_WORKER"] = str(os.getpid())
+    host, port = sock.getsockname()[:2]
+    server = PooledWSGIServer(host, port, app, threads=threads, fd=sock.fileno())
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    logging.info(f"Worker {os.getpid()} hazir ({threads} thread).")
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+        logging.info(f"Worker {os.getpid()} kapandi.")
+
+
+class Master:
+    # Yeniden yukleme modulu yerinde yenilemez (eski modulun thread'leri, fork kancalari ve metrik
+    # toplayicilari kalir): ana surec ayni argumanlarla exec edilir. Dinleme soketi ve calisan
+    # worker'lar exec'ten sonra da bu surecin cocuklaridir; yeni surec onlari SERVE_RETIRE_PIDS ile
+    # devralir ve kendi worker'lari baslayinca kapatir.
+
+    def __init__(self, module_name, sock, workers, threads, graceful_timeout, lazy=False, retiring=()):
+        self.module_name = module_name
+        self.lazy = lazy
+        self.sock = sock
+        self.n_workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.module = None
+        self.app = None
+        self.workers = {pid: -1 for pid in retiring}  # pid -> nesil
+        self.generation = 0
+        self._pending_signals = []
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                if self.lazy:
+                    start_module_warmup(self.module, background=True)
+                run_worker(self.app, self.sock, self.threads)
+            except Exception:
+                logging.exception("Worker beklenmeyen bir hatayla kapandi.")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = self.generation
+
+    def _preload(self):
+        start = time.perf_counter()
+        self.module = load_module(self.module_name)
+        self.app = self.module.app
+        if not self.lazy:
+            start_module_warmup(self.module)
+        # Yuklenen nesneleri GC takibinden cikar: worker'larda GC gecisleri bu sayfalara
+        # yazip copy-on-write kopyalarini tetiklemesin.
+        gc.collect()
+        gc.freeze()
+        logging.info(f"Uygulama ana surecte {time.perf_counter() - start:.2f} sn'de yuklendi.")
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and status != 0:
+                logging.warning(f"Worker {pid} beklenmedik sekilde kapandi (durum {status}), yenisi baslatiliyor.")
+
+    def _reload(self):
+        logging.info("Yeniden yukleme istendi; ana surec yeniden calistiriliyor.")
+        os.environ["SERVE_LISTEN_FD"] = str(self.sock.fileno())
+        os.environ["SERVE_RETIRE_PIDS"] = ",".join(str(pid) for pid in self.workers)
+        argv = getattr(sys, "orig_argv", [sys.executable] + sys.argv)
+        try:
+            os.execv(sys.executable, argv)
+        except OSError:
+            logging.exception("Ana surec yeniden calistirilamadi; mevcut worker'lar calismaya devam ediyor.")
+
+    def _retire(self):
+        # exec oncesinden devralinan worker'lar yeni nesil baslatilinca kapatilir.
+        for pid, gen in self.workers.items():
+            if gen == -1:
+                self._kill(pid, signal.SIGTERM)
+
+    def _kill(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _stop(self):
+        for pid in list(self.workers):
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            self._kill(pid, signal.SIGKILL)
+        self._reap()
+
+    def run(self):
+        # Sinyaller yuklemeden once yakalanir: exec sonrasi yukleme sirasinda gelen HUP/TERM sureci
+        # varsayilan davranisla oldurmesin.
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, lambda signum, frame: self._pending_signals.append(signum))
+        try:
+            self._preload()
+        except Exception:
+            if not self.workers:
+                raise
+            logging.exception("Yeniden yukleme basarisiz; mevcut worker'lar calismaya devam ediyor.")
+            self._supervise_retiring()
+            return
+        for _ in range(self.n_workers):
+            self._spawn()
+        self._retire()
+        logging.info(f"Ana surec {os.getpid()}: {self.n_workers} worker x {self.threads} thread, "
+                     f"{self.sock.getsockname()[0]}:{self.sock.getsockname()[1]}")
+        while True:
+            while self._pending_signals:
+                signum = self._pending_signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self._reload()
+                else:
+                    logging.info("Kapatiliyor...")
+                    self._stop()
+                    return
+            self._reap()
+            alive = sum(1 for gen in self.workers.values() if gen == self.generation)
+            for _ in range(self.n_workers - alive):
+                self._spawn()
+            time.sleep(0.2)
+
+    def _supervise_retiring(self):
+        # Yeni kod yuklenemedi: devralinan worker'lar calismaya devam eder. Yeni bir HUP tekrar
+        # dener; TERM/INT hepsini kapatir. Olen worker yerine yenisi baslatilamaz (uygulama yok).
+        while self.workers:
+            while self._pending_signals:
+                signum = self._pending_signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self._reload()
+                else:
+                    logging.info("Kapatiliyor...")
+                    self._stop()
+                    return
+            self._reap()
+            time.sleep(0.2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cok surecli uretim sunucusu")
+    ap.add_argument("--app", default="backend", help="Flask uygulamasini iceren modul (modul.app)")
+    ap.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)))
+    ap.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", "8")))
+    ap.add_argument("--graceful_timeout", type=float, default=30.0, help="Kapanista worker'lari bekleme suresi (sn)")
+    ap.add_argument("--backlog", type=int, default=2048)
+    ap.add_argument("--lazy", action="store_true",
+                    help="Model ve veriyi ana surecte yuklemeden fork et; worker'lar arka planda isinir")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not hasattr(os, "fork"):
+        logging.warning("Bu platformda fork yok; tek surecli thread havuzlu sunucu baslatiliyor.")
+        module = load_module(args.app)
+        start_module_warmup(module, background=True)
+        server = PooledWSGIServer(args.host, args.port, module.app, threads=args.threads)
+        try:
+            server.serve_forever()
+        finally:
+            server.drain()
+        return
+
+    configure_session_store(args.workers)
+    listen_fd = os.environ.pop("SERVE_LISTEN_FD", None)
+    retiring = [int(pid) for pid in os.environ.pop("SERVE_RETIRE_PIDS", "").split(",") if pid]
+    if listen_fd is not None:
+        sock = socket.socket(fileno=int(listen_fd))
+    else:
+        sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+    Master(args.app, sock, args.workers, args.threads, args.graceful_timeout, lazy=args.lazy,
+           retiring=retiring).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Sohbet durumlari: {'stage': 0 | 1 | 2 | 'awaiting_prediction_confirmation', 'data': {...}}.
+# Tum store'lar dict benzeri get(session_id, default) ve store[session_id] = durum arayuzunu saglar.
+
+
+class SessionRecord:
+    __slots__ = ("stage", "data", "expires_at")
+
+    def __init__(self, stage, data, expires_at):
+        self.stage = stage
+        self.data = data
+        self.expires_at = expires_at
+
+    def as_state(self):
+        return {'stage': self.stage, 'data': dict(self.data)}
+
+
+class MemorySessionStore:
+    # Surec ici store. Oturumlar kilit serili (lock striping) parcalara dagitilir: her parcanin
+    # kendi kilidi ve LRU sirasi vardir, farkli oturumlara gelen istekler birbirini beklemez.
+    # Toplam boyut maxsize ile sinirlidir; ttl saniye boyunca dokunulmayan oturum silinir.
+
+    def __init__(self, maxsize=10000, ttl=1800, stripes=16, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+        self._stripe_maxsize = max(1, -(-maxsize // stripes))
+        self._counter_lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _stripe(self, session_id):
+        return self._stripes[hash(session_id) % len(self._stripes)]
+
+    def _count(self, evictions=0, expirations=0):
+        if evictions or expirations:
+            with self._counter_lock:
+                self.evictions += evictions
+                self.expirations += expirations
+
+    def get(self, session_id, default=None):
+        lock, records = self._stripe(session_id)
+        with lock:
+            record = records.get(session_id)
+            if record is None:
+                return default
+            now = self._clock()
+            if record.expires_at is not None and record.expires_at <= now:
+                del records[session_id]
+                expired = True
+            else:
+                records.move_to_end(session_id)
+                if self.ttl is not None:
+                    record.expires_at = now + self.ttl
+                return record.as_state()
+        self._count(expirations=int(expired))
+        return default
+
+    def put(self, session_id, state):
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        record = SessionRecord(state.get('stage', 0), dict(state.get('data') or {}), expires_at)
+        lock, records = self._stripe(session_id)
+        evicted = 0
+        with lock:
+            records[session_id] = record
+            records.move_to_end(session_id)
+            while len(records) > self._stripe_maxsize:
+                records.popitem(last=False)
+                evicted += 1
+        self._count(evictions=evicted)
+
+    __setitem__ = put
+
+    def delete(self, session_id):
+        lock, records = self._stripe(session_id)
+        with lock:
+            records.pop(session_id, None)
+
+    def purge_expired(self):
+        now = self._clock()
+        expired = 0
+        for lock, records in self._stripes:
+            with lock:
+                stale = [sid for sid, r in records.items() if r.expires_at is not None and r.expires_at <= now]
+                for sid in stale:
+                    del records[sid]
+                expired += len(stale)
+        self._count(expirations=expired)
+        return expired
+
+    def __len__(self):
+        return sum(len(records) for _, records in self._stripes)
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stripes": len(self._stripes),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteSessionStore:
+    # Surec disi store: ayni dosyayi kullanan tum worker surecleri oturumlari paylasir.
+    # LRU sirasi 'touched' kolonuyla tutulur; tasma ve suresi dolanlar her purge_every
+    # yazmada bir temizlenir.
+
+    def __init__(self, path, maxsize=10000, ttl=1800, purge_every=256):
+        import sqlite3
+        self._sqlite3 = sqlite3
+        self.path = str(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, stage TEXT NOT NULL, data TEXT NOT NULL, expires REAL, touched REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions (touched)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # fork sonrasi ust surecin baglantisi kullanilmaz.
+            conn = self._sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id, default=None):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT stage, data, expires FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                return default
+            stage, data, expires = row
+            if expires is not None and expires <= now:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                with self._writes_lock:
+                    self.expirations += 1
+                return default
+            expires = None if self.ttl is None else now + self.ttl
+            conn.execute("UPDATE sessions SET touched = ?, expires = ? WHERE id = ?", (now, expires, session_id))
+        return {'stage': json.loads(stage), 'data': json.loads(data)}
+
+    def put(self, session_id, state):
+        now = time.time()
+        expires = None if self.ttl is None else now + self.ttl
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, stage, data, expires, touched) VALUES (?, ?, ?, ?, ?)",
+                (session_id, json.dumps(state.get('stage', 0)), json.dumps(state.get('data') or {}), expires, now),
+            )
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge_expired()
+
+    __setitem__ = put
+
+    def delete(self, session_id):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge_expired(self):
+        with self._conn() as conn:
+            expired = conn.execute("DELETE FROM sessions WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)).rowcount
+            evicted = conn.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            ).rowcount
+        with self._writes_lock:
+            self.expirations += expired
+            self.evictions += evicted
+        return expired
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self):
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def create_session_store(url="memory://", maxsize=10000, ttl=1800):
+    # "memory://" ya da "sqlite:///yol/sessions.sqlite"
+    if not url or url.startswith("memory://"):
+        return MemorySessionStore(maxsize=maxsize, ttl=ttl)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):], maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"Desteklenmeyen oturum store adresi: {url}")
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+
+# Sunucudan istemciye olay akislari (SSE ya da NDJSON). serve.py baglantiyi istek thread'inden
+# ayirabiliyorsa (environ["serve.detach"]) akislar surec basina tek bir asyncio thread'inde yazilir:
+# bos bekleyen akis thread tutmaz; olay ureticileri (istek thread'i, LLM thread'leri) send() ile
+# olay birakir ve close() ile akisi bitirir. Ayrilamiyorsa (flask gelistirme sunucusu, test
+# istemcisi) govde istek thread'inde bloklayan bir generator ile yazilir.
+
+SSE = "text/event-stream"
+NDJSON = "application/x-ndjson"
+
+_END = object()
+
+
+def encode_event(event, data, mimetype=SSE):
+    if mimetype == SSE:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+    return (json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n").encode()
+
+def heartbeat_bytes(mimetype):
+    # SSE yorum satiri / bos NDJSON satiri: istemciler yok sayar, ara vekiller baglantiyi kapatmaz.
+    return b": ping\n\n" if mimetype == SSE else b"\n"
+
+
+class EventStream:
+    # send() her thread'den cagrilabilir; akis kapandiysa (istemci ayrildi, zaman asimi) False
+    # doner ve uretici isi birakabilir.
+
+    def __init__(self, mimetype, deliver):
+        self.mimetype = mimetype
+        self.closed = False
+        self._deliver = deliver
+
+    def send(self, event, data):
+        if self.closed:
+            return False
+        self._deliver(encode_event(event, data, self.mimetype))
+        return True
+
+    def close(self):
+        if not self.closed:
+            self._deliver(_END)
+
+
+class StreamHub:
+    # heartbeat: bos akisa bu aralikla canlilik satiri yazilir (kopan istemci de boylece fark
+    # edilir). idle_timeout: bu sure boyunca hic olay gelmezse akis hata olayiyla kapatilir.
+
+    def __init__(self, heartbeat=15.0, idle_timeout=60.0):
+        self.heartbeat = heartbeat
+        self.idle_timeout = idle_timeout
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.open_streams = 0
+        self.opened = 0
+        self.detached = 0
+        self.disconnected = 0
+        self.timed_out = 0
+
+    def _count(self, name, delta=1):
+        # Sayaclar hem istek thread'lerinden hem dongu thread'inden guncellenir.
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def _ensure_loop(self):
+        # fork sonrasi ust surecin dongu thread'i cocukta yoktur; ilk akista yenisi baslar.
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="event-streams", daemon=True).start()
+                self._loop, self._pid = loop, os.getpid()
+            return self._loop
+
+    def start(self, environ, mimetype, producer):
+        # producer(akis) olaylari uretir; uzun bekleyen isleri (LLM) baslatip hemen donmelidir.
+        # Donus: WSGI yanit govdesi. Baglanti ayrilabiliyorsa govde bostur: sunucu istegi bitirince
+        # soket asyncio thread'ine devredilir ve producer o anda cagrilir.
+        self._count("opened")
+        detach = environ.get("serve.detach")
+        if detach is None:
+            items = queue.Queue()
+            return self._blocking_body(EventStream(mimetype, items.put), items, producer)
+
+        loop = self._ensure_loop()
+        items = asyncio.Queue()
+        stream = EventStream(mimetype, lambda item: loop.call_soon_threadsafe(items.put_nowait, item))
+
+        def attach(sock, head):
+            self._count("detached")
+            asyncio.run_coroutine_threadsafe(self._pump(stream, items, sock, head), loop)
+            self._produce(stream, producer)
+
+        detach(attach)
+        return iter(())
+
+    def _produce(self, stream, producer):
+        try:
+            producer(stream)
+        except Exception as e:
+            logging.error(f"Olay akisi uretilemedi: {e}")
+            stream.send("error", {"error": str(e)})
+            stream.close()
+
+    def _blocking_body(self, stream, items, producer):
+        self._count("open_streams")
+        try:
+            self._produce(stream, producer)
+            idle = 0.0
+            while True:
+                try:
+                    item = items.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    idle += self.heartbeat
+                    if idle >= self.idle_timeout:
+                        self._count("timed_out")
+                        yield encode_event("error", {"error": "Akis zaman asimina ugradi."}, stream.mimetype)
+                        return
+                    yield heartbeat_bytes(stream.mimetype)
+                    continue
+                if item is _END:
+                    return
+                idle = 0.0
+                yield item
+        finally:
+            stream.closed = True
+            self._count("open_streams", -1)
+
+    async def _pump(self, stream, items, sock, head):
+        loop = asyncio.get_running_loop()
+        self._count("open_streams")
+        writer = None
+        try:
+            _, writer = await asyncio.open_connection(sock=sock)
+            writer.write(head)
+            await writer.drain()
+            idle_deadline = loop.time() + self.idle_timeout
+            while True:
+                try:
+                    item = await asyncio.wait_for(items.get(), min(self.heartbeat, max(0.0, idle_deadline - loop.time())))
+                except asyncio.TimeoutError:
+                    if loop.time() >= idle_deadline:
+                        self._count("timed_out")
+                        writer.write(encode_event("error", {"error": "Akis zaman asimina ugradi."}, stream.mimetype))
+                        break
+                    writer.write(heartbeat_bytes(stream.mimetype))
+                    await writer.drain()
+                    continue
+                if item is _END:
+                    break
+                writer.write(item)
+                await writer.drain()
+                idle_deadline = loop.time() + self.idle_timeout
+        except OSError:
+            self._count("disconnected")
+        finally:
+            stream.closed = True
+            self._count("open_streams", -1)
+            if writer is None:
+                sock.close()
+            else:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "open_streams": self.open_streams,
+            "opened": self.opened,
+            "detached": self.detached,
+            "disconnected": self.disconnected,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,155 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from caches import LRUCache, PredictionCache, SingleFlight, SQLiteCache
+
+# Onbellek katmanlari: LRU/TTL, model takasinda tahmin onbelleginin bosalmasi, tek ucus ve SQLite.
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # b en eski olur
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = LRUCache(maxsize=4, ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 10.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 1))
+
+    def test_clear_drops_results_computed_before_it(self):
+        cache = LRUCache(maxsize=4)
+
+        def compute():
+            cache.clear()  # hesaplama surerken onbellek bosaltildi
+            return "eski"
+
+        self.assertEqual(cache.get_or_compute("a", compute), "eski")
+        self.assertIsNone(cache.get("a"))
+
+
+class PredictionCacheTest(unittest.TestCase):
+    def test_key_includes_version_and_feature_order(self):
+        cache = PredictionCache(["brand", "stock"])
+        key = cache.key_for({"stock": 3, "brand": "LG "}, version=2)
+        self.assertEqual(key, (2, "LG ", 3.0))
+        self.assertNotEqual(key, cache.key_for({"stock": 3, "brand": "LG"}, version=2))
+        self.assertNotEqual(key, cache.key_for({"stock": 3, "brand": "LG "}, version=3))
+        self.assertEqual(cache.key_for({"stock": float("nan"), "brand": None}), (None, None, None))
+        self.assertNotEqual(cache.key_for({"brand": None}), cache.key_for({"brand": None, "stock": None}))
+
+    def test_bind_model_clears_on_model_change(self):
+        cache = PredictionCache(["brand"])
+        old, new = object(), object()
+        cache.bind_model(old)
+        cache.put(cache.key_for({"brand": "LG"}, version=1), 10.0)
+        cache.bind_model(old)
+        self.assertEqual(len(cache), 1)
+        cache.bind_model(new, feature_cols=["brand", "stock"])
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.feature_cols, ["brand", "stock"])
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+
+class SingleFlightTest(unittest.TestCase):
+    def run_callers(self, flight, fn, n=5):
+        results, errors = [], []
+        started = threading.Barrier(n)
+
+        def caller():
+            started.wait()
+            try:
+                results.append(flight.do("k", fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5.0)
+        return results, errors
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "sonuc"
+
+        results, errors = self.run_callers(flight, compute)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("sonuc", False)] + [("sonuc", True)] * 4)
+        self.assertEqual(flight.coalesced, 4)
+        self.assertEqual(flight.do("k", lambda: "yeni"), ("yeni", False))
+
+    def test_error_reaches_every_waiter(self):
+        flight = SingleFlight()
+
+        def compute():
+            time.sleep(0.2)
+            raise RuntimeError("basarisiz")
+
+        results, errors = self.run_callers(flight, compute)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(e, RuntimeError) and str(e) == "basarisiz" for e in errors))
+
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_shared_file(self):
+        cache = SQLiteCache(self.path, table="yanitlar")
+        cache.put("soru", {"text": "yanit", "latency": 0.5})
+        self.assertEqual(cache.get("soru"), {"text": "yanit", "latency": 0.5})
+        self.assertEqual(SQLiteCache(self.path, table="yanitlar").get("soru")["text"], "yanit")
+        self.assertIsNone(SQLiteCache(self.path, table="baska").get("soru"))
+        cache.delete("soru")
+        self.assertIsNone(cache.get("soru"))
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_expiry(self):
+        cache = SQLiteCache(self.path, ttl=-1)
+        cache.put("soru", "yanit")
+        self.assertEqual(cache.get("soru", "yok"), "yok")
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
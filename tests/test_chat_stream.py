@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("BACKEND_WARMUP", "manual")
+
+import backend
+from llm_client import CachedLLMClient, FakeGenerativeModel, LLMClient
+
+# /chat/stream'in Gemini kolu: kota doluyken istek thread'i beklemeden hata olayi yazilir.
+
+
+class RecordingStream:
+    def __init__(self):
+        self.events = []
+        self.closed = False
+
+    def send(self, event, data):
+        self.events.append((event, data))
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class ChatStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_client = backend.llm_client
+        model = FakeGenerativeModel("yanit", latency=0.5, chunk_size=100)
+        backend.llm_client = CachedLLMClient(LLMClient(model, max_concurrency=1, timeout=5))
+
+    def tearDown(self):
+        backend.llm_client = self.saved_client
+
+    def test_saturated_llm_sends_busy_event_without_blocking(self):
+        first = RecordingStream()
+        backend.stream_llm_response(first, "ilk soru")
+        second = RecordingStream()
+        start = time.monotonic()
+        backend.stream_llm_response(second, "ikinci soru")
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual([event for event, _ in second.events], ["error", "done"])
+        self.assertIn("cok fazla istek", second.events[0][1]["error"])
+        self.assertTrue(second.closed)
+
+        deadline = time.monotonic() + 3.0
+        while not first.closed and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual([event for event, _ in first.events], ["delta", "done"])
+        self.assertEqual(first.events[-1][1]["response"], "yanit")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from model.inference import compile_model
+
+# Derlenmis NumPy motoru ile sklearn'in ayni satirlarda ayni fiyati vermesi: bilinmeyen
+# kategoriler, eksik kategorik ve sayisal degerler dahil.
+
+CATEGORICAL = ["category", "country", "platform"]
+NUMERIC = ["shipping_cost", "stock", "month"]
+MODEL_PATH = ROOT / "model" / "model.joblib"
+FEATURES_PATH = ROOT / "model" / "feature_columns.json"
+
+
+def training_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "category": rng.choice(["Toys", "Sports", "Electronics", "Beauty"], n),
+        "country": rng.choice(["USA", "Germany", "India", "Turkey"], n),
+        "platform": rng.choice(["Amazon", "eBay", "Walmart"], n),
+        "shipping_cost": rng.uniform(1, 30, n),
+        "stock": rng.integers(0, 500, n).astype(float),
+        "month": rng.integers(1, 13, n).astype(float),
+    })
+    price = (50 + 40 * (df["category"] == "Electronics") + 15 * (df["country"] == "Germany")
+             + 2 * df["shipping_cost"] - 0.02 * df["stock"] + rng.normal(0, 5, n))
+    df.loc[rng.random(n) < 0.05, "shipping_cost"] = np.nan
+    df.loc[rng.random(n) < 0.05, "platform"] = None
+    return df, price
+
+def pipeline(regressor):
+    preprocessor = ColumnTransformer([
+        ("cat", Pipeline([("imp", SimpleImputer(strategy="constant", fill_value="missing")),
+                          ("oh", OneHotEncoder(handle_unknown="ignore"))]), CATEGORICAL),
+        ("num", Pipeline([("imp", SimpleImputer(strategy="median")), ("scale", StandardScaler())]), NUMERIC),
+    ])
+    return Pipeline([("pre", preprocessor), ("model", regressor)])
+
+def fixed_rows():
+    return pd.DataFrame([
+        {"category": "Toys", "country": "USA", "platform": "Amazon", "shipping_cost": 5.0, "stock": 10.0, "month": 3.0},
+        {"category": "Electronics", "country": "Germany", "platform": "eBay", "shipping_cost": 25.5, "stock": 0.0, "month": 12.0},
+        {"category": "Garden", "country": "Mars", "platform": "Etsy", "shipping_cost": 9.9, "stock": 42.0, "month": 6.0},
+        {"category": None, "country": "India", "platform": None, "shipping_cost": np.nan, "stock": 7.0, "month": 1.0},
+        {"category": np.nan, "country": None, "platform": "Walmart", "shipping_cost": 3.0, "stock": np.nan, "month": np.nan},
+        {"category": "toys", "country": " USA", "platform": "amazon", "shipping_cost": -4.0, "stock": 1e6, "month": 99.0},
+    ])
+
+
+class CompiledParityTest(unittest.TestCase):
+    def assert_engines_agree(self, estimator, rows):
+        compiled = compile_model(estimator)
+        expected = np.asarray(estimator.predict(rows), dtype=np.float64)
+        got = compiled.predict(rows)
+        self.assertEqual(compiled.fallbacks, 0)
+        np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
+        records = [{k: (None if isinstance(v, float) and v != v and k in CATEGORICAL else v) for k, v in row.items()}
+                   for row in rows.to_dict("records")]
+        np.testing.assert_allclose(compiled.predict_encoded(compiled.encode_records(records)), expected,
+                                   rtol=1e-9, atol=1e-9)
+
+    def test_random_forest(self):
+        X, y = training_frame()
+        estimator = pipeline(RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0)).fit(X, y)
+        self.assert_engines_agree(estimator, fixed_rows())
+
+    def test_gradient_boosting(self):
+        X, y = training_frame()
+        estimator = pipeline(GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0)).fit(X, y)
+        self.assert_engines_agree(estimator, fixed_rows())
+
+    @unittest.skipUnless(MODEL_PATH.exists(), "model/model.joblib yok")
+    def test_bundled_model(self):
+        import joblib
+
+        feature_cols = json.loads(FEATURES_PATH.read_text())
+        estimator = joblib.load(MODEL_PATH)
+        rows = fixed_rows()
+        for col in feature_cols:
+            if col not in rows.columns:
+                rows[col] = ["teddy bear", "laptop", "bilinmeyen urun", None, np.nan, "Teddy Bear"]
+        compiled = compile_model(estimator)
+        expected = np.asarray(estimator.predict(rows[feature_cols]), dtype=np.float64)
+        got = compiled.predict(rows[feature_cols])
+        self.assertEqual(compiled.fallbacks, 0)
+        np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_client import FakeGenerativeModel, LLMBusyError, LLMClient, LLMTimeoutError
+
+# LLMClient'in zaman siniri ve esszamanlilik davranisi, gercek API yerine FakeGenerativeModel ile.
+
+
+class StreamResult:
+    def __init__(self):
+        self.parts = []
+        self.error = None
+        self.ended_at = None
+        self.done = threading.Event()
+
+    def on_text(self, text):
+        self.parts.append(text)
+
+    def on_end(self, error):
+        self.error = error
+        self.ended_at = time.monotonic()
+        self.done.set()
+
+
+def wait_idle(client, timeout=3.0):
+    # on_end okuma thread'inde cagrilir; kotadaki yer thread cikinca bosalir.
+    deadline = time.monotonic() + timeout
+    while client.in_flight and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return client.in_flight == 0
+
+
+class LLMClientTest(unittest.TestCase):
+    def test_stream_delivers_chunks(self):
+        client = LLMClient(FakeGenerativeModel("merhaba dunya", chunk_size=4), max_concurrency=1, timeout=5)
+        self.assertEqual("".join(client.stream("soru")), "merhaba dunya")
+
+    def test_stream_without_first_chunk_times_out_at_deadline(self):
+        # Ilk parca 1 sn sonra gelir; akis 0.2 sn'lik sinirda bitmeli, gec gelen parca iletilmemeli.
+        client = LLMClient(FakeGenerativeModel("yanit", latency=1.0, chunk_size=100), max_concurrency=1, timeout=0.2)
+        result = StreamResult()
+        start = time.monotonic()
+        client.start_stream("soru", result.on_text, result.on_end)
+        self.assertTrue(result.done.wait(2.0))
+        self.assertIsInstance(result.error, LLMTimeoutError)
+        self.assertLess(result.ended_at - start, 0.8)
+        time.sleep(1.0)
+        self.assertEqual(result.parts, [])
+
+    def test_timed_out_stream_holds_slot_until_reader_exits(self):
+        # Zaman asimindan sonra okuma hala modeli beklerken kota dolu sayilir; okuma bitince bosalir.
+        # Akis basina havuz disinda thread acilmaz.
+        client = LLMClient(FakeGenerativeModel("yanit", latency=1.0, chunk_size=100), max_concurrency=1, timeout=0.2)
+        threads_before = threading.active_count()
+        result = StreamResult()
+        client.start_stream("soru", result.on_text, result.on_end)
+        self.assertTrue(result.done.wait(2.0))
+        self.assertIsInstance(result.error, LLMTimeoutError)
+        self.assertEqual(client.in_flight, 1)
+        with self.assertRaises(LLMBusyError):
+            client.start_stream("soru", StreamResult().on_text, StreamResult().on_end)
+        self.assertLessEqual(threading.active_count() - threads_before, 2)  # havuz thread'i + ortak izleyici
+
+        self.assertTrue(wait_idle(client))
+        client.model = FakeGenerativeModel("ikinci", chunk_size=100)
+        self.assertEqual("".join(client.stream("soru", timeout=2.0)), "ikinci")
+
+    def test_saturated_stream_fails_fast(self):
+        # Kota doluyken akis, zaman siniri uzun olsa da istek thread'ini bekletmeden reddedilir.
+        client = LLMClient(FakeGenerativeModel("yanit", latency=0.5, chunk_size=100), max_concurrency=1, timeout=5)
+        result = StreamResult()
+        client.start_stream("soru", result.on_text, result.on_end)
+        start = time.monotonic()
+        with self.assertRaises(LLMBusyError):
+            client.start_stream("soru", StreamResult().on_text, StreamResult().on_end)
+        with self.assertRaises(LLMBusyError):
+            client.generate("soru")
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(result.done.wait(2.0))
+        self.assertIsNone(result.error)
+
+    def test_blocking_stream_times_out_at_deadline(self):
+        client = LLMClient(FakeGenerativeModel("yanit", latency=1.0, chunk_size=100), max_concurrency=1, timeout=0.2)
+        start = time.monotonic()
+        with self.assertRaises(LLMTimeoutError):
+            list(client.stream("soru"))
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_generate_times_out(self):
+        client = LLMClient(FakeGenerativeModel("yanit", latency=1.0), max_concurrency=1, timeout=0.1)
+        with self.assertRaises(LLMTimeoutError):
+            client.generate("soru")
+
+    def test_concurrency_limit(self):
+        model = FakeGenerativeModel("yanit", latency=0.5, chunk_size=100)
+        client = LLMClient(model, max_concurrency=2, timeout=5)
+        results = [StreamResult(), StreamResult()]
+        for result in results:
+            client.start_stream("soru", result.on_text, result.on_end)
+        with self.assertRaises(LLMBusyError):
+            client.start_stream("soru", StreamResult().on_text, StreamResult().on_end, timeout=0.05)
+        for result in results:
+            self.assertTrue(result.done.wait(2.0))
+            self.assertIsNone(result.error)
+            self.assertEqual("".join(result.parts), "yanit")
+        self.assertTrue(wait_idle(client))
+        self.assertEqual(client.generate("soru"), "yanit")
+        self.assertEqual(model.calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from product_matcher import ProductMatcher
+
+# ProductMatcher: en uzun eslesme secimi, ic ice gecen adlar, with_names ile eklenenler ve
+# eski alt dize taramasiyla (her ad icin "ad in mesaj") ayni sonuclar.
+
+DATA_PATH = ROOT / "synthetic_ecommerce_data.xlsx"
+
+
+def substring_matches(names, message):
+    return {name for name in names if name and name in message}
+
+def expected_longest(names, message):
+    # Eski tarama hangi adlarin gectigini bulur; yeni secim en uzun ad, esitlikte mesajda once biten.
+    found = substring_matches(names, message)
+    if not found:
+        return None
+    return min(found, key=lambda name: (-len(name), message.index(name) + len(name)))
+
+
+class ProductMatcherTest(unittest.TestCase):
+    def test_prefers_longest_match(self):
+        matcher = ProductMatcher(["phone", "smart phone", "smart"])
+        self.assertEqual(matcher.longest_match("bir smart phone satiyorum"), "smart phone")
+        self.assertEqual(matcher.longest_match("phone"), "phone")
+        self.assertIsNone(matcher.longest_match("tablet"))
+
+    def test_tie_picks_earliest_in_message(self):
+        matcher = ProductMatcher(["shoes", "mixer"])
+        self.assertEqual(matcher.longest_match("mixer ve shoes"), "mixer")
+        self.assertEqual(matcher.longest_match("shoes ve mixer"), "shoes")
+
+    def test_overlapping_names(self):
+        matcher = ProductMatcher(["most shoes", "almost shoes", "shoes", "host"])
+        message = "almost shoes and host"
+        self.assertEqual(sorted(name for _, _, name in matcher.find_all(message)),
+                         ["almost shoes", "host", "most shoes", "shoes"])
+        for start, end, name in matcher.find_all(message):
+            self.assertEqual(message[start:end], name)
+        self.assertEqual(matcher.longest_match(message), "almost shoes")
+
+    def test_case_and_turkish_characters(self):
+        # Eslestirici karakterleri oldugu gibi karsilastirir; backend mesaji str.lower() ile kucultur.
+        matcher = ProductMatcher(["güneş gözlüğü", "örgü çanta"])
+        self.assertEqual(matcher.longest_match("GÜNEŞ GÖZLÜĞÜ fiyatı nedir".lower()), "güneş gözlüğü")
+        self.assertEqual(matcher.longest_match("Örgü Çanta".lower()), "örgü çanta")
+        self.assertIsNone(matcher.longest_match("gunes gozlugu"))
+        self.assertIn("örgü çanta", matcher)
+        self.assertNotIn("orgu canta", matcher)
+
+    def test_with_names(self):
+        base = ProductMatcher(["phone", "speaker"])
+        extended = base.with_names(["smart phone", "phone", ""])
+        self.assertIsNot(extended, base)
+        self.assertEqual(len(base), 2)
+        self.assertEqual(len(extended), 3)
+        self.assertIn("smart phone", extended)
+        self.assertNotIn("smart phone", base)
+        self.assertEqual(base.longest_match("smart phone"), "phone")
+        self.assertEqual(extended.longest_match("smart phone"), "smart phone")
+        self.assertEqual(extended.longest_match("speaker ve phone"), "speaker")
+        self.assertEqual(sorted(name for _, _, name in extended.find_all("smart phone")), ["phone", "smart phone"])
+        self.assertIs(extended.with_names(["phone"]), extended)
+
+    def test_with_names_merges_into_one_automaton(self):
+        names = [f"product {i}" for i in range(16)]
+        extended = ProductMatcher(names).with_names(["gadget", "widget", "gizmo"], merge_ratio=0.125)
+        self.assertIsNone(extended._extra)
+        self.assertEqual(len(extended), 19)
+        self.assertEqual(extended.longest_match("bir widget"), "widget")
+
+    @unittest.skipUnless(DATA_PATH.exists(), "synthetic_ecommerce_data.xlsx yok")
+    def test_matches_substring_scan_on_bundled_products(self):
+        import pandas as pd
+
+        names = list(dict.fromkeys(pd.read_excel(DATA_PATH)["product_name"].str.lower()))
+        matcher = ProductMatcher(names[:-200]).with_names(names[-200:])
+        self.assertIsNotNone(matcher._extra)
+        rng = random.Random(0)
+        messages = [f"{rng.choice(names)} fiyati nedir" for _ in range(300)]
+        messages += [f"{rng.choice(names)} ve {rng.choice(names)}" for _ in range(300)]
+        messages += ["bu katalogda olmayan bir urun", ""]
+        for message in messages:
+            self.assertEqual({name for _, _, name in matcher.find_all(message)}, substring_matches(names, message))
+            self.assertEqual(matcher.longest_match(message), expected_longest(names, message))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_store import MemorySessionStore, SQLiteSessionStore, create_session_store
+
+# Sohbet oturum store'lari: LRU siniri, TTL, kopyalama ve adres cozumleme.
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MemorySessionStoreTest(unittest.TestCase):
+    def test_round_trip_returns_copies(self):
+        store = MemorySessionStore()
+        state = {'stage': 1, 'data': {'product_name': 'phone'}}
+        store['a'] = state
+        state['data']['product_name'] = 'degisti'
+        got = store.get('a')
+        self.assertEqual(got, {'stage': 1, 'data': {'product_name': 'phone'}})
+        got['data']['stage'] = 'x'
+        self.assertEqual(store.get('a')['data'], {'product_name': 'phone'})
+        self.assertEqual(store.get('yok', 'varsayilan'), 'varsayilan')
+        store.delete('a')
+        self.assertIsNone(store.get('a'))
+
+    def test_lru_eviction_per_stripe(self):
+        store = MemorySessionStore(maxsize=2, stripes=1)
+        store['a'] = {'stage': 0}
+        store['b'] = {'stage': 0}
+        store.get('a')  # b en eski olur
+        store['c'] = {'stage': 0}
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('a'))
+        self.assertEqual(store.stats()['evictions'], 1)
+
+    def test_size_is_bounded_across_stripes(self):
+        store = MemorySessionStore(maxsize=8, stripes=4)
+        for i in range(100):
+            store[f"s{i}"] = {'stage': 0}
+        self.assertLessEqual(len(store), 8)
+        self.assertEqual(store.stats()['evictions'], 100 - len(store))
+
+    def test_ttl_is_sliding(self):
+        clock = FakeClock()
+        store = MemorySessionStore(ttl=10, clock=clock)
+        store['a'] = {'stage': 2}
+        store['b'] = {'stage': 2}
+        clock.now = 8
+        self.assertIsNotNone(store.get('a'))  # erisim suresini uzatir
+        clock.now = 15
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNone(store.get('b'))
+        clock.now = 30
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats()['expirations'], 2)
+
+    def test_concurrent_sessions(self):
+        store = MemorySessionStore(maxsize=1000)
+
+        def worker(n):
+            for i in range(100):
+                store[f"{n}-{i}"] = {'stage': i, 'data': {'n': n}}
+                self.assertEqual(store.get(f"{n}-{i}")['stage'], i)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5.0)
+        self.assertEqual(len(store), 800)
+
+
+class SQLiteSessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "sessions.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_shared_between_instances(self):
+        store = SQLiteSessionStore(self.path)
+        store['a'] = {'stage': 'awaiting_prediction_confirmation', 'data': {'stock': 3}}
+        other = SQLiteSessionStore(self.path)
+        self.assertEqual(other.get('a'), {'stage': 'awaiting_prediction_confirmation', 'data': {'stock': 3}})
+        other.delete('a')
+        self.assertEqual(store.get('a', 'yok'), 'yok')
+
+    def test_expired_sessions_are_dropped(self):
+        store = SQLiteSessionStore(self.path, ttl=-1)
+        store['a'] = {'stage': 1}
+        store['b'] = {'stage': 1}
+        self.assertIsNone(store.get('a'))
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats()['expirations'], 2)
+
+    def test_purge_keeps_most_recently_touched(self):
+        store = SQLiteSessionStore(self.path, maxsize=2, purge_every=1000)
+        for sid in ('a', 'b', 'c'):
+            store[sid] = {'stage': 0}
+            time.sleep(0.01)
+        store.get('a')
+        store.purge_expired()
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('a'))
+        self.assertEqual(store.stats()['evictions'], 1)
+
+
+class CreateSessionStoreTest(unittest.TestCase):
+    def test_memory_url(self):
+        for url in ("memory://", "", None):
+            store = create_session_store(url, maxsize=5, ttl=60)
+            self.assertIsInstance(store, MemorySessionStore)
+            self.assertEqual((store.maxsize, store.ttl), (5, 60))
+
+    def test_sqlite_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "alt", "sessions.sqlite")
+            store = create_session_store(f"sqlite:///{path}", maxsize=5, ttl=60)
+            self.assertIsInstance(store, SQLiteSessionStore)
+            self.assertEqual(store.path, path)
+            self.assertTrue(os.path.exists(path))
+
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                store = create_session_store("sqlite:///rel/sessions.sqlite")
+                self.assertEqual(store.path, "rel/sessions.sqlite")
+            finally:
+                os.chdir(cwd)
+
+    def test_unknown_url(self):
+        with self.assertRaises(ValueError):
+            create_session_store("redis://localhost")
+
+
+if __name__ == "__main__":
+    unittest.main()
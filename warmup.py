@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+
+# Baslangic isinmasi: agir importlar ve artefakt yuklemeleri uygulama import edildikten sonra,
+# istenirse arka plan thread'inde calisir. Ilerleme ve adim sureleri status() ile okunur;
+# /healthz ve /readyz bu nesneye bakar.
+
+
+class WarmUp:
+    def __init__(self):
+        self.steps = []
+        self.current = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._done.is_set() and self.error is None
+
+    @property
+    def failed(self):
+        return self._done.is_set() and self.error is not None
+
+    def step(self, name):
+        return _Step(self, name)
+
+    def run(self, fn, background=True):
+        # fn bir kez calisir; tekrar cagrilar ilk calismayi dondurur. background=False ise
+        # cagiran thread'de calisir ve hata yukari firlatilir.
+        with self._lock:
+            if self.started_at is not None:
+                return self
+            self.started_at = time.perf_counter()
+            if background:
+                self._thread = threading.Thread(target=self._run, args=(fn, False), name="warmup", daemon=True)
+                self._thread.start()
+                return self
+        self._run(fn, True)
+        return self
+
+    def _run(self, fn, reraise):
+        ok = False
+        try:
+            fn()
+            ok = True
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            if reraise:
+                raise
+        finally:
+            self.finished_at = time.perf_counter()
+            self._done.set()
+            elapsed = self.finished_at - self.started_at
+            if ok:
+                logging.info(f"Baslangic isinmasi {elapsed:.2f} sn'de tamamlandi.")
+            else:
+                logging.error(f"Baslangic isinmasi '{self.current}' adiminda {elapsed:.2f} sn sonra basarisiz oldu: {self.error}")
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self):
+        if self.started_at is None:
+            state = "not_started"
+        elif not self._done.is_set():
+            state = "warming"
+        else:
+            state = "failed" if self.error else "ready"
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            "status": state,
+            "current_step": self.current if state == "warming" else None,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at is not None else 0.0,
+            "steps": list(self.steps),
+            "error": self.error,
+        }
+
+
+class _Step:
+    __slots__ = ("warmup", "name", "start")
+
+    def __init__(self, warmup, name):
+        self.warmup = warmup
+        self.name = name
+
+    def __enter__(self):
+        self.warmup.current = self.name
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.warmup.steps.append({"name": self.name, "seconds": round(time.perf_counter() - self.start, 4),
+                                  "ok": exc_type is None})